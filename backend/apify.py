@@ -0,0 +1,329 @@
+"""
+Pooled async client for the Apify REST API.
+
+One httpx.AsyncClient per event loop is shared by every scrape, so actor calls
+and dataset reads reuse kept-alive connections (HTTP/2 when the optional `h2`
+package is installed) instead of paying TCP/TLS setup on each request.
+Request counts, new-connection counts and latencies are tracked for /metrics.
+
+Actor runs are started without waiting; stream_run_items polls the run and
+reads dataset pages while it is still running, and aborts the remote run if
+the consumer stops early, the request is cancelled, or the deadline passes.
+
+Requests that hit a 429, a 5xx or a connection error are retried with
+jittered exponential backoff, waiting at least as long as Retry-After asks.
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional
+from urllib.parse import quote
+
+import httpx
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+APIFY_API_BASE_URL = os.getenv("APIFY_API_BASE_URL", "https://api.apify.com")
+
+# Pool limits (override via environment)
+MAX_CONNECTIONS = int(os.getenv("APIFY_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE = int(os.getenv("APIFY_MAX_KEEPALIVE", "10"))
+REQUEST_TIMEOUT = float(os.getenv("APIFY_REQUEST_TIMEOUT", "90"))
+
+# Actor run deadline and dataset polling backoff (seconds)
+RUN_TIMEOUT = float(os.getenv("APIFY_RUN_TIMEOUT", "180"))
+POLL_INITIAL = float(os.getenv("APIFY_POLL_INITIAL", "0.5"))
+POLL_MAX = float(os.getenv("APIFY_POLL_MAX", "5"))
+POLL_BACKOFF = 1.5
+
+# Retries after a failed request, and the backoff bounds (seconds). A Retry-After
+# longer than RETRY_MAX_DELAY is not waited out; the error goes to the caller.
+RETRY_ATTEMPTS = int(os.getenv("APIFY_RETRY_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("APIFY_RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("APIFY_RETRY_MAX_DELAY", "30"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Statuses that mean the server turned the request away without acting on it,
+# the only ones a non-GET request (e.g. starting a billed run) is resent after
+REJECTED_STATUSES = {429, 503}
+
+TERMINAL_STATUSES = {"SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"}
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+_metrics = {
+    "requests": 0,
+    "errors": 0,
+    "connections_opened": 0,
+    "latency_sum": 0.0,
+    "latency_max": 0.0,
+}
+_latencies: deque = deque(maxlen=1000)
+
+
+class ApifyError(Exception):
+    """Raised when the Apify API returns an error response."""
+
+    def __init__(self, message: str, status_code: int = 0, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class RunTimeoutError(ApifyError):
+    """Raised when an actor run exceeds its deadline (the run is aborted)."""
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared AsyncClient for the running event loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=APIFY_API_BASE_URL,
+            http2=_http2_available(),
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close():
+    """Close the shared client (called on app shutdown)."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+def _token() -> str:
+    token = os.getenv("APIFY_API_TOKEN")
+    if not token:
+        raise ValueError("APIFY_API_TOKEN environment variable is required")
+    return token
+
+
+async def _trace(event_name: str, info: Dict):
+    """httpcore trace hook - counts newly opened TCP connections."""
+    if event_name == "connection.connect_tcp.complete":
+        _metrics["connections_opened"] += 1
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _retry_delay(method: str, error: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying after `error`, or None if it should not be retried."""
+    if attempt >= RETRY_ATTEMPTS:
+        return None
+    if isinstance(error, ApifyError):
+        # A 5xx after a POST may have started a run anyway; only GETs are safe to resend
+        retryable = RETRY_STATUSES if method == "GET" else REJECTED_STATUSES
+        if error.status_code not in retryable:
+            return None
+    elif method != "GET" and not isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        # The request may have reached Apify (e.g. started a run); only GETs are safe to resend
+        return None
+    backoff = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        if retry_after > RETRY_MAX_DELAY:
+            return None
+        return max(retry_after, backoff)
+    return backoff
+
+
+async def request(method: str, path: str, **kwargs) -> httpx.Response:
+    """Send an authenticated request through the pool, retrying 429s, 5xx and connection errors.
+
+    Non-GET requests are resent only after a connection error or a 429/503 rejection.
+
+    Raises ApifyError (with status_code and retry_after) once retries are exhausted.
+    """
+    headers = {"Authorization": f"Bearer {_token()}", **kwargs.pop("headers", {})}
+    attempt = 0
+    while True:
+        try:
+            return await _send(method, path, headers, **kwargs)
+        except (ApifyError, httpx.TransportError) as e:
+            delay = _retry_delay(method, e, attempt)
+            if delay is None:
+                raise
+            attempt += 1
+            reason = str(e.status_code) if isinstance(e, ApifyError) else type(e).__name__
+            metrics.APIFY_RETRIES.inc(endpoint=path.split("/")[2], reason=reason)
+            logger.warning("🔁 Apify %s %s failed (%s), retry %d/%d in %.1fs",
+                           method, path, reason, attempt, RETRY_ATTEMPTS, delay)
+            await asyncio.sleep(delay)
+
+
+async def _send(method: str, path: str, headers: Dict, **kwargs) -> httpx.Response:
+    """Send one request and record its latency; raises ApifyError on an error status."""
+    client = get_http_client()
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, path, headers=headers,
+                                        extensions={"trace": _trace}, **kwargs)
+    except httpx.HTTPError:
+        _metrics["errors"] += 1
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.APIFY_REQUEST_SECONDS.observe(elapsed, method=method, endpoint=path.split("/")[2])
+        _metrics["requests"] += 1
+        _metrics["latency_sum"] += elapsed
+        _metrics["latency_max"] = max(_metrics["latency_max"], elapsed)
+        _latencies.append(elapsed)
+
+    if response.status_code >= 400:
+        _metrics["errors"] += 1
+        raise ApifyError(
+            f"Apify API {method} {path} failed with {response.status_code}: {response.text[:200]}",
+            status_code=response.status_code,
+            retry_after=_parse_retry_after(response.headers.get("Retry-After")),
+        )
+    return response
+
+
+def _actor_path(actor_id: str) -> str:
+    """Actor IDs use '~' instead of '/' in API paths."""
+    return quote(actor_id.replace("/", "~"), safe="~")
+
+
+async def start_actor(actor_id: str, run_input: Dict, timeout: Optional[float] = None) -> Dict:
+    """Start an actor run without waiting for it. Returns the run object."""
+    params = {"timeout": int(timeout)} if timeout else {}
+    response = await request("POST", f"/v2/acts/{_actor_path(actor_id)}/runs", params=params, json=run_input)
+    return response.json()["data"]
+
+
+async def get_run(run_id: str) -> Dict:
+    """Get the current state of an actor run."""
+    response = await request("GET", f"/v2/actor-runs/{run_id}")
+    return response.json()["data"]
+
+
+async def abort_run(run_id: str) -> Optional[Dict]:
+    """Abort a running actor run. Errors are logged, not raised."""
+    try:
+        response = await request("POST", f"/v2/actor-runs/{run_id}/abort")
+        logger.info("🛑 Aborted actor run %s", run_id)
+        return response.json()["data"]
+    except (ApifyError, httpx.HTTPError) as e:
+        logger.warning("⚠️  Failed to abort actor run %s: %s", run_id, e)
+        return None
+
+
+async def stream_run_items(
+    actor_id: str,
+    run_input: Dict,
+    page_size: int = 100,
+    timeout: float = RUN_TIMEOUT,
+    on_finish: Optional[Callable[[Dict, int], None]] = None,
+    **params
+) -> AsyncIterator[List[Dict]]:
+    """
+    Start an actor run and yield pages of its dataset while it runs.
+
+    Polls with exponential backoff (reset whenever new items arrive). The
+    remote run is aborted if the consumer stops iterating, the task is
+    cancelled (e.g. client disconnect) or `timeout` seconds pass.
+
+    on_finish(run, items_read) is called with the final run object (its
+    usage and stats) once the run has finished or been aborted.
+
+    Raises RunTimeoutError on deadline and ApifyError if the run fails.
+    """
+    deadline = time.monotonic() + timeout
+    run = await start_actor(actor_id, run_input, timeout=timeout)
+    logger.info("Actor run started: %s", run["id"], extra={"actor": actor_id, "run_id": run["id"]})
+    offset = 0
+    delay = POLL_INITIAL
+    try:
+        while True:
+            finished = run.get("status") in TERMINAL_STATUSES
+            items = await get_dataset_items(run["defaultDatasetId"], offset=offset, limit=page_size, **params)
+            if items:
+                offset += len(items)
+                delay = POLL_INITIAL
+                yield items
+                continue
+            if finished:
+                # Status was terminal before this empty read, so the dataset is complete
+                break
+            if time.monotonic() + delay > deadline:
+                raise RunTimeoutError(f"Actor run {run['id']} exceeded {timeout:.0f}s deadline")
+            await asyncio.sleep(delay)
+            delay = min(delay * POLL_BACKOFF, POLL_MAX)
+            run = await get_run(run["id"])
+    finally:
+        if run.get("status") not in TERMINAL_STATUSES:
+            # Shielded so the abort still goes out when we are being cancelled
+            run = await asyncio.shield(abort_run(run["id"])) or run
+        if on_finish is not None:
+            on_finish(run, offset)
+
+    if run["status"] != "SUCCEEDED":
+        raise ApifyError(f"Actor run {run['id']} finished with status {run['status']}")
+    logger.info("Actor run completed: %s (%d items)", run["id"], offset,
+                extra={"actor": actor_id, "run_id": run["id"], "items": offset})
+
+
+async def get_dataset_items(dataset_id: str, offset: int = 0, limit: int = 1000, **params) -> List[Dict]:
+    """Read one page of dataset items."""
+    response = await request(
+        "GET", f"/v2/datasets/{dataset_id}/items",
+        params={"offset": offset, "limit": limit, "clean": "true", "format": "json", **params}
+    )
+    return response.json()
+
+
+def get_metrics() -> Dict:
+    """Connection reuse and request latency statistics."""
+    requests = _metrics["requests"]
+    ordered = sorted(_latencies)
+
+    def percentile(p: float) -> float:
+        return round(ordered[min(int(p * len(ordered)), len(ordered) - 1)], 4) if ordered else 0.0
+
+    return {
+        "requests": requests,
+        "errors": _metrics["errors"],
+        "connections_opened": _metrics["connections_opened"],
+        "connection_reuse_ratio": round(1 - _metrics["connections_opened"] / requests, 4) if requests else 0.0,
+        "http2": _http2_available(),
+        "latency_avg": round(_metrics["latency_sum"] / requests, 4) if requests else 0.0,
+        "latency_p50": percentile(0.5),
+        "latency_p95": percentile(0.95),
+        "latency_max": round(_metrics["latency_max"], 4),
+    }
@@ -0,0 +1,141 @@
+"""
+Batch search fan-out across platforms and queries.
+Runs many scrape_leads calls concurrently (as asyncio tasks) with a
+parallelism cap, then merges and deduplicates the results. Actor runs take
+the same per-platform rate limits as every other scrape (limiter.py).
+"""
+import asyncio
+import logging
+import os
+from typing import Callable, Dict, List, Optional
+
+import limiter
+from identity import lead_identity
+from scraper import scrape_leads
+
+logger = logging.getLogger(__name__)
+
+
+# Defaults (override via environment)
+DEFAULT_PARALLELISM = int(os.getenv("BATCH_PARALLELISM", "4"))
+MAX_BATCH_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "500"))
+
+
+def _platform_key(platform: str) -> str:
+    """Normalize platform aliases (twitter -> x)."""
+    platform = platform.lower()
+    return "x" if platform == "twitter" else platform
+
+
+def build_queries_from_audience(config: Dict, platforms: Optional[List[str]] = None) -> List[Dict]:
+    """Expand the audience config (industries x roles x regions x platforms) into queries.
+
+    Roles only apply to LinkedIn; X searches are keyword + region.
+    """
+    industries = config.get("industries") or [""]
+    roles = config.get("roles") or [""]
+    regions = config.get("regions") or [""]
+    platforms = platforms or config.get("platforms") or ["linkedin"]
+
+    queries = []
+    seen = set()
+    for platform in platforms:
+        platform = _platform_key(platform)
+        for industry in industries:
+            for region in regions:
+                for role in (roles if platform == "linkedin" else [""]):
+                    key = (platform, industry, role, region)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    queries.append({
+                        "keyword": industry,
+                        "position": role,
+                        "company": "",
+                        "location": region,
+                        "platform": platform,
+                    })
+    return queries
+
+
+def lead_dedupe_key(lead: Dict) -> str:
+    """Key used to merge the same lead found by different queries."""
+    identity = lead_identity(lead)
+    if identity:
+        return identity
+    return f"{lead.get('platform', '')}:{lead.get('name', '')}".lower()
+
+
+def merge_results(result_sets: List[List[Dict]]) -> List[Dict]:
+    """Merge result lists, keeping the first occurrence of each lead."""
+    merged = []
+    seen = set()
+    for results in result_sets:
+        for lead in results:
+            key = lead_dedupe_key(lead)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(lead)
+    return merged
+
+
+async def run_batch(
+    queries: List[Dict],
+    max_results: int = 20,
+    parallelism: int = DEFAULT_PARALLELISM,
+    scrape_fn: Callable = scrape_leads,
+) -> Dict:
+    """
+    Run all queries concurrently and return merged, deduplicated results.
+
+    Args:
+        queries: List of dicts with keyword, position, company, location, platform
+        max_results: Maximum results per query
+        parallelism: Maximum number of concurrent actor calls
+        scrape_fn: Async scrape function (defaults to scraper.scrape_leads)
+
+    Returns:
+        Dict with merged `results` and a per-query `queries` summary
+    """
+    if len(queries) > MAX_BATCH_QUERIES:
+        raise ValueError(f"Batch has {len(queries)} queries; the limit is {MAX_BATCH_QUERIES}")
+
+    semaphore = asyncio.Semaphore(max(1, parallelism))
+
+    async def run_one(query: Dict) -> List[Dict]:
+        async with semaphore:
+            while True:
+                try:
+                    return await scrape_fn(
+                        keyword=query.get("keyword", ""),
+                        location=query.get("location", ""),
+                        platform=query.get("platform", "linkedin"),
+                        max_results=max_results,
+                        position=query.get("position", ""),
+                        company=query.get("company", ""),
+                    )
+                except limiter.RateLimitedError as e:
+                    # The platform's shared token bucket is busy: wait for it rather than fail the query
+                    await asyncio.sleep(e.retry_after)
+
+    logger.info("📦 Starting batch search: %d queries, parallelism %d", len(queries), parallelism)
+    outcomes = await asyncio.gather(*(run_one(q) for q in queries), return_exceptions=True)
+
+    summary = []
+    for query, outcome in zip(queries, outcomes):
+        entry = {**query, "count": 0, "error": None}
+        if isinstance(outcome, BaseException):
+            logger.warning("❌ Batch query failed (%s): %s", query, outcome)
+            entry["error"] = str(outcome)
+        else:
+            entry["count"] = len(outcome)
+        summary.append(entry)
+
+    # Merge in query order so results are deterministic regardless of completion order
+    results = merge_results([o for o in outcomes if not isinstance(o, BaseException)])
+    logger.info("✅ Batch search completed: %d unique results", len(results))
+    return {
+        "results": results,
+        "queries": summary,
+    }
@@ -0,0 +1,168 @@
+"""
+Persistent query-result cache (SQLite) for scrape results.
+Keyed by platform + the normalized query string sent to the Apify actor,
+with TTL expiry and size-based LRU eviction.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import metrics
+from database import DATA_DIR
+
+CACHE_FILE = DATA_DIR / "cache.db"
+
+# Cache limits (override via environment)
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", str(6 * 60 * 60)))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1") not in ("0", "false", "False")
+
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+
+def _connect() -> sqlite3.Connection:
+    """Open (once) the cache database and create its schema."""
+    global _conn
+    if _conn is None:
+        DATA_DIR.mkdir(exist_ok=True, parents=True)
+        _conn = sqlite3.connect(str(CACHE_FILE), check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS query_cache (
+                key TEXT PRIMARY KEY,
+                platform TEXT NOT NULL,
+                query TEXT NOT NULL,
+                max_results INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_query_cache_last_access ON query_cache(last_access)")
+        _conn.commit()
+    return _conn
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so equivalent queries share a key."""
+    return " ".join(query.lower().split())
+
+
+def make_key(platform: str, query: str) -> str:
+    """Build the cache key for a platform + actor query string."""
+    platform = platform.lower()
+    if platform == "twitter":
+        platform = "x"
+    return f"{platform}|{normalize_query(query)}"
+
+
+def get(key: str, max_results: int) -> Optional[List[Dict]]:
+    """Return cached results for key, or None on miss/expiry.
+
+    An entry only satisfies requests for at most as many results as it was
+    stored with (unless the actor returned fewer than were asked for).
+    """
+    if not CACHE_ENABLED:
+        return None
+    now = time.time()
+    with _lock:
+        conn = _connect()
+        row = conn.execute(
+            "SELECT payload, max_results, created_at FROM query_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            _stats["misses"] += 1
+            metrics.CACHE_LOOKUPS.inc(result="miss")
+            return None
+
+        payload, stored_max, created_at = row
+        if now - created_at > CACHE_TTL_SECONDS:
+            conn.execute("DELETE FROM query_cache WHERE key = ?", (key,))
+            conn.commit()
+            _stats["expired"] += 1
+            _stats["misses"] += 1
+            metrics.CACHE_LOOKUPS.inc(result="miss")
+            return None
+
+        results = json.loads(payload)
+        if stored_max < max_results and len(results) >= stored_max:
+            # Cached run was smaller than this request and may have been truncated
+            _stats["misses"] += 1
+            metrics.CACHE_LOOKUPS.inc(result="miss")
+            return None
+
+        conn.execute("UPDATE query_cache SET last_access = ? WHERE key = ?", (now, key))
+        conn.commit()
+        _stats["hits"] += 1
+    metrics.CACHE_LOOKUPS.inc(result="hit")
+    return results[:max_results]
+
+
+def put(key: str, max_results: int, results: List[Dict]):
+    """Store results under key, evicting least-recently-used entries if over budget."""
+    if not CACHE_ENABLED:
+        return
+    payload = json.dumps(results)
+    platform, _, query = key.partition("|")
+    now = time.time()
+    with _lock, metrics.STORAGE_WRITE_SECONDS.time(op="cache_put"):
+        conn = _connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO query_cache "
+            "(key, platform, query, max_results, payload, size, created_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, platform, query, max_results, payload, len(payload), now, now)
+        )
+        _stats["stores"] += 1
+        _evict(conn)
+        conn.commit()
+
+
+def _evict(conn: sqlite3.Connection):
+    """Drop expired entries, then LRU entries until under CACHE_MAX_BYTES."""
+    cur = conn.execute("DELETE FROM query_cache WHERE created_at < ?", (time.time() - CACHE_TTL_SECONDS,))
+    _stats["expired"] += cur.rowcount
+
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM query_cache").fetchone()[0]
+    if total <= CACHE_MAX_BYTES:
+        return
+    for key, size in conn.execute("SELECT key, size FROM query_cache ORDER BY last_access").fetchall():
+        if total <= CACHE_MAX_BYTES:
+            break
+        conn.execute("DELETE FROM query_cache WHERE key = ?", (key,))
+        total -= size
+        _stats["evictions"] += 1
+
+
+def clear() -> int:
+    """Remove every cached entry. Returns the number removed."""
+    with _lock:
+        conn = _connect()
+        cur = conn.execute("DELETE FROM query_cache")
+        conn.commit()
+        return cur.rowcount
+
+
+def get_stats() -> Dict:
+    """Get hit/miss counters and current cache size."""
+    with _lock:
+        entries, size = _connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM query_cache"
+        ).fetchone()
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+        "entries": entries,
+        "size_bytes": size,
+        "max_bytes": CACHE_MAX_BYTES,
+        "ttl_seconds": CACHE_TTL_SECONDS,
+        "enabled": CACHE_ENABLED,
+    }
@@ -0,0 +1,236 @@
+"""
+Apify cost ledger and budget admission control.
+Every actor run is recorded in the `cost_ledger` table with the items it
+returned, the compute units and platform usage Apify reports, and its cost
+under config/pricing.yaml. Before an actor run starts, its cost is estimated
+from the platform price and the number of items requested; the run is
+rejected if it would push today's spend (plus runs in flight) over
+DAILY_BUDGET_USD.
+"""
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import database as db
+import metrics
+import payloads
+
+# Daily spend limit in USD (0 = unlimited)
+DAILY_BUDGET_USD = float(os.getenv("DAILY_BUDGET_USD", "0"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cost_ledger (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    day TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    actor TEXT NOT NULL,
+    run_id TEXT,
+    status TEXT,
+    items INTEGER NOT NULL,
+    compute_units REAL NOT NULL,
+    usage_usd REAL NOT NULL,
+    price_per_result REAL NOT NULL,
+    estimated_usd REAL NOT NULL,
+    cost_usd REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cost_ledger_day ON cost_ledger(day, platform);
+"""
+
+_lock = threading.Lock()
+_schema_ready = False
+# Estimated cost of admitted runs that have not been recorded yet
+_reserved: Dict[str, float] = {}
+# Today's recorded spend, loaded from the ledger on first use
+_spent = {"day": "", "usd": 0.0}
+
+
+class BudgetExceededError(Exception):
+    """Raised when a scrape's estimated cost would exceed the daily budget."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _connect():
+    """Get the shared connection, creating the ledger table on first use."""
+    global _schema_ready
+    conn = db.get_connection()
+    if not _schema_ready:
+        with db._lock:
+            conn.executescript(SCHEMA)
+        _schema_ready = True
+    return conn
+
+
+def _today() -> str:
+    return datetime.now().date().isoformat()
+
+
+def _seconds_until_tomorrow() -> float:
+    now = datetime.now()
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return (tomorrow - now).total_seconds()
+
+
+def price_per_result(platform: str) -> float:
+    """USD per dataset item for a platform (config/pricing.yaml)."""
+    platforms = payloads.pricing.data().get("platforms") or {}
+    return float((platforms.get(platform.lower()) or {}).get("price_per_result", 0.0))
+
+
+def estimate(platform: str, items: int) -> float:
+    """Estimated cost of an actor run asked for `items` results."""
+    return round(items * price_per_result(platform), 6)
+
+
+def spent_today() -> float:
+    """USD recorded in the ledger today."""
+    day = _today()
+    with _lock:
+        if _spent["day"] != day:
+            with db._lock:
+                row = _connect().execute(
+                    "SELECT COALESCE(SUM(cost_usd), 0) FROM cost_ledger WHERE day = ?", (day,)
+                ).fetchone()
+            _spent.update(day=day, usd=row[0])
+        return _spent["usd"]
+
+
+def _check(platform: str, cost: float):
+    """Raise BudgetExceededError if `cost` doesn't fit in what is left of today's budget."""
+    if not DAILY_BUDGET_USD:
+        return
+    committed = spent_today() + sum(_reserved.values())
+    if committed + cost > DAILY_BUDGET_USD:
+        raise BudgetExceededError(
+            f"Daily budget of ${DAILY_BUDGET_USD:.2f} would be exceeded: ${committed:.2f} spent or "
+            f"committed, this {platform} scrape is estimated at ${cost:.2f}",
+            retry_after=_seconds_until_tomorrow()
+        )
+
+
+def check(platform: str, items: int):
+    """Pre-flight budget check for a scrape (nothing is reserved)."""
+    _check(platform, estimate(platform, items))
+
+
+def can_afford(platform: str, items: int) -> bool:
+    """Whether an actor run for `items` results currently fits the budget."""
+    try:
+        check(platform, items)
+    except BudgetExceededError:
+        return False
+    return True
+
+
+def admit(platform: str, items: int) -> str:
+    """Reserve an actor run's estimated cost against the budget; returns a reservation ID.
+
+    Raises BudgetExceededError if it doesn't fit.
+    """
+    cost = estimate(platform, items)
+    _check(platform, cost)
+    reservation = uuid.uuid4().hex
+    _reserved[reservation] = cost
+    return reservation
+
+
+def release(reservation: Optional[str]):
+    """Drop a reservation (safe to call more than once)."""
+    if reservation:
+        _reserved.pop(reservation, None)
+
+
+def record_run(platform: str, actor: str, run: Dict, items: int, reservation: Optional[str] = None) -> Dict:
+    """Add a finished (or aborted) actor run to the ledger and release its reservation."""
+    pricing = payloads.pricing.data()
+    unit_price = price_per_result(platform)
+    stats = run.get("stats") or {}
+    compute_units = float(stats.get("computeUnits") or 0.0)
+    usage_usd = float(run.get("usageTotalUsd") or 0.0) or compute_units * float(pricing.get("compute_unit_usd", 0.0))
+    entry = {
+        "created_at": datetime.now().isoformat(),
+        "day": _today(),
+        "platform": platform,
+        "actor": actor,
+        "run_id": run.get("id"),
+        "status": run.get("status"),
+        "items": items,
+        "compute_units": compute_units,
+        "usage_usd": round(usage_usd, 6),
+        "price_per_result": unit_price,
+        "estimated_usd": _reserved.get(reservation or "", 0.0),
+        "cost_usd": round(items * unit_price + usage_usd, 6),
+    }
+    spent_today()  # load today's total before this run is in the table
+    with db._lock, metrics.STORAGE_WRITE_SECONDS.time(op="cost_ledger"):
+        conn = _connect()
+        with conn:
+            conn.execute(
+                f"INSERT INTO cost_ledger ({', '.join(entry)}) VALUES ({', '.join('?' * len(entry))})",
+                tuple(entry.values())
+            )
+    with _lock:
+        if _spent["day"] == entry["day"]:
+            _spent["usd"] += entry["cost_usd"]
+    release(reservation)
+    metrics.APIFY_COST_USD.inc(entry["cost_usd"], platform=platform)
+    return entry
+
+
+def get_summary(days: int = 30, recent: int = 20) -> Dict:
+    """Live spend: today vs budget, per-platform and per-day totals, and the latest runs."""
+    since = (datetime.now().date() - timedelta(days=days - 1)).isoformat()
+    with db._lock:
+        conn = _connect()
+        daily = conn.execute(
+            "SELECT day, platform, COUNT(*), SUM(items), SUM(compute_units), SUM(cost_usd) "
+            "FROM cost_ledger WHERE day >= ? GROUP BY day, platform ORDER BY day", (since,)
+        ).fetchall()
+        rows = conn.execute(
+            "SELECT created_at, platform, run_id, status, items, compute_units, estimated_usd, cost_usd "
+            "FROM cost_ledger ORDER BY id DESC LIMIT ?", (recent,)
+        ).fetchall()
+
+    today = _today()
+    spent = spent_today()
+    reserved = sum(_reserved.values())
+    by_day: Dict[str, float] = {}
+    platforms: Dict[str, Dict] = {}
+    for day, platform, runs, items, compute_units, cost in daily:
+        by_day[day] = round(by_day.get(day, 0.0) + cost, 6)
+        totals = platforms.setdefault(platform, {"runs": 0, "items": 0, "compute_units": 0.0,
+                                                 "cost_usd": 0.0, "today_usd": 0.0})
+        totals["runs"] += runs
+        totals["items"] += items
+        totals["compute_units"] = round(totals["compute_units"] + compute_units, 4)
+        totals["cost_usd"] = round(totals["cost_usd"] + cost, 6)
+        if day == today:
+            totals["today_usd"] = round(cost, 6)
+    for platform, totals in platforms.items():
+        totals["cost_per_item"] = round(totals["cost_usd"] / totals["items"], 6) if totals["items"] else 0.0
+
+    recent_runs: List[Dict] = [
+        dict(zip(("created_at", "platform", "run_id", "status", "items", "compute_units",
+                  "estimated_usd", "cost_usd"), row))
+        for row in rows
+    ]
+    return {
+        "today": {
+            "spent_usd": round(spent, 6),
+            "reserved_usd": round(reserved, 6),
+            "budget_usd": DAILY_BUDGET_USD or None,
+            "remaining_usd": round(DAILY_BUDGET_USD - spent - reserved, 6) if DAILY_BUDGET_USD else None,
+        },
+        "window_days": days,
+        "total_usd": round(sum(by_day.values()), 6),
+        "by_day": by_day,
+        "platforms": platforms,
+        "pricing": {platform: price_per_result(platform)
+                    for platform in (payloads.pricing.data().get("platforms") or {})},
+        "recent_runs": recent_runs,
+    }
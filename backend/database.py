@@ -1,34 +1,117 @@
 """
-In-memory + JSON file storage for search history and saved leads.
+SQLite storage for search history and saved leads.
+
+Uses a single WAL-mode database (data/outreach.db) with one row per lead or
+history entry, so each write is a single-row insert/delete instead of a
+whole-file rewrite. Legacy data/*.json files are migrated on first start.
+Saved leads are full-text indexed (FTS5, kept current by triggers), keyed
+on the explicit integer key `seq`, which VACUUM can't renumber.
 """
 import json
+import logging
 import os
+import re
+import sqlite3
+import threading
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterable, Iterator, List, Dict, Optional
 from pathlib import Path
 
-# Use /tmp for Vercel serverless (read-only filesystem)
-DATA_DIR = Path("/tmp/data") if os.environ.get("VERCEL") else Path(__file__).parent.parent / "data"
+import metrics
+from identity import lead_identity
+
+logger = logging.getLogger(__name__)
+
+# Use /tmp for Vercel serverless (read-only filesystem); DATA_DIR overrides both
+DATA_DIR = Path(os.environ.get("DATA_DIR") or (
+    "/tmp/data" if os.environ.get("VERCEL") else Path(__file__).parent.parent / "data"
+))
+DB_FILE = DATA_DIR / "outreach.db"
+
+# Legacy JSON files (migrated into the database on first start)
 HISTORY_FILE = DATA_DIR / "history.json"
 LEADS_FILE = DATA_DIR / "leads.json"
 
-# In-memory storage
-_history: List[Dict] = []
-_leads: List[Dict] = []
-_current_results: List[Dict] = []
+LEADS_TABLE = """
+CREATE TABLE IF NOT EXISTS leads (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    platform TEXT,
+    contact_link TEXT,
+    saved_at TEXT NOT NULL,
+    data TEXT NOT NULL,
+    identity TEXT,
+    name TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+    role TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+    followers INTEGER NOT NULL DEFAULT 0
+)"""
+
+SCHEMA = LEADS_TABLE + """;
+CREATE INDEX IF NOT EXISTS idx_leads_platform_nocase ON leads(platform COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_leads_contact_link ON leads(contact_link);
+CREATE INDEX IF NOT EXISTS idx_leads_saved_at ON leads(saved_at);
+
+CREATE TABLE IF NOT EXISTS history (
+    id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history(timestamp);
+
+CREATE TABLE IF NOT EXISTS seen_identities (
+    identity TEXT PRIMARY KEY,
+    platform TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 1
+) WITHOUT ROWID;
+"""
+
+# Full-text search: indexed lead fields, their bm25 weights (a name hit
+# outranks a bio hit) and the tokenizer shared by the lead and run-result indexes
+FTS_COLUMNS = ("name", "role", "company", "headline", "bio", "region", "notes")
+FTS_WEIGHTS = (10.0, 4.0, 4.0, 3.0, 1.0, 2.0, 1.0)
+FTS_OPTIONS = "tokenize = 'unicode61 remove_diacritics 2'"
+_FTS_TOKEN = re.compile(r"\w+")
+
+
+def fts_values(data: str) -> str:
+    """SQL expressions extracting the indexed fields from a JSON lead column."""
+    return ", ".join(f"COALESCE(json_extract({data}, '$.{column}'), '')" for column in FTS_COLUMNS)
+
+
+LEADS_FTS_TRIGGERS = ("leads_fts_insert", "leads_fts_delete", "leads_fts_update")
+LEADS_FTS_SCHEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS leads_fts USING fts5({", ".join(FTS_COLUMNS)}, {FTS_OPTIONS});
+CREATE TRIGGER IF NOT EXISTS leads_fts_insert AFTER INSERT ON leads BEGIN
+    INSERT INTO leads_fts (rowid, {", ".join(FTS_COLUMNS)}) VALUES (NEW.seq, {fts_values("NEW.data")});
+END;
+CREATE TRIGGER IF NOT EXISTS leads_fts_delete AFTER DELETE ON leads BEGIN
+    DELETE FROM leads_fts WHERE rowid = OLD.seq;
+END;
+CREATE TRIGGER IF NOT EXISTS leads_fts_update AFTER UPDATE OF data ON leads BEGIN
+    DELETE FROM leads_fts WHERE rowid = OLD.seq;
+    INSERT INTO leads_fts (rowid, {", ".join(FTS_COLUMNS)}) VALUES (NEW.seq, {fts_values("NEW.data")});
+END;
+"""
+
+# Shared connection (serialized by _lock; sqlite3 objects are not thread-safe)
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.RLock()
 
 
-def _ensure_data_dir():
+def _ensure_data_dir() -> bool:
     """Create data directory if it doesn't exist."""
     try:
         DATA_DIR.mkdir(exist_ok=True, parents=True)
+        return True
     except OSError:
         # If we can't create directory, use in-memory only
-        pass
+        return False
 
 
 def _load_json_file(file_path: Path) -> List[Dict]:
-    """Load data from JSON file."""
+    """Load data from a legacy JSON file."""
     if file_path.exists():
         try:
             with open(file_path, 'r') as f:
@@ -38,25 +121,170 @@ def _load_json_file(file_path: Path) -> List[Dict]:
     return []
 
 
-def _save_json_file(file_path: Path, data: List[Dict]):
-    """Save data to JSON file."""
-    _ensure_data_dir()
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=2)
+def get_connection() -> sqlite3.Connection:
+    """Get the shared database connection, opening it on first use."""
+    global _conn
+    with _lock:
+        if _conn is None:
+            path = str(DB_FILE) if _ensure_data_dir() else ":memory:"
+            _conn = sqlite3.connect(path, check_same_thread=False)
+            _conn.execute("PRAGMA journal_mode=WAL")
+            _conn.execute("PRAGMA synchronous=NORMAL")
+            _conn.executescript(SCHEMA)
+            _migrate_schema(_conn)
+        return _conn
+
+
+# Columns added after the first release: (name, definition)
+_LEAD_COLUMNS = [
+    ("identity", "TEXT"),
+    ("name", "TEXT NOT NULL DEFAULT '' COLLATE NOCASE"),
+    ("role", "TEXT NOT NULL DEFAULT '' COLLATE NOCASE"),
+    ("followers", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+# Sortable lead columns and their SQL expressions
+LEAD_SORT_COLUMNS = {
+    "name": "name",
+    "platform": "platform",
+    "role": "role",
+    "followers": "followers",
+    "saved_at": "saved_at",
+    # Audience fit score set when the lead was scraped (not indexed)
+    "score": "COALESCE(json_extract(data, '$.score'), 0)",
+}
+
+
+def _lead_columns(lead: Dict) -> tuple:
+    """Values for the indexed columns derived from a lead's data."""
+    return (
+        lead_identity(lead),
+        lead.get("name") or "",
+        lead.get("role") or "",
+        int(lead.get("followers") or 0),
+    )
+
+
+def add_seq_key(conn: sqlite3.Connection, table: str, create_sql: str, triggers: Iterable[str]):
+    """Rebuild a table keyed by a TEXT id with an explicit INTEGER PRIMARY KEY `seq`.
+
+    Implicit rowids may change on VACUUM; `seq` takes each row's current
+    rowid, so full-text index rows keyed on it stay valid. The given triggers
+    (which refer to the table) are dropped for the caller to recreate.
+    """
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    if not columns or "seq" in columns:
+        return
+    names = ", ".join(columns)
+    conn.execute("BEGIN")
+    try:
+        for trigger in triggers:
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        conn.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+        conn.execute(create_sql)
+        conn.execute(f"INSERT INTO {table} (seq, {names}) SELECT rowid, {names} FROM {table}_old")
+        conn.execute(f"DROP TABLE {table}_old")
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    logger.info("📦 Added an explicit seq key to %s", table)
+
+
+def _migrate_schema(conn: sqlite3.Connection):
+    """Add columns introduced after a database was first created."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(leads)")}
+    missing = [(name, definition) for name, definition in _LEAD_COLUMNS if name not in columns]
+    if missing:
+        with conn:
+            for name, definition in missing:
+                conn.execute(f"ALTER TABLE leads ADD COLUMN {name} {definition}")
+            for lead_id, data in conn.execute("SELECT id, data FROM leads").fetchall():
+                conn.execute("UPDATE leads SET identity = ?, name = ?, role = ?, followers = ? WHERE id = ?",
+                             (*_lead_columns(json.loads(data)), lead_id))
+    if "seq" not in columns:
+        add_seq_key(conn, "leads", LEADS_TABLE, LEADS_FTS_TRIGGERS)
+        conn.executescript(SCHEMA)  # the rebuilt table's indexes
+    conn.execute("DROP INDEX IF EXISTS idx_leads_platform")  # replaced by the NOCASE index
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_leads_identity ON leads(identity)")
+    for column in ("name", "role", "followers"):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_leads_{column} ON leads({column})")
+    create_fts_index(conn, "leads_fts", LEADS_FTS_SCHEMA,
+                     f"SELECT seq, {fts_values('data')} FROM leads")
+
+
+def create_fts_index(conn: sqlite3.Connection, table: str, schema: str, backfill: str):
+    """Create a full-text index and its triggers, filling it from `backfill` the first time."""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (table,)).fetchone()
+    conn.executescript(schema)
+    if not exists:
+        with conn:
+            conn.execute(f"INSERT INTO {table} (rowid, {', '.join(FTS_COLUMNS)}) {backfill}")
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix."""
+    terms = [f'"{token}"' for token in _FTS_TOKEN.findall(text or "")]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _migrate_json_files(conn: sqlite3.Connection):
+    """Import legacy history.json/leads.json into empty tables, then rename them."""
+    for file_path, table in ((LEADS_FILE, "leads"), (HISTORY_FILE, "history")):
+        if not file_path.exists():
+            continue
+        if conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]:
+            continue
+
+        rows = _load_json_file(file_path)
+        # Files are most-recent-first; insert oldest first so seq follows recency
+        with conn:
+            for row in reversed(rows):
+                if table == "leads":
+                    _insert_lead(conn, row)
+                else:
+                    _insert_history(conn, row)
+        try:
+            file_path.rename(file_path.with_suffix(".json.migrated"))
+        except OSError:
+            pass
+        logger.info("📦 Migrated %d %s from %s", len(rows), table, file_path.name)
 
 
 def initialize():
-    """Initialize database by loading existing data."""
-    global _history, _leads
-    _ensure_data_dir()
-    _history = _load_json_file(HISTORY_FILE)
-    _leads = _load_json_file(LEADS_FILE)
+    """Initialize database: open the connection and migrate legacy JSON data."""
+    with _lock:
+        _migrate_json_files(get_connection())
+
+
+def _insert_history(conn: sqlite3.Connection, entry: Dict):
+    conn.execute(
+        "INSERT OR IGNORE INTO history (id, timestamp, data) VALUES (?, ?, ?)",
+        (entry["id"], entry.get("timestamp", ""), json.dumps(entry))
+    )
+
+
+def _insert_lead(conn: sqlite3.Connection, lead: Dict) -> bool:
+    cur = conn.execute(
+        "INSERT OR IGNORE INTO leads "
+        "(id, platform, contact_link, saved_at, data, identity, name, role, followers) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (lead.get("id"), lead.get("platform") or "", lead.get("contact_link"),
+         lead.get("saved_at", ""), json.dumps(lead), *_lead_columns(lead))
+    )
+    return cur.rowcount > 0
 
 
 # Search History Functions
 def get_history() -> List[Dict]:
     """Get all search history."""
-    return _history
+    with _lock:
+        rows = get_connection().execute(
+            "SELECT data FROM history ORDER BY timestamp DESC, rowid DESC"
+        ).fetchall()
+    return [json.loads(data) for (data,) in rows]
 
 
 def add_history(search_params: Dict) -> Dict:
@@ -67,52 +295,195 @@ def add_history(search_params: Dict) -> Dict:
         "params": search_params,
         "result_count": search_params.get("result_count", 0)
     }
-    _history.insert(0, history_entry)  # Most recent first
-    _save_json_file(HISTORY_FILE, _history)
+    with _lock, metrics.STORAGE_WRITE_SECONDS.time(op="add_history"):
+        conn = get_connection()
+        with conn:
+            _insert_history(conn, history_entry)
     return history_entry
 
 
 # Saved Leads Functions
 def get_leads() -> List[Dict]:
-    """Get all saved leads."""
-    return _leads
+    """Get all saved leads, newest first (query_leads without a page limit)."""
+    return query_leads()["items"]
+
+
+def query_leads(
+    limit: Optional[int] = None,
+    after: Optional[Dict] = None,
+    sort: str = "saved_at",
+    descending: bool = True,
+    platform: Optional[str] = None,
+    region: Optional[str] = None,
+    min_followers: Optional[int] = None,
+) -> Dict:
+    """Page through saved leads using indexed columns.
+
+    Uses keyset pagination: `after` is {"value", "seq"} of the last row of the
+    previous page. Returns {"total", "items", "next"} where next is the keyset
+    for the following page (or None). total is computed with COUNT(*) only.
+    """
+    column = LEAD_SORT_COLUMNS[sort]
+    where, params = [], []
+    if platform:
+        where.append("platform = ? COLLATE NOCASE")
+        params.append(platform)
+    if region:
+        # Region is not an indexed column; filter on the stored JSON
+        where.append("json_extract(data, '$.region') LIKE ?")
+        params.append(f"%{region}%")
+    if min_followers is not None:
+        where.append("followers >= ?")
+        params.append(min_followers)
+
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    op, direction = ("<", "DESC") if descending else (">", "ASC")
+
+    page_where, page_params = list(where), list(params)
+    if after:
+        page_where.append(f"({column} {op} ? OR ({column} = ? AND seq {op} ?))")
+        page_params.extend([after["value"], after["value"], after["seq"]])
+    page_sql = f"WHERE {' AND '.join(page_where)}" if page_where else ""
+
+    sql = (f"SELECT seq, {column}, data FROM leads {page_sql} "
+           f"ORDER BY {column} {direction}, seq {direction}")
+    if limit is not None:
+        sql += " LIMIT ?"
+        page_params.append(limit + 1)
+
+    with _lock:
+        conn = get_connection()
+        total = conn.execute(f"SELECT COUNT(*) FROM leads {where_sql}", params).fetchone()[0]
+        rows = conn.execute(sql, page_params).fetchall()
+
+    next_key = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_key = {"value": rows[-1][1], "seq": rows[-1][0]}
+    return {"total": total, "items": [json.loads(data) for _, _, data in rows], "next": next_key}
+
+
+def search_leads(query: str, limit: int = 20, offset: int = 0) -> Dict:
+    """Ranked full-text search over saved leads.
+
+    Returns {"total", "items"}; each item is {"lead", "score", "snippet"},
+    best match (highest score, i.e. negated bm25) first.
+    """
+    match = fts_query(query)
+    if not match:
+        return {"total": 0, "items": []}
+    weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+    with _lock:
+        conn = get_connection()
+        total = conn.execute("SELECT COUNT(*) FROM leads_fts WHERE leads_fts MATCH ?", (match,)).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT leads.data, bm25(leads_fts, {weights}) AS score, "
+            f"snippet(leads_fts, -1, '[', ']', '…', 12) "
+            f"FROM leads_fts JOIN leads ON leads.seq = leads_fts.rowid "
+            f"WHERE leads_fts MATCH ? ORDER BY score LIMIT ? OFFSET ?",
+            (match, limit, offset)
+        ).fetchall()
+    return {
+        "total": total,
+        "items": [{"lead": json.loads(data), "score": round(-score, 4), "snippet": snippet}
+                  for data, score, snippet in rows],
+    }
+
+
+def iter_all_leads(batch_size: int = 500) -> Iterator[Dict]:
+    """Yield every saved lead (newest first), reading batch_size rows at a time."""
+    after = None
+    while True:
+        page = query_leads(limit=batch_size, after=after)
+        yield from page["items"]
+        after = page["next"]
+        if after is None:
+            return
+
+
+def get_lead(lead_id: str) -> Optional[Dict]:
+    """Get a saved lead by ID."""
+    with _lock:
+        row = get_connection().execute("SELECT data FROM leads WHERE id = ?", (lead_id,)).fetchone()
+    return json.loads(row[0]) if row else None
 
 
 def add_lead(lead_data: Dict) -> Dict:
     """Add a lead to bookmarks."""
-    # Check if lead already exists
-    existing = next((l for l in _leads if l.get("id") == lead_data.get("id")), None)
-    if existing:
-        return existing
-
     lead_data["saved_at"] = datetime.now().isoformat()
-    _leads.insert(0, lead_data)
-    _save_json_file(LEADS_FILE, _leads)
+    identity = lead_identity(lead_data)
+    with _lock, metrics.STORAGE_WRITE_SECONDS.time(op="add_lead"):
+        conn = get_connection()
+        if identity:
+            # Same person saved before under a different (random) id
+            row = conn.execute("SELECT data FROM leads WHERE identity = ?", (identity,)).fetchone()
+            if row:
+                return json.loads(row[0])
+        with conn:
+            inserted = _insert_lead(conn, lead_data)
+        if not inserted:
+            # Lead already exists
+            return get_lead(lead_data.get("id"))
     return lead_data
 
 
 def delete_lead(lead_id: str) -> bool:
     """Remove a lead from bookmarks."""
-    global _leads
-    initial_count = len(_leads)
-    _leads = [l for l in _leads if l.get("id") != lead_id]
+    with _lock, metrics.STORAGE_WRITE_SECONDS.time(op="delete_lead"):
+        conn = get_connection()
+        with conn:
+            cur = conn.execute("DELETE FROM leads WHERE id = ?", (lead_id,))
+    return cur.rowcount > 0
 
-    if len(_leads) < initial_count:
-        _save_json_file(LEADS_FILE, _leads)
-        return True
-    return False
+
+# Identity Index Functions
+def get_identity_status(identities: Iterable[str]) -> Dict[str, Dict]:
+    """Look up which identities were seen in earlier runs or are saved as leads.
+
+    Returns {identity: {"seen_before": bool, "saved": bool}} for each identity.
+    """
+    identities = [i for i in dict.fromkeys(identities) if i]
+    status = {i: {"seen_before": False, "saved": False} for i in identities}
+    if not identities:
+        return status
+    with _lock:
+        conn = get_connection()
+        # Chunk to stay under SQLite's bound-parameter limit
+        for start in range(0, len(identities), 500):
+            chunk = identities[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for (identity,) in conn.execute(
+                f"SELECT identity FROM seen_identities WHERE identity IN ({marks})", chunk
+            ):
+                status[identity]["seen_before"] = True
+            for (identity,) in conn.execute(
+                f"SELECT identity FROM leads WHERE identity IN ({marks})", chunk
+            ):
+                status[identity]["saved"] = True
+    return status
 
 
-# Current Results Functions
-def set_current_results(results: List[Dict]):
-    """Store current search results."""
-    global _current_results
-    _current_results = results
+def record_seen(identities: Iterable[str], platform: str = ""):
+    """Record identities as seen (upserting last_seen and seen_count)."""
+    now = datetime.now().isoformat()
+    rows = [(i, platform, now, now) for i in dict.fromkeys(identities) if i]
+    if not rows:
+        return
+    with _lock, metrics.STORAGE_WRITE_SECONDS.time(op="record_seen"):
+        conn = get_connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO seen_identities (identity, platform, first_seen, last_seen) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(identity) DO UPDATE SET last_seen = excluded.last_seen, "
+                "seen_count = seen_count + 1",
+                rows
+            )
 
 
-def get_current_results() -> List[Dict]:
-    """Get current search results."""
-    return _current_results
+def count_seen_identities() -> int:
+    """Number of distinct identities seen across all runs."""
+    with _lock:
+        return get_connection().execute("SELECT COUNT(*) FROM seen_identities").fetchone()[0]
 
 
 # Initialize on module import
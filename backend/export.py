@@ -0,0 +1,164 @@
+"""
+Streaming export of leads as CSV, NDJSON, Parquet or Arrow.
+Rows are pulled from an iterator and encoded in small chunks, so an export
+never holds the whole file in memory. Parquet/Arrow need the optional
+pyarrow package.
+"""
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List
+
+# Lead schema (see docs/ARCHITECTURE.md "Result Schema")
+LEAD_FIELDS = [
+    "id", "name", "role", "company", "platform", "contact_link",
+    "region", "notes", "followers", "verified", "industry",
+    "headline", "bio", "email", "website", "saved_at", "score",
+]
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+
+# Rows encoded per yielded chunk (CSV/NDJSON) or per row group (Parquet/Arrow)
+CHUNK_ROWS = 500
+
+
+class ExportError(ValueError):
+    """Raised for unsupported formats or a missing optional dependency."""
+
+
+def _chunks(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_csv(rows: Iterable[Dict], fields: List[str] = LEAD_FIELDS) -> Iterator[bytes]:
+    """Yield CSV bytes: the header, then one chunk per CHUNK_ROWS rows."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    for chunk in _chunks(rows, CHUNK_ROWS):
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_ndjson(rows: Iterable[Dict], fields: List[str] = LEAD_FIELDS) -> Iterator[bytes]:
+    """Yield newline-delimited JSON, one object per lead."""
+    for chunk in _chunks(rows, CHUNK_ROWS):
+        yield "".join(
+            json.dumps({k: row.get(k) for k in fields if k in row}) + "\n" for row in chunk
+        ).encode("utf-8")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise ExportError("Parquet/Arrow export requires the 'pyarrow' package")
+
+
+def _arrow_schema(pa, fields: List[str]):
+    types = {"followers": pa.int64(), "verified": pa.bool_(), "score": pa.float64()}
+    return pa.schema([(f, types.get(f, pa.string())) for f in fields])
+
+
+def _arrow_batch(pa, schema, chunk: List[Dict]):
+    columns = []
+    for field in schema:
+        values = [row.get(field.name) for row in chunk]
+        if pa.types.is_string(field.type):
+            values = [None if v is None else str(v) for v in values]
+        elif pa.types.is_integer(field.type):
+            values = [int(v) if v not in (None, "") else None for v in values]
+        elif pa.types.is_floating(field.type):
+            values = [float(v) if v not in (None, "") else None for v in values]
+        elif pa.types.is_boolean(field.type):
+            values = [bool(v) if v is not None else None for v in values]
+        columns.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each row group."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def iter_parquet(rows: Iterable[Dict], fields: List[str] = LEAD_FIELDS) -> Iterator[bytes]:
+    """Yield a Parquet file, writing one row group per CHUNK_ROWS rows."""
+    pa = _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(pa, fields)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    for chunk in _chunks(rows, CHUNK_ROWS):
+        writer.write_batch(_arrow_batch(pa, schema, chunk))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def iter_arrow(rows: Iterable[Dict], fields: List[str] = LEAD_FIELDS) -> Iterator[bytes]:
+    """Yield an Arrow IPC stream, one record batch per CHUNK_ROWS rows."""
+    pa = _require_pyarrow()
+
+    schema = _arrow_schema(pa, fields)
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    for chunk in _chunks(rows, CHUNK_ROWS):
+        writer.write_batch(_arrow_batch(pa, schema, chunk))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+_ENCODERS = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+    "parquet": iter_parquet,
+    "arrow": iter_arrow,
+}
+
+
+def stream_export(rows: Iterable[Dict], fmt: str, fields: List[str] = LEAD_FIELDS) -> Iterator[bytes]:
+    """Return a byte iterator encoding rows in the requested format."""
+    if fmt not in _ENCODERS:
+        raise ExportError(f"format must be one of: {', '.join(_ENCODERS)}")
+    if fmt in ("parquet", "arrow"):
+        _require_pyarrow()
+    return _ENCODERS[fmt](rows, fields)
@@ -0,0 +1,205 @@
+"""
+Lead field extraction for LinkedIn (Exa) results.
+Fills role, company and region from a lead's headline and bio. The place
+gazetteer (config/gazetteer.yaml, seeded by the `regions` listed in
+config/audience.yaml) is compiled into a prefix-trie regex and combined with
+the "Title at Company" pattern, so each lead costs one scan over its text.
+"""
+import re
+import threading
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import yaml
+
+import payloads
+
+CONFIG_DIR = Path(__file__).parent.parent / "config"
+GAZETTEER_PATH = CONFIG_DIR / "gazetteer.yaml"
+
+# A capitalised word (or number) in a job title or company name, and the
+# lowercase connectors allowed between such words ("Head of Growth")
+_WORD = r"[A-Z0-9ÄÖÜ][\w'&+./-]*"
+_JOIN = r"(?:of|and|for|the|&|de|der|und|für)"
+_PHRASE = rf"{_WORD}(?: (?:{_WORD}|{_JOIN})){{0,5}}"
+_AT = r"(?:\s+(?:at|bei)\s+|\s*@\s*)"
+
+# The title is read backwards from an "at": the capitalised phrase ending
+# right before it, within the same clause and at most TITLE_WINDOW chars back
+_TITLE_BEFORE = re.compile(rf"(?<!\w){_PHRASE}$")
+_CLAUSE_BREAK = re.compile(r"[|.,;:!?\n•·()]")
+TITLE_WINDOW = 80
+
+# Separators between the parts of an Exa title ("Name | Headline - LinkedIn")
+_TITLE_SEPARATORS = re.compile(r"\s+[|–—-]\s+|\s*\|\s*")
+_TRAILING_JOINS = re.compile(rf"(?: {_JOIN})+$")
+# A company name ends at a full stop ("at Spree Robotics. Based in Berlin")
+_SENTENCE_END = re.compile(r"\.\s")
+# "Previously CTO at X" describes a past job, not the current one
+_PAST_ROLE = re.compile(r"(?:Previously|Formerly|Former|Ex)\b")
+# Time adverbs that start a clause but aren't part of the title ("Now Head of Growth")
+_LEADING_ADVERBS = re.compile(r"(?:(?:Now|Currently|Today|Formerly|Previously)\s+)+")
+
+_lock = threading.Lock()
+_extractor: Optional["Extractor"] = None
+
+
+class Extraction(NamedTuple):
+    role: str
+    company: str
+    region: str
+    audience_region: str
+
+
+class Extractor:
+    """Compiled gazetteer + title/company matcher."""
+
+    def __init__(self, places: Dict[str, Tuple[str, str, str]]):
+        # places: name -> (city or "", country, audience region)
+        self.places = places
+        trie = _trie_pattern(places) or r"(?!x)x"
+        self.pattern = re.compile(
+            rf"{_AT}(?P<company>{_PHRASE})"
+            rf"|(?<!\w)(?P<place>{trie})\b"
+        )
+
+    def extract(self, headline: str, bio: str = "", default_region: str = "") -> Extraction:
+        """Extract role, company and region in a single pass over headline + bio.
+
+        A title found in the bio only replaces an empty headline; a headline
+        is kept as the role when it has no "Title at Company" of its own.
+        """
+        role = company = ""
+        city = country = audience_region = ""
+        text = f"{headline}\n{bio}"
+        for match in self.pattern.finditer(text):
+            place = match.group("place")
+            if place is None:
+                if not company:
+                    title = _title_before(text, match.start())
+                    if not _PAST_ROLE.match(title):
+                        if match.start() < len(headline) or not headline.strip():
+                            role = _LEADING_ADVERBS.sub("", title)
+                        company = _SENTENCE_END.split(match.group("company"), 1)[0]
+                        company = _TRAILING_JOINS.sub("", company).rstrip(".")
+            else:
+                place_city, place_country, place_region = self.places[place]
+                if not country or (place_city and not city and place_country == country):
+                    city, country, audience_region = place_city, place_country, place_region
+            if company and city:
+                break
+
+        if city:
+            region = f"{city}, {country}"
+        else:
+            region = country or default_region
+        return Extraction(role or headline, company, region, audience_region)
+
+
+def _title_before(text: str, end: int) -> str:
+    """The job title phrase ending at `end` (empty if there is none)."""
+    window = text[max(end - TITLE_WINDOW, 0):end]
+    breaks = [m.end() for m in _CLAUSE_BREAK.finditer(window)]
+    if breaks:
+        window = window[breaks[-1]:]
+    found = _TITLE_BEFORE.search(window.strip())
+    return found.group(0) if found else ""
+
+
+def _trie_pattern(names) -> str:
+    """Regex matching any of `names`, factored by common prefixes.
+
+    A flat alternation retries every name at each position; the trie fails
+    after one character for most positions.
+    """
+    trie: Dict = {}
+    for name in names:
+        node = trie
+        for char in name:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+
+    return build(trie)
+
+
+def split_headline(title: str, name: str = "") -> str:
+    """Headline part of an Exa result title: drop the person's name and a 'LinkedIn' suffix."""
+    parts = [part.strip() for part in _TITLE_SEPARATORS.split(title or "")]
+    return " | ".join(
+        part for part in parts
+        if part and part != name and part.lower() != "linkedin"
+    )
+
+
+def _audience_regions() -> list:
+    """Regions from the cached audience config (empty if there is no config)."""
+    try:
+        return list((payloads.audience.data() or {}).get("regions") or [])
+    except FileNotFoundError:
+        return []
+
+
+def _load_places(audience_regions: list) -> Dict[str, Tuple[str, str, str]]:
+    """Build the name -> (city, country, audience region) table.
+
+    Only gazetteer groups for the audience regions are used (all groups if
+    there are none); an audience region without a group is matched literally
+    as a place name.
+    """
+    gazetteer = {}
+    if GAZETTEER_PATH.exists():
+        with open(GAZETTEER_PATH, 'r') as f:
+            gazetteer = yaml.safe_load(f) or {}
+    groups = gazetteer.get("regions") or {}
+
+    if not audience_regions:
+        audience_regions = list(groups)
+
+    by_name = {name.lower(): name for name in groups}
+    places: Dict[str, Tuple[str, str, str]] = {}
+    for region in audience_regions:
+        group = groups.get(by_name.get(str(region).lower(), ""))
+        if group is None:
+            places.setdefault(str(region), ("", str(region), str(region)))
+            continue
+        for country, cities in group.items():
+            places.setdefault(country, ("", country, region))
+            for city in cities or []:
+                places.setdefault(city, (city, country, region))
+
+    for alias, canonical in (gazetteer.get("aliases") or {}).items():
+        if canonical in places:
+            places.setdefault(alias, places[canonical])
+    return places
+
+
+def get_extractor() -> Extractor:
+    """Get the compiled extractor (built on first use and after an audience config change)."""
+    global _extractor
+    # Read the config outside the lock: a changed file calls reload() from data()
+    regions = _audience_regions()
+    with _lock:
+        if _extractor is None:
+            _extractor = Extractor(_load_places(regions))
+        return _extractor
+
+
+def reload():
+    """Drop the compiled extractor so config files are re-read."""
+    global _extractor
+    with _lock:
+        _extractor = None
+
+
+def extract(headline: str, bio: str = "", default_region: str = "") -> Extraction:
+    """Extract role, company and region for one lead."""
+    return get_extractor().extract(headline, bio, default_region)
@@ -0,0 +1,131 @@
+"""
+Lead filtering stage.
+Rules are loaded from config/filters.yaml and compiled once, per platform and
+field, into a single alternation regex with one named group per rule. Each
+item then costs one regex search per field, and a match names the rule that
+dropped it. Per-rule hit counters show how many items each rule filters out.
+"""
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+import metrics
+
+FILTERS_PATH = Path(__file__).parent.parent / "config" / "filters.yaml"
+FIELDS = ("name", "headline", "bio")
+
+_lock = threading.Lock()
+_compiled: Dict[str, "CompiledFilter"] = {}
+_rules: Optional[List[Dict]] = None
+_hits: Counter = Counter()
+_checked: Counter = Counter()
+
+
+class CompiledFilter:
+    """All rules for one platform, compiled into one regex per field."""
+
+    def __init__(self, rules: List[Dict]):
+        self.rule_names: Dict[str, str] = {}
+        self.patterns: Dict[str, "re.Pattern"] = {}
+
+        alternatives: Dict[str, List[str]] = {field: [] for field in FIELDS}
+        for i, rule in enumerate(rules):
+            group = f"r{i}"
+            self.rule_names[group] = rule["name"]
+            if rule.get("type", "contains") == "contains":
+                body = "|".join(re.escape(p) for p in rule["patterns"])
+                body = f"(?i:{body})"
+            else:
+                body = "|".join(f"(?:{p})" for p in rule["patterns"])
+            for field in rule.get("fields", ["name"]):
+                alternatives[field].append(f"(?P<{group}>{body})")
+
+        for field, parts in alternatives.items():
+            if parts:
+                self.patterns[field] = re.compile("|".join(parts))
+
+    def match(self, name: str, headline: str = "", bio: str = "") -> Optional[str]:
+        """Return the name of the first rule matching the item, or None."""
+        values = {"name": name, "headline": headline, "bio": bio}
+        for field, pattern in self.patterns.items():
+            found = pattern.search(values[field] or "")
+            if found:
+                return self.rule_names[found.lastgroup]
+        return None
+
+
+def _load_rules() -> List[Dict]:
+    """Read rules from config/filters.yaml (empty list if missing)."""
+    if not FILTERS_PATH.exists():
+        return []
+    with open(FILTERS_PATH, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    rules = config.get("rules") or []
+    for rule in rules:
+        if not rule.get("name") or not rule.get("patterns"):
+            raise ValueError(f"Filter rule needs a name and patterns: {rule}")
+        unknown = set(rule.get("fields", ["name"])) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Filter rule {rule['name']} has unknown fields: {sorted(unknown)}")
+    return rules
+
+
+def get_filter(platform: str) -> CompiledFilter:
+    """Get the compiled filter for a platform (compiled on first use)."""
+    global _rules
+    platform = platform.lower()
+    with _lock:
+        if platform not in _compiled:
+            if _rules is None:
+                _rules = _load_rules()
+            applicable = [
+                rule for rule in _rules
+                if not rule.get("platforms") or platform in [p.lower() for p in rule["platforms"]]
+            ]
+            _compiled[platform] = CompiledFilter(applicable)
+        return _compiled[platform]
+
+
+def reload():
+    """Drop compiled filters so rules are re-read from the config file."""
+    global _rules
+    with _lock:
+        _rules = None
+        _compiled.clear()
+
+
+def classify_batch(platform: str, items: Iterable[Tuple[str, str, str]]) -> List[Optional[str]]:
+    """Classify a page of (name, headline, bio) tuples.
+
+    Returns the dropping rule name (or None to keep) for each item, and
+    updates the per-rule hit counters once for the whole page.
+    """
+    compiled = get_filter(platform)
+    reasons = [compiled.match(name, headline, bio) for name, headline, bio in items]
+    page_hits = Counter(r for r in reasons if r)
+    with _lock:
+        _checked[platform.lower()] += len(reasons)
+        _hits.update(page_hits)
+    for reason, count in page_hits.items():
+        metrics.LEAD_ITEMS.inc(count, platform=platform.lower(), outcome=reason)
+    return reasons
+
+
+def record_drop(reason: str, count: int = 1, platform: str = ""):
+    """Count an item dropped for a reason outside the rule set (e.g. missing name)."""
+    with _lock:
+        _hits[reason] += count
+    metrics.LEAD_ITEMS.inc(count, platform=platform.lower(), outcome=reason)
+
+
+def get_stats() -> Dict:
+    """Per-rule hit counters and items checked per platform."""
+    with _lock:
+        return {
+            "checked": dict(_checked),
+            "dropped": dict(_hits),
+        }
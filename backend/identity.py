@@ -0,0 +1,47 @@
+"""
+Canonical lead identities.
+Maps a lead to a stable key (LinkedIn slug, X username or normalized profile
+URL) so the same person scraped in different runs can be recognized.
+"""
+import re
+from typing import Dict, Optional
+from urllib.parse import unquote, urlsplit
+
+_LINKEDIN_SLUG = re.compile(r"linkedin\.com/in/([^/?#]+)", re.IGNORECASE)
+_X_USER = re.compile(r"(?:x|twitter)\.com/@?([A-Za-z0-9_]{1,15})(?:[/?#]|$)", re.IGNORECASE)
+
+
+def normalize_url(url: str) -> str:
+    """Lowercase host+path without scheme, www., query, fragment or trailing slash."""
+    url = (url or "").strip()
+    if not url:
+        return ""
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = unquote(parts.path).rstrip("/").lower()
+    return f"{host}{path}"
+
+
+def lead_identity(lead: Dict) -> Optional[str]:
+    """Return the canonical identity for a lead, or None if it has no usable key."""
+    link = lead.get("contact_link") or ""
+    platform = (lead.get("platform") or "").lower()
+
+    match = _LINKEDIN_SLUG.search(link)
+    if match:
+        return f"linkedin:{unquote(match.group(1)).lower()}"
+
+    match = _X_USER.search(link)
+    if match:
+        return f"x:{match.group(1).lower()}"
+    if platform in ("x", "twitter") and (lead.get("role") or "").startswith("@"):
+        return f"x:{lead['role'][1:].lower()}"
+
+    url = normalize_url(link)
+    if url:
+        return f"url:{url}"
+    return None
@@ -1,20 +1,63 @@
 """
 Async job manager for long-running scraping tasks.
 Stores jobs in memory (ephemeral on Vercel, but works for single session).
+
+Jobs are executed by a bounded pool of worker tasks that pull from a bounded
+queue. Runners are coroutine functions (the async scrape pipeline), each run
+as its own task on the event loop so it can be cancelled. Work that can't be a queued job (a streaming scrape)
+takes one of the same MAX_WORKERS run slots with worker_slot(), waiting
+alongside the queue and counting against its size.
 """
+import asyncio
+import os
+import time
 import uuid
-from typing import Dict, Optional
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional
 from datetime import datetime
 from enum import Enum
 
+import metrics
+
 class JobStatus(str, Enum):
     PENDING = "pending"
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no room for another job."""
+
+
+class JobCancelledError(Exception):
+    """Raised to waiters of a job that was cancelled."""
+
+
+# Worker pool limits (override via environment)
+MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "2"))
+MAX_QUEUE_SIZE = int(os.getenv("JOB_MAX_QUEUE_SIZE", "20"))
+MAX_FINISHED_JOBS = int(os.getenv("JOB_MAX_FINISHED", "200"))
+
+# In-memory job storage (insertion ordered so old jobs can be pruned)
+_jobs: "OrderedDict[str, Dict]" = OrderedDict()
 
-# In-memory job storage
-_jobs: Dict[str, Dict] = {}
+# Worker pool state
+_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+_futures: Dict[str, asyncio.Future] = {}
+_runners: Dict[str, Callable] = {}
+_enqueued_at: Dict[str, float] = {}
+_tasks: Dict[str, asyncio.Task] = {}
+# Exception each failed job raised, re-raised to waiters after its future is gone
+_exceptions: Dict[str, Exception] = {}
+# Run slots shared by workers and worker_slot() holders, and holders waiting for one
+_slots: Optional[asyncio.Semaphore] = None
+_slot_waiters = 0
 
 def create_job(params: Dict) -> str:
     """Create a new scraping job and return job ID."""
@@ -28,6 +71,7 @@ def create_job(params: Dict) -> str:
         "created_at": datetime.utcnow().isoformat(),
         "updated_at": datetime.utcnow().isoformat(),
     }
+    _prune_jobs()
     return job_id
 
 def get_job(job_id: str) -> Optional[Dict]:
@@ -55,3 +99,180 @@ def complete_job(job_id: str, results):
 def fail_job(job_id: str, error: str):
     """Mark job as failed with error."""
     update_job(job_id, JobStatus.FAILED, error=error)
+
+
+def _prune_jobs():
+    """Drop the oldest finished jobs once more than MAX_FINISHED_JOBS are kept."""
+    finished = [
+        job_id for job_id, job in _jobs.items()
+        if job["status"] in FINISHED_STATUSES
+    ]
+    for job_id in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+        _jobs.pop(job_id, None)
+        _exceptions.pop(job_id, None)
+
+
+# Worker Pool Functions
+def start_workers():
+    """Start the worker tasks. Must be called from a running event loop."""
+    global _queue, _slots
+    if _workers:
+        return
+    _queue = asyncio.Queue(maxsize=MAX_QUEUE_SIZE)
+    _slots = asyncio.Semaphore(MAX_WORKERS)
+    for i in range(MAX_WORKERS):
+        _workers.append(asyncio.create_task(_worker(i)))
+
+
+async def stop_workers():
+    """Cancel the worker tasks."""
+    global _queue, _slots
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _queue = None
+    _slots = None
+
+
+def submit_job(params: Dict, runner: Callable) -> str:
+    """Queue `await runner(**params)` (a coroutine function) and return its job ID.
+
+    Raises QueueFullError if the queue is at capacity.
+    """
+    if _queue is None:
+        start_workers()
+    if _backlog_full():
+        raise QueueFullError(f"Job queue is full ({MAX_QUEUE_SIZE} pending jobs)")
+
+    job_id = create_job(params)
+    _runners[job_id] = runner
+    future = asyncio.get_running_loop().create_future()
+    # Mark exceptions as retrieved so fire-and-forget jobs don't log warnings
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _futures[job_id] = future
+    _enqueued_at[job_id] = time.perf_counter()
+    _queue.put_nowait(job_id)
+    return job_id
+
+
+def _backlog_full() -> bool:
+    return _queue.qsize() + _slot_waiters >= MAX_QUEUE_SIZE
+
+
+def has_capacity() -> bool:
+    """Whether worker_slot() would run or wait now rather than raise QueueFullError."""
+    if _queue is None:
+        start_workers()
+    return not _slots.locked() or not _backlog_full()
+
+
+@asynccontextmanager
+async def worker_slot() -> AsyncIterator[None]:
+    """Hold one of the MAX_WORKERS run slots for work done outside a job.
+
+    Waits like a queued job while all slots are busy; raises QueueFullError
+    if the queue is full.
+    """
+    global _slot_waiters
+    if not has_capacity():
+        raise QueueFullError(f"Job queue is full ({MAX_QUEUE_SIZE} pending jobs)")
+    slots = _slots
+    _slot_waiters += 1
+    try:
+        await slots.acquire()
+    finally:
+        _slot_waiters -= 1
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+def cancel_job(job_id: str) -> bool:
+    """Cancel a queued or running job; returns False if it already finished.
+
+    A running job is cancelled where it awaits (a scrape aborts its actor run).
+    """
+    job = get_job(job_id)
+    if job is None or job["status"] in FINISHED_STATUSES:
+        return False
+    update_job(job_id, JobStatus.CANCELLED, error="Cancelled")
+    # A queued job is skipped by the worker that dequeues it
+    _runners.pop(job_id, None)
+    task = _tasks.get(job_id)
+    if task is not None:
+        task.cancel()
+    future = _futures.get(job_id)
+    if future and not future.done():
+        future.set_exception(JobCancelledError(f"Job {job_id} was cancelled"))
+    return True
+
+
+async def wait_for_job(job_id: str):
+    """Wait until a submitted job finishes and return its results (or raise its error)."""
+    future = _futures.get(job_id)
+    if future is None:
+        job = get_job(job_id)
+        if job and job["status"] == JobStatus.FAILED:
+            raise _exceptions.get(job_id) or RuntimeError(job["error"])
+        if job and job["status"] == JobStatus.CANCELLED:
+            raise JobCancelledError(f"Job {job_id} was cancelled")
+        return job["results"] if job else None
+    return await asyncio.shield(future)
+
+
+def get_stats() -> Dict:
+    """Get worker pool statistics."""
+    counts = {status.value: 0 for status in JobStatus}
+    for job in _jobs.values():
+        counts[job["status"].value] += 1
+    return {
+        "workers": MAX_WORKERS,
+        "max_queue_size": MAX_QUEUE_SIZE,
+        "queued": _queue.qsize() if _queue else 0,
+        "waiting_streams": _slot_waiters,
+        "jobs": counts,
+    }
+
+
+async def _worker(worker_id: int):
+    """Pull jobs off the queue and run each as its own task."""
+    while True:
+        job_id = await _queue.get()
+        runner = _runners.pop(job_id, None)
+        future = _futures.get(job_id)
+        enqueued_at = _enqueued_at.pop(job_id, None)
+        job = get_job(job_id)
+        try:
+            if runner is None or job is None:
+                continue
+            async with _slots:
+                if job["status"] == JobStatus.CANCELLED:
+                    continue
+                if enqueued_at is not None:
+                    metrics.JOB_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - enqueued_at)
+                start_job(job_id)
+                try:
+                    # Run as its own task so cancel_job() can stop it without stopping the worker
+                    task = _tasks[job_id] = asyncio.create_task(runner(**job["params"]))
+                    try:
+                        results = await task
+                    finally:
+                        _tasks.pop(job_id, None)
+                except asyncio.CancelledError:
+                    if job["status"] != JobStatus.CANCELLED or asyncio.current_task().cancelling():
+                        # The worker itself is being stopped
+                        raise
+                except Exception as e:
+                    _exceptions[job_id] = e
+                    fail_job(job_id, str(e))
+                    if future and not future.done():
+                        future.set_exception(e)
+                else:
+                    complete_job(job_id, results)
+                    if future and not future.done():
+                        future.set_result(results)
+        finally:
+            _futures.pop(job_id, None)
+            _queue.task_done()
@@ -0,0 +1,239 @@
+"""
+Shared limits on Apify actor runs.
+Every actor run (interactive scrapes, batches and scheduled searches alike)
+goes through actor_slot(platform):
+- the platform's circuit breaker must be closed: after a run of upstream
+  failures it opens and new runs fail fast until a cool-down has passed,
+  then a single trial run decides whether it closes again;
+- a token is taken from the platform's token bucket (runs per minute, with
+  a burst allowance);
+- one of APIFY_MAX_CONCURRENT_RUNS slots is held until the run finishes, so
+  the account stays under its concurrent run quota.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+import apify
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Actor runs started per minute for each platform; APIFY_RUNS_PER_MINUTE_<PLATFORM> overrides
+RUNS_PER_MINUTE = float(os.getenv("APIFY_RUNS_PER_MINUTE", "30"))
+RUN_BURST = int(os.getenv("APIFY_RUN_BURST", "5"))
+# Actor runs in flight across all platforms
+MAX_CONCURRENT_RUNS = int(os.getenv("APIFY_MAX_CONCURRENT_RUNS", "10"))
+# Longest a run may wait for a token before it is rejected with 429
+MAX_WAIT = float(os.getenv("APIFY_LIMIT_MAX_WAIT", "60"))
+# Consecutive failed runs that open a platform's circuit, and how long it stays open
+CIRCUIT_FAILURES = int(os.getenv("APIFY_CIRCUIT_FAILURES", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("APIFY_CIRCUIT_RESET_SECONDS", "60"))
+
+_buckets: Dict[str, "TokenBucket"] = {}
+_breakers: Dict[str, "CircuitBreaker"] = {}
+_slots: Optional[asyncio.Semaphore] = None
+_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+_running = 0
+
+
+class RateLimitedError(apify.ApifyError):
+    """Raised when a platform's token bucket can't admit a run within MAX_WAIT."""
+
+
+class CircuitOpenError(apify.ApifyError):
+    """Raised while a platform's circuit breaker is open."""
+
+
+class TokenBucket:
+    """Refills at `per_minute` tokens a minute up to `burst`; waiters reserve tokens in arrival order."""
+
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60.0
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, max_wait: float) -> float:
+        """Take a token (the balance may go negative) and return the seconds to wait for it.
+
+        Raises RateLimitedError, taking nothing, if the wait would exceed max_wait.
+        """
+        self._refill()
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        if wait > max_wait:
+            raise RateLimitedError(
+                f"Actor run rate limit reached; next run in {wait:.0f}s",
+                status_code=429, retry_after=wait
+            )
+        self.tokens -= 1
+        return wait
+
+    def refund(self):
+        """Give back a reserved token (the waiter was cancelled)."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class CircuitBreaker:
+    """Closed -> open after `threshold` consecutive failures -> half-open after `reset_seconds`."""
+
+    def __init__(self, name: str, threshold: int, reset_seconds: float):
+        self.name = name
+        self.threshold = max(threshold, 1)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def before_call(self):
+        """Admit a call, or raise CircuitOpenError. An expired open circuit admits one trial call."""
+        if self.state == "closed":
+            return
+        remaining = self.opened_at + self.reset_seconds - time.monotonic()
+        if self.state == "open" and remaining <= 0:
+            self.state = "half_open"
+            logger.info("🔌 Circuit for %s half-open, trying one run", self.name)
+            return
+        raise CircuitOpenError(
+            f"{self.name} upstream is failing; new runs are paused",
+            status_code=503, retry_after=max(remaining, 1.0)
+        )
+
+    def record_success(self):
+        if self.state != "closed":
+            logger.info("✅ Circuit for %s closed", self.name)
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.threshold:
+            if self.state != "open":
+                logger.warning("⚠️  Circuit for %s opened after %d failures", self.name, self.failures)
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """A call ended without an upstream verdict (stopped early or cancelled)."""
+        if self.state == "half_open":
+            # Let the next call be the trial
+            self.state = "open"
+            self.opened_at = time.monotonic() - self.reset_seconds
+
+
+def _platform_key(platform: str) -> str:
+    platform = platform.lower()
+    return "x" if platform == "twitter" else platform
+
+
+def get_bucket(platform: str) -> TokenBucket:
+    """The platform's token bucket (created on first use)."""
+    platform = _platform_key(platform)
+    if platform not in _buckets:
+        per_minute = float(os.getenv(f"APIFY_RUNS_PER_MINUTE_{platform.upper()}", RUNS_PER_MINUTE))
+        _buckets[platform] = TokenBucket(per_minute, RUN_BURST)
+    return _buckets[platform]
+
+
+def get_breaker(platform: str) -> CircuitBreaker:
+    """The platform's circuit breaker (created on first use)."""
+    platform = _platform_key(platform)
+    if platform not in _breakers:
+        _breakers[platform] = CircuitBreaker(platform, CIRCUIT_FAILURES, CIRCUIT_RESET_SECONDS)
+    return _breakers[platform]
+
+
+def _get_slots() -> asyncio.Semaphore:
+    """The concurrent run semaphore for the running event loop."""
+    global _slots, _slots_loop
+    loop = asyncio.get_running_loop()
+    if _slots is None or _slots_loop is not loop:
+        _slots = asyncio.Semaphore(max(MAX_CONCURRENT_RUNS, 1))
+        _slots_loop = loop
+    return _slots
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """Whether an error says the upstream is degraded (vs. a bad request or an early stop)."""
+    if isinstance(error, (RateLimitedError, CircuitOpenError)):
+        return False
+    if isinstance(error, apify.ApifyError):
+        # status 0: the run itself failed or timed out
+        return error.status_code in apify.RETRY_STATUSES or error.status_code == 0
+    return isinstance(error, httpx.TransportError)
+
+
+@asynccontextmanager
+async def actor_slot(platform: str) -> AsyncIterator[None]:
+    """Hold a rate-limited, concurrency-capped slot for one actor run.
+
+    Raises CircuitOpenError (503) or RateLimitedError (429) without running.
+    """
+    global _running
+    platform = _platform_key(platform)
+    breaker = get_breaker(platform)
+    breaker.before_call()
+    bucket = get_bucket(platform)
+    try:
+        wait = bucket.reserve(MAX_WAIT)
+    except RateLimitedError:
+        breaker.release()
+        raise
+    try:
+        if wait:
+            metrics.APIFY_LIMIT_WAIT_SECONDS.observe(wait, platform=platform)
+            await asyncio.sleep(wait)
+    except asyncio.CancelledError:
+        bucket.refund()
+        breaker.release()
+        raise
+
+    slots = _get_slots()
+    try:
+        await slots.acquire()
+    except asyncio.CancelledError:
+        breaker.release()
+        raise
+    _running += 1
+    metrics.APIFY_RUNS_IN_FLIGHT.set(_running)
+    try:
+        yield
+    except BaseException as e:
+        if is_upstream_failure(e):
+            breaker.record_failure()
+        else:
+            breaker.release()
+        raise
+    else:
+        breaker.record_success()
+    finally:
+        _running -= 1
+        metrics.APIFY_RUNS_IN_FLIGHT.set(_running)
+        slots.release()
+
+
+def get_stats() -> Dict:
+    """Token balances, circuit states and runs in flight."""
+    return {
+        "runs_in_flight": _running,
+        "max_concurrent_runs": MAX_CONCURRENT_RUNS,
+        "platforms": {
+            platform: {
+                "runs_per_minute": round(_buckets[platform].rate * 60, 2) if platform in _buckets else None,
+                "tokens": round(_buckets[platform].tokens, 2) if platform in _buckets else None,
+                "circuit": _breakers[platform].state if platform in _breakers else "closed",
+                "consecutive_failures": _breakers[platform].failures if platform in _breakers else 0,
+            }
+            for platform in sorted({*_buckets, *_breakers})
+        },
+    }
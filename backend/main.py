@@ -2,44 +2,70 @@
 FastAPI Backend for Outreach Scraping Toolkit
 Provides REST API endpoints for lead generation and management.
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+import httpx
 from typing import List, Dict, Optional
-import yaml
 import os
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
-import io
-import csv
-import re
+import asyncio
+import json
+import logging
+from datetime import datetime
 
 # Add backend directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from scraper import scrape_leads
+from scraper import scrape_leads, iter_leads, get_fetch_stats
 import database as db
+import jobs
+import batch
+import cache
+import paging
+import export
+import runs
+import filters
+import apify
+import limiter
+import logs
+import metrics
+import payloads
+import records
+import costs
+import searches
+import scheduler
+import singleflight
+import extract
+import scoring
 # Load environment variables from project root (parent of backend/)
 # Use override=False to NOT overwrite Railway/system env vars
 _env_path = Path(__file__).resolve().parent.parent / ".env"
-if _env_path.exists():
-    print(f"📁 Loading .env from: {_env_path}")
+_env_loaded = _env_path.exists()
+if _env_loaded:
     load_dotenv(_env_path, override=False)
+
+# Logging is configured after .env so LOG_LEVEL / LOG_FORMAT can come from it
+logs.setup()
+logger = logging.getLogger("main")
+if _env_loaded:
+    logger.info("📁 Loaded .env from: %s", _env_path)
 else:
-    print(f"📁 No .env file found at {_env_path}, using system env vars")
+    logger.info("📁 No .env file found at %s, using system env vars", _env_path)
 
 # Debug: Check if API token is available
 _apify_token = os.getenv("APIFY_API_TOKEN")
-print(f"🔑 APIFY_API_TOKEN: {'SET' if _apify_token else 'NOT SET'}")
+logger.info("🔑 APIFY_API_TOKEN: %s", "SET" if _apify_token else "NOT SET")
 
 # Debug: List all env vars that might be relevant
-print("🔍 Available env vars containing 'API' or 'KEY':")
+logger.debug("🔍 Available env vars containing 'API' or 'KEY':")
 for key in os.environ:
     if 'API' in key.upper() or 'KEY' in key.upper() or 'TOKEN' in key.upper():
-        print(f"   {key}: {'*' * min(len(os.environ[key]), 8)}")
+        logger.debug("   %s: %s", key, '*' * min(len(os.environ[key]), 8))
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -56,10 +82,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.RequestMetricsMiddleware)
 
-# Path to config file
-CONFIG_PATH = Path(__file__).parent.parent / "config" / "audience.yaml"
-
+# Region extraction is seeded from the audience regions; rebuild it when they change
+payloads.audience.on_change.append(extract.reload)
+payloads.audience.on_change.append(scoring.reload)
+payloads.scoring.on_change.append(scoring.reload)
 
 # Pydantic Models
 class ScrapeRequest(BaseModel):
@@ -71,6 +99,46 @@ class ScrapeRequest(BaseModel):
     state: str = ""     # Legacy field for backward compatibility
     platform: str = "linkedin"  # linkedin, x
     max_results: int = 20
+    force_refresh: bool = False  # Bypass the query-result cache
+    skip_seen: bool = False      # Only return leads not seen in earlier runs
+
+
+class BatchQuery(BaseModel):
+    keyword: str = ""
+    location: str = ""
+    position: str = ""
+    company: str = ""
+    platform: str = "linkedin"
+
+
+class BatchScrapeRequest(BaseModel):
+    queries: List[BatchQuery] = []      # Explicit queries...
+    from_audience: bool = False          # ...or generate them from config/audience.yaml
+    platforms: Optional[List[str]] = None  # Restrict audience-generated queries
+    max_results: int = 20                # Per query
+    parallelism: int = batch.DEFAULT_PARALLELISM
+
+
+class SavedSearchRequest(BaseModel):
+    name: str
+    keyword: str
+    location: str = ""
+    position: str = ""
+    company: str = ""
+    platform: str = "linkedin"
+    max_results: int = 20
+
+
+class ScheduleRequest(BaseModel):
+    search_id: str
+    cron: str                 # 5-field cron expression or @hourly/@daily/@weekly/@monthly
+    enabled: bool = True
+
+
+class AudienceScheduleRequest(BaseModel):
+    cron: str
+    platforms: Optional[List[str]] = None  # Restrict audience-generated searches
+    max_results: int = 20
 
 
 class HistoryRequest(BaseModel):
@@ -92,6 +160,7 @@ class LeadRequest(BaseModel):
     website: Optional[str] = ""
     bio: Optional[str] = ""
     verified: Optional[bool] = False
+    score: Optional[float] = None
 
 
 # Health Check Endpoint
@@ -105,81 +174,667 @@ async def health_check():
     }
 
 
-# Configuration Endpoint
-@app.get("/api/config/audience")
-async def get_audience_config():
-    """Get the audience configuration from YAML file."""
+def _load_audience_config() -> Dict:
+    """Parsed config/audience.yaml (cached until the file changes; do not mutate)."""
     try:
-        if not CONFIG_PATH.exists():
-            raise HTTPException(status_code=404, detail="Configuration file not found")
+        return payloads.audience.data()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Configuration file not found")
 
-        with open(CONFIG_PATH, 'r') as f:
-            config = yaml.safe_load(f)
 
-        return {
-            "status": "success",
-            "data": config
-        }
+def _cached_response(request: Request, payload: payloads.CachedPayload) -> Response:
+    """Serve a pre-serialized payload, or 304 if the client's ETag is current."""
+    body, etag = payload.response()
+    headers = {"ETag": etag, "Cache-Control": f"max-age={payloads.PAYLOAD_MAX_AGE}, must-revalidate"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Configuration Endpoint
+@app.get("/api/config/audience")
+async def get_audience_config(request: Request):
+    """Get the audience configuration from YAML file (ETag/304 supported)."""
+    try:
+        return _cached_response(request, payloads.audience)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Configuration file not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading configuration: {str(e)}")
 
 
-# Scraping Endpoint (Synchronous - waits for results)
+def _build_location(request: ScrapeRequest) -> str:
+    """Combine location with the legacy city/state fields."""
+    return request.location or f"{request.city}, {request.state}".strip(", ")
+
+
+def _record_run(results: List[Dict], params: Dict, session: Optional[str] = None) -> Dict:
+    """Score and rank results (in place), persist them as a search run and add the search to history.
+
+    The run's results are then held as compact records: runs.get_run_results(run["id"]).
+    """
+    scoring.rank(results)
+    run = runs.create_run(results, params, session)
+    db.add_history({**params, "run_id": run["id"], "result_count": len(results)})
+    return run
+
+
+def _scrape_params(request: ScrapeRequest) -> Dict:
+    """Validate a scrape request and build the job parameters."""
+    if not request.keyword:
+        raise HTTPException(status_code=400, detail="Keyword is required")
+    return {
+        "keyword": request.keyword,
+        "location": _build_location(request),
+        "platform": request.platform,
+        "max_results": request.max_results,
+        "position": request.position,
+        "company": request.company,
+        "force_refresh": request.force_refresh,
+        "skip_seen": request.skip_seen,
+    }
+
+
+async def _run_scrape(keyword: str, location: str, platform: str, max_results: int,
+                position: str = "", company: str = "", force_refresh: bool = False,
+                skip_seen: bool = False, session: Optional[str] = None) -> Dict:
+    """Run a scrape and record it as a search run. Executed by a job worker."""
+    results = await scrape_leads(
+        keyword=keyword,
+        location=location,
+        platform=platform,
+        max_results=max_results,
+        position=position,
+        company=company,
+        force_refresh=force_refresh,
+        skip_seen=skip_seen
+    )
+
+    # Store results
+    run = _record_run(results, {
+        "keyword": keyword,
+        "location": location,
+        "platform": platform,
+        "max_results": max_results
+    }, session)
+    return {"run_id": run["id"], "results": runs.get_run_results(run["id"])}
+
+
+def _json_response(payload: Dict) -> Response:
+    """Encode a payload holding Lead records straight to JSON (skips FastAPI's jsonable_encoder pass)."""
+    return Response(content=records.dumps(payload), media_type="application/json")
+
+
+def _budget_exceeded(e: costs.BudgetExceededError) -> HTTPException:
+    """Map a rejected scrape to 429, retryable once the daily budget resets."""
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(int(e.retry_after) + 1)})
+
+
+def _scrape_failed(e: Exception) -> HTTPException:
+    """Map a failed scrape job to an HTTP error.
+
+    429 for the daily budget and rate limits (ours or Apify's), 503 while the
+    upstream is failing or its circuit is open, otherwise 500.
+    """
+    if isinstance(e, costs.BudgetExceededError):
+        return _budget_exceeded(e)
+    status_code = 500
+    if isinstance(e, apify.ApifyError) and e.status_code == 429:
+        status_code = 429
+    elif isinstance(e, apify.ApifyError) and e.status_code in apify.RETRY_STATUSES:
+        status_code = 503
+    elif isinstance(e, httpx.TransportError):
+        status_code = 503
+    retry_after = getattr(e, "retry_after", None)
+    headers = {"Retry-After": str(int(retry_after) + 1)} if retry_after is not None and status_code != 500 else None
+    return HTTPException(status_code=status_code, detail=f"Scraping failed: {str(e)}", headers=headers)
+
+
+def _submit_scrape(params: Dict, runner=None) -> str:
+    """Queue a scrape job (default runner: _run_scrape), mapping a full queue to 429."""
+    try:
+        return jobs.submit_job(params, runner or _run_scrape)
+    except jobs.QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+
+# How often a request waiting on a job checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 1.0
+
+
+async def _wait_for_job(http_request: Request, job_id: str):
+    """Wait for a job's result, cancelling the job (and its actor run) if the client disconnects."""
+    waiter = asyncio.ensure_future(jobs.wait_for_job(job_id))
+    try:
+        while True:
+            done, _ = await asyncio.wait({waiter}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return waiter.result()
+            if await http_request.is_disconnected():
+                jobs.cancel_job(job_id)
+                logger.info("🛑 Client disconnected, cancelled job %s", job_id)
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    finally:
+        waiter.cancel()
+
+
+# Scraping Endpoint (waits for results without blocking the event loop)
 @app.post("/scrape")
-async def scrape(request: ScrapeRequest):
+async def scrape(request: ScrapeRequest, http_request: Request, x_session_id: Optional[str] = Header(None)):
     """
     Scrape leads using Apify scrapers.
-    Waits for results (may take 30-60 seconds).
+    Runs on the job worker pool and waits for results (may take 30-60 seconds).
+    Results are stored as a search run under the X-Session-Id header's session.
+    If the client disconnects first, the job is cancelled and its actor run aborted.
+    """
+    params = {**_scrape_params(request), "session": x_session_id}
+    job_id = _submit_scrape(params)
+
+    try:
+        outcome = await _wait_for_job(http_request, job_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _scrape_failed(e)
+    results = outcome["results"]
+
+    return _json_response({
+        "status": "success",
+        "message": f"Found {len(results)} results from {request.platform}",
+        "count": len(results),
+        "platform": request.platform,
+        "job_id": job_id,
+        "run_id": outcome["run_id"],
+        "results": results
+    })
+
+
+def _format_event(event: Dict, fmt: str) -> str:
+    """Encode a stream event as an NDJSON line or an SSE message."""
+    data = json.dumps(event)
+    if fmt == "sse":
+        return f"event: {event['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def _stream_scrape(params: Dict, fmt: str, session: Optional[str] = None):
+    """Yield encoded events for each lead as the scraper produces it.
+
+    The scrape holds a job pool run slot, so streams and queued jobs share MAX_WORKERS.
     """
+    results = []
     try:
-        # Build location
-        location = request.location or f"{request.city}, {request.state}".strip(", ")
-
-        # Validate inputs
-        if not request.keyword:
-            raise HTTPException(status_code=400, detail="Keyword is required")
-
-        # Run scraper synchronously
-        results = scrape_leads(
-            keyword=request.keyword,
-            location=location,
-            platform=request.platform,
-            max_results=request.max_results,
-            position=request.position,
-            company=request.company
+        async with jobs.worker_slot():
+            async for lead in iter_leads(**params):
+                results.append(lead)
+                yield _format_event({"type": "lead", "lead": lead}, fmt)
+    except Exception as e:
+        yield _format_event({"type": "error", "detail": f"Scraping failed: {str(e)}"}, fmt)
+        return
+
+    run = _record_run(results, {
+        "keyword": params["keyword"],
+        "location": params["location"],
+        "platform": params["platform"],
+        "max_results": params["max_results"]
+    }, session)
+    yield _format_event({
+        "type": "done",
+        "count": len(results),
+        "platform": params["platform"],
+        "run_id": run["id"]
+    }, fmt)
+
+
+# Streaming Scrape Endpoint
+@app.post("/scrape/stream")
+async def scrape_stream(request: ScrapeRequest, format: str = "ndjson",
+                        x_session_id: Optional[str] = Header(None)):
+    """
+    Scrape leads and stream each one as soon as it is parsed.
+    format=ndjson (default) emits one JSON object per line; format=sse emits
+    Server-Sent Events. Events are `lead`, then a final `done` or `error`.
+    The scrape shares the job pool's concurrency limit: it waits for a free
+    worker slot, and is rejected with 429 while the job queue is full.
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    params = _scrape_params(request)
+    if not jobs.has_capacity():
+        raise HTTPException(status_code=429, detail=f"Job queue is full ({jobs.MAX_QUEUE_SIZE} pending jobs)")
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        _stream_scrape(params, format, x_session_id),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _run_batch(queries: List[Dict], max_results: int, parallelism: int,
+                     session: Optional[str] = None) -> Dict:
+    """Run a batch search and record it as a search run. Executed by a job worker."""
+    outcome = await batch.run_batch(
+        queries,
+        max_results=max_results,
+        parallelism=parallelism
+    )
+
+    run = _record_run(outcome["results"], {
+        "keyword": "batch",
+        "queries": len(queries),
+        "platform": ",".join(sorted({q["platform"] for q in queries})),
+        "max_results": max_results
+    }, session)
+    return {**outcome, "run_id": run["id"], "results": runs.get_run_results(run["id"])}
+
+
+# Batch Scraping Endpoint
+@app.post("/scrape/batch", status_code=202)
+async def scrape_batch(request: BatchScrapeRequest, x_session_id: Optional[str] = Header(None)):
+    """
+    Queue a batch search over many (keyword, position, company, location, platform)
+    queries, or over the audience config matrix. Poll GET /jobs/{job_id} for the
+    merged, deduplicated results.
+    """
+    if request.from_audience:
+        queries = batch.build_queries_from_audience(_load_audience_config(), request.platforms)
+    else:
+        queries = [q.model_dump() for q in request.queries]
+
+    if not queries:
+        raise HTTPException(status_code=400, detail="No queries given")
+    if len(queries) > batch.MAX_BATCH_QUERIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch has {len(queries)} queries; the limit is {batch.MAX_BATCH_QUERIES}"
         )
 
-        # Store results
-        db.set_current_results(results)
-        db.add_history({
-            "keyword": request.keyword,
-            "location": location,
-            "platform": request.platform,
-            "max_results": request.max_results,
-            "result_count": len(results)
-        })
+    params = {
+        "queries": queries,
+        "max_results": request.max_results,
+        "parallelism": max(1, request.parallelism),
+        "session": x_session_id,
+    }
+    try:
+        job_id = jobs.submit_job(params, _run_batch)
+    except jobs.QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
 
-        return {
-            "status": "success",
-            "message": f"Found {len(results)} results from {request.platform}",
-            "count": len(results),
-            "platform": request.platform,
-            "results": results
-        }
+    return {
+        "status": "success",
+        "message": f"Batch of {len(queries)} queries queued",
+        "job_id": job_id,
+        "query_count": len(queries)
+    }
+
+
+# Job Endpoints (asynchronous scraping)
+@app.post("/jobs/scrape", status_code=202)
+async def create_scrape_job(request: ScrapeRequest, x_session_id: Optional[str] = Header(None)):
+    """Queue a scrape and return its job ID immediately."""
+    job_id = _submit_scrape({**_scrape_params(request), "session": x_session_id})
+    return {
+        "status": "success",
+        "message": "Scrape job queued",
+        "job_id": job_id,
+        "job": jobs.get_job(job_id)
+    }
+
+
+@app.get("/jobs")
+async def get_jobs_stats():
+    """Get job worker pool statistics."""
+    return {
+        "status": "success",
+        "data": jobs.get_stats()
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Get status (and results once completed) of a job."""
+    job = jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _json_response({
+        "status": "success",
+        "job": job
+    })
 
+
+# Prometheus Metrics Endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text-format metrics (latencies, throughput, filter and cache counters)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# Apify Client Pool Endpoint
+@app.get("/api/apify/metrics")
+async def get_apify_metrics():
+    """Get connection reuse and request latency metrics for the Apify client pool,
+    the raw-items-per-lead ratios used to size actor requests, and the actor
+    run limiter state (tokens, circuit breakers, runs in flight) and the
+    shared in-flight searches."""
+    return {
+        "status": "success",
+        "data": {**apify.get_metrics(), "fetch_ratio": get_fetch_stats(), "limits": limiter.get_stats(),
+                 "coalescing": singleflight.get_stats()}
+    }
+
+
+# Cache Endpoints
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Get query-result cache hit/miss counters and size."""
+    return {
+        "status": "success",
+        "data": cache.get_stats()
+    }
+
+
+@app.delete("/api/cache")
+async def clear_cache():
+    """Remove all cached search results."""
+    removed = cache.clear()
+    return {
+        "status": "success",
+        "message": f"Removed {removed} cached searches"
+    }
+
+
+# Filter Endpoints
+@app.get("/api/filters/stats")
+async def get_filter_stats():
+    """Get per-rule counts of items dropped by the lead filter stage."""
+    return {
+        "status": "success",
+        "data": filters.get_stats()
+    }
+
+
+@app.post("/api/filters/reload")
+async def reload_filters():
+    """Re-read config/filters.yaml."""
+    try:
+        filters.reload()
+        filters.get_filter("linkedin")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error loading filter rules: {str(e)}")
+    return {
+        "status": "success",
+        "message": "Filter rules reloaded"
+    }
 
 
 # Results Endpoint
 @app.get("/results")
-async def get_results():
-    """Get current search results."""
-    results = db.get_current_results()
+async def get_results(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = "asc",
+    platform: Optional[str] = None,
+    region: Optional[str] = None,
+    min_followers: Optional[int] = None,
+    run_id: Optional[str] = None,
+    x_session_id: Optional[str] = Header(None)
+):
+    """
+    Get search results: the given run_id, else the latest run of the
+    X-Session-Id session, else the latest run overall.
+    Runs are stored best audience fit first. Optional limit/cursor
+    pagination, sort (name, platform, role, followers, saved_at, score) with
+    order=asc|desc, and platform/region/min_followers filters.
+    Without limit the whole (filtered, sorted) list is returned.
+    """
+    run_id = run_id or runs.latest_run_id(x_session_id)
+    results = runs.get_run_results(run_id) if run_id else []
+    if results is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    try:
+        page = paging.page_results(
+            results, limit=limit, cursor=cursor, sort=sort, order=order,
+            platform=platform, region=region, min_followers=min_followers
+        )
+    except paging.PagingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return _json_response({
+        "status": "success",
+        "count": page["total"],
+        "run_id": run_id,
+        "results": page["items"],
+        "next_cursor": page["next_cursor"]
+    })
+
+
+# Search Run Endpoints
+@app.get("/runs")
+async def list_runs(limit: int = 50, x_session_id: Optional[str] = Header(None)):
+    """List stored search runs (for the X-Session-Id session, if given)."""
+    items = runs.list_runs(x_session_id, limit=min(max(limit, 1), 500))
+    return {
+        "status": "success",
+        "count": len(items),
+        "runs": items
+    }
+
+
+@app.get("/runs/{run_id}")
+async def get_run(run_id: str):
+    """Get metadata for a stored search run."""
+    run = runs.get_run(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return {
+        "status": "success",
+        "run": run
+    }
+
+
+@app.delete("/runs/{run_id}")
+async def delete_run(run_id: str):
+    """Delete a stored search run."""
+    if not runs.delete_run(run_id):
+        raise HTTPException(status_code=404, detail="Run not found")
+    return {
+        "status": "success",
+        "message": "Run deleted successfully"
+    }
+
+
+# Saved Search Endpoints
+async def _run_saved_search(search_id: str, force_refresh: bool = False,
+                            session: Optional[str] = None) -> Dict:
+    """Re-run a saved search, keeping only leads new since its previous runs. Executed by a job worker."""
+    search = searches.get_search(search_id)
+    if search is None:
+        raise ValueError(f"Saved search {search_id} not found")
+    params = search["params"]
+    started_at = datetime.now().isoformat()
+    results = await scrape_leads(
+        **params,
+        force_refresh=force_refresh,
+        exclude=searches.get_watermark(search_id),
+        since=searches.since_date(search)
+    )
+
+    run = _record_run(results, {**params, "saved_search_id": search_id}, session)
+    searches.record_run(search_id, run["id"], started_at, (lead.get("identity") for lead in results))
+    return {"run_id": run["id"], "results": runs.get_run_results(run["id"])}
+
+
+@app.post("/searches")
+async def create_saved_search(request: SavedSearchRequest, x_session_id: Optional[str] = Header(None)):
+    """Save a search definition for recurring delta runs."""
+    if not request.name or not request.keyword:
+        raise HTTPException(status_code=400, detail="Name and keyword are required")
+    params = request.model_dump(exclude={"name"})
+    params["platform"] = params["platform"].lower()
+    return {
+        "status": "success",
+        "search": searches.create_search(request.name, params, x_session_id)
+    }
+
+
+@app.get("/searches")
+async def list_saved_searches(x_session_id: Optional[str] = Header(None)):
+    """List saved searches (for the X-Session-Id session, if given)."""
+    items = searches.list_searches(x_session_id)
+    return {
+        "status": "success",
+        "count": len(items),
+        "searches": items
+    }
+
+
+@app.get("/searches/{search_id}")
+async def get_saved_search(search_id: str):
+    """Get a saved search and its watermark state."""
+    search = searches.get_search(search_id)
+    if not search:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return {
+        "status": "success",
+        "search": search
+    }
+
+
+@app.delete("/searches/{search_id}")
+async def delete_saved_search(search_id: str):
+    """Delete a saved search."""
+    if not searches.delete_search(search_id):
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    scheduler.delete_schedules_for_search(search_id)
     return {
         "status": "success",
+        "message": "Saved search deleted successfully"
+    }
+
+
+@app.post("/searches/{search_id}/run")
+async def run_saved_search(search_id: str, http_request: Request, reset: bool = False,
+                           force_refresh: bool = False, x_session_id: Optional[str] = Header(None)):
+    """
+    Re-run a saved search and return only leads it has not returned before.
+    reset=true clears the watermark first (a full run). The run is stored
+    like any other scrape, tagged with saved_search_id.
+    """
+    if not searches.get_search(search_id):
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    if reset:
+        searches.reset_watermark(search_id)
+
+    job_id = _submit_scrape({"search_id": search_id, "force_refresh": force_refresh, "session": x_session_id},
+                            _run_saved_search)
+    try:
+        outcome = await _wait_for_job(http_request, job_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _scrape_failed(e)
+    results = outcome["results"]
+
+    return _json_response({
+        "status": "success",
+        "message": f"Found {len(results)} new results",
         "count": len(results),
+        "job_id": job_id,
+        "run_id": outcome["run_id"],
+        "search": searches.get_search(search_id),
         "results": results
+    })
+
+
+# Schedule Endpoints
+@app.get("/schedules")
+async def list_schedules():
+    """List recurring saved-search schedules and scheduler state."""
+    items = scheduler.list_schedules()
+    return {
+        "status": "success",
+        "count": len(items),
+        "schedules": items,
+        "scheduler": scheduler.get_stats()
+    }
+
+
+@app.post("/schedules")
+async def create_schedule(request: ScheduleRequest):
+    """Run a saved search on a cron schedule (local time, within SCHEDULER_WINDOW)."""
+    if not searches.get_search(request.search_id):
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    try:
+        schedule = scheduler.create_schedule(request.search_id, request.cron, request.enabled)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "status": "success",
+        "schedule": schedule
+    }
+
+
+@app.post("/schedules/from-audience")
+async def schedule_audience(request: AudienceScheduleRequest, x_session_id: Optional[str] = Header(None)):
+    """
+    Create a saved search for every query in the audience config matrix and
+    schedule them all on one cron expression. The scheduler spaces the runs out.
+    """
+    try:
+        scheduler.CronSpec(request.cron)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    queries = batch.build_queries_from_audience(_load_audience_config(), request.platforms)
+    if not queries:
+        raise HTTPException(status_code=400, detail="Audience config produced no queries")
+
+    created = []
+    for query in queries:
+        name = " / ".join(part for part in (query["keyword"], query["position"], query["location"]) if part)
+        search = searches.create_search(
+            f"{name} ({query['platform']})", {**query, "max_results": request.max_results}, x_session_id
+        )
+        created.append(scheduler.create_schedule(search["id"], request.cron))
+    return {
+        "status": "success",
+        "count": len(created),
+        "schedules": created
+    }
+
+
+@app.post("/schedules/{schedule_id}/pause")
+async def pause_schedule(schedule_id: str):
+    """Stop a schedule from starting new runs."""
+    if not scheduler.set_enabled(schedule_id, False):
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return {
+        "status": "success",
+        "schedule": scheduler.get_schedule(schedule_id)
+    }
+
+
+@app.post("/schedules/{schedule_id}/resume")
+async def resume_schedule(schedule_id: str):
+    """Resume a paused schedule from its next cron time."""
+    if not scheduler.set_enabled(schedule_id, True):
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return {
+        "status": "success",
+        "schedule": scheduler.get_schedule(schedule_id)
+    }
+
+
+@app.delete("/schedules/{schedule_id}")
+async def delete_schedule(schedule_id: str):
+    """Delete a schedule (its saved search is kept)."""
+    if not scheduler.delete_schedule(schedule_id):
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return {
+        "status": "success",
+        "message": "Schedule deleted successfully"
     }
 
 
@@ -211,13 +866,71 @@ async def add_history(request: HistoryRequest):
 
 # Leads (Bookmarks) Endpoints
 @app.get("/leads")
-async def get_leads():
-    """Get all saved/bookmarked leads."""
-    leads = db.get_leads()
+async def get_leads(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    sort: str = "saved_at",
+    order: str = "desc",
+    platform: Optional[str] = None,
+    region: Optional[str] = None,
+    min_followers: Optional[int] = None
+):
+    """
+    Get saved/bookmarked leads (newest first by default).
+    Supports the same limit/cursor/sort/filter parameters as /results,
+    served from database indexes.
+    """
+    try:
+        sort, descending, limit = paging.validate(sort, order, limit)
+        after = paging.decode_keyset(cursor)
+        page = db.query_leads(
+            limit=limit, after=after, sort=sort, descending=descending,
+            platform=platform, region=region, min_followers=min_followers
+        )
+    except paging.PagingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "status": "success",
+        "count": page["total"],
+        "leads": page["items"],
+        "next_cursor": paging.encode_cursor(page["next"]) if page["next"] else None
+    }
+
+
+@app.get("/leads/search")
+async def search_leads(
+    q: str,
+    source: str = "leads",
+    run_id: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None
+):
+    """
+    Full-text search over name, role, company, headline, bio, region and notes.
+    source=leads searches saved leads; source=results searches stored run
+    results (all runs, or one with run_id). Hits are ranked best first, each
+    with a score and a snippet with the matched terms in [brackets].
+    """
+    if source not in ("leads", "results"):
+        raise HTTPException(status_code=400, detail="source must be 'leads' or 'results'")
+    try:
+        _, _, limit = paging.validate(None, "desc", limit)
+        offset = paging.decode_offset(cursor)
+    except paging.PagingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if source == "leads":
+        page = db.search_leads(q, limit=limit, offset=offset)
+    else:
+        page = runs.search_results(q, run_id=run_id, limit=limit, offset=offset)
+    next_offset = offset + len(page["items"])
     return {
         "status": "success",
-        "count": len(leads),
-        "leads": leads
+        "query": q,
+        "count": page["total"],
+        "hits": page["items"],
+        "next_cursor": paging.encode_cursor({"offset": next_offset}) if next_offset < page["total"] else None
     }
 
 
@@ -254,212 +967,132 @@ async def delete_lead(lead_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to delete lead: {str(e)}")
 
 
-# CSV Download Endpoint
-@app.get("/download-csv")
-async def download_csv():
-    """Download current results as CSV file."""
+def _export_response(rows, fmt: str, filename: str) -> StreamingResponse:
+    """Stream rows in the requested export format as a download."""
     try:
-        results = db.get_current_results()
-
-        if not results:
-            raise HTTPException(status_code=404, detail="No results to download")
-
-        # Create CSV in memory
-        output = io.StringIO()
-        fieldnames = [
-            "id", "name", "role", "company", "platform", "contact_link",
-            "region", "notes", "rating", "review_count", "address",
-            "phone", "website", "place_id"
-        ]
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for result in results:
-            writer.writerow({k: result.get(k, "") for k in fieldnames})
-
-        # Convert to bytes for streaming
-        output.seek(0)
-        csv_bytes = io.BytesIO(output.getvalue().encode('utf-8'))
-
-        return StreamingResponse(
-            csv_bytes,
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=leads.csv"}
-        )
+        body = export.stream_export(rows, fmt)
+    except export.ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    media_type, extension = export.FORMATS[fmt]
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}.{extension}"}
+    )
+
+
+def _run_rows(run_id: Optional[str], session: Optional[str]):
+    """Rows of a run (or the session's latest run) for export; 404 if empty."""
+    run_id = run_id or runs.latest_run_id(session)
+    if not run_id:
+        raise HTTPException(status_code=404, detail="No results to download")
+    if runs.get_run(run_id) is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return runs.iter_run_results(run_id)
+
+
+# Export Endpoints
+@app.get("/export")
+async def export_leads(
+    source: str = "results",
+    format: str = "csv",
+    run_id: Optional[str] = None,
+    x_session_id: Optional[str] = Header(None)
+):
+    """
+    Stream an export of a search run (source=results; run_id or the latest
+    run) or saved leads (source=leads) as csv, ndjson, parquet or arrow.
+    """
+    if source == "results":
+        rows = _run_rows(run_id, x_session_id)
+    elif source == "leads":
+        rows = db.iter_all_leads()
+    else:
+        raise HTTPException(status_code=400, detail="source must be 'results' or 'leads'")
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to generate CSV: {str(e)}")
+    return _export_response(rows, format, source)
+
+
+# CSV Download Endpoint
+@app.get("/download-csv")
+async def download_csv(run_id: Optional[str] = None, x_session_id: Optional[str] = Header(None)):
+    """Download a search run (default: the latest) as CSV file."""
+    return _export_response(_run_rows(run_id, x_session_id), "csv", "leads")
 
 
-# Cost Analysis Endpoint
+# Cost Analysis Endpoints
 @app.get("/api/cost-analysis")
-async def get_cost_analysis():
+async def get_cost_analysis(days: int = 30):
     """
-    Parse and return the cost estimation markdown as structured JSON.
-    Reads docs/COST_ESTIMATION.md and converts it to a renderable format.
+    Live scraping spend from the cost ledger: today's spend against the daily
+    budget, per-platform and per-day totals, and the most recent actor runs.
     """
-    try:
-        docs_path = Path(__file__).parent.parent / "docs" / "COST_ESTIMATION.md"
-
-        if not docs_path.exists():
-            raise HTTPException(status_code=404, detail="Cost estimation document not found")
-
-        with open(docs_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Parse markdown into structured sections
-        sections = []
-        current_section = None
-        current_subsection = None
-        lines = content.split('\n')
-
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-
-            # H1 headers (# Title)
-            if line.startswith('# ') and not line.startswith('## '):
-                current_section = {
-                    'type': 'title',
-                    'level': 1,
-                    'content': line.replace('# ', '').strip(),
-                    'subsections': []
-                }
-                sections.append(current_section)
-
-            # H2 headers (## Section)
-            elif line.startswith('## '):
-                current_subsection = {
-                    'type': 'section',
-                    'level': 2,
-                    'title': line.replace('## ', '').strip(),
-                    'content': []
-                }
-                if current_section:
-                    current_section['subsections'].append(current_subsection)
-                else:
-                    sections.append(current_subsection)
-
-            # H3 headers (### Subsection)
-            elif line.startswith('### '):
-                sub = {
-                    'type': 'subsection',
-                    'level': 3,
-                    'title': line.replace('### ', '').strip(),
-                    'content': []
-                }
-                if current_subsection:
-                    current_subsection['content'].append(sub)
-                    # Update pointer for nested content
-                    current_content_target = sub['content']
-                else:
-                    sections.append(sub)
-
-            # Tables (starts with |)
-            elif line.strip().startswith('|') and '|' in line:
-                # Parse table
-                table_lines = []
-                while i < len(lines) and lines[i].strip().startswith('|'):
-                    table_lines.append(lines[i])
-                    i += 1
-                i -= 1  # Back up one since we'll increment at loop end
-
-                if len(table_lines) >= 2:
-                    # Parse header
-                    headers = [cell.strip() for cell in table_lines[0].split('|')[1:-1]]
-                    # Skip separator line (table_lines[1])
-                    # Parse rows
-                    rows = []
-                    for row_line in table_lines[2:]:
-                        cells = [cell.strip() for cell in row_line.split('|')[1:-1]]
-                        if cells:
-                            rows.append(cells)
-
-                    table = {
-                        'type': 'table',
-                        'headers': headers,
-                        'rows': rows
-                    }
-
-                    if current_subsection:
-                        current_subsection['content'].append(table)
-                    else:
-                        sections.append(table)
-
-            # Bullet points
-            elif line.strip().startswith('- ') or line.strip().startswith('* '):
-                bullet_items = []
-                while i < len(lines) and (lines[i].strip().startswith('- ') or lines[i].strip().startswith('* ')):
-                    bullet_items.append(lines[i].strip()[2:])
-                    i += 1
-                i -= 1
-
-                if current_subsection:
-                    current_subsection['content'].append({
-                        'type': 'list',
-                        'items': bullet_items
-                    })
-                else:
-                    sections.append({
-                        'type': 'list',
-                        'items': bullet_items
-                    })
-
-            # Bold text (**text**)
-            elif '**' in line:
-                if current_subsection:
-                    current_subsection['content'].append({
-                        'type': 'paragraph',
-                        'content': line.strip()
-                    })
-
-            # Regular paragraph
-            elif line.strip() and not line.startswith('#') and not line.startswith('---'):
-                if current_subsection:
-                    current_subsection['content'].append({
-                        'type': 'paragraph',
-                        'content': line.strip()
-                    })
-
-            i += 1
+    return {
+        "status": "success",
+        "data": costs.get_summary(days=min(max(days, 1), 365))
+    }
 
-        return {
-            "status": "success",
-            "data": {
-                "title": "Cost Estimation - Outreach Scraping Toolkit",
-                "sections": sections
-            }
-        }
 
-    except HTTPException:
-        raise
+@app.get("/api/cost-analysis/reference")
+async def get_cost_reference(request: Request):
+    """
+    Return docs/COST_ESTIMATION.md parsed into structured JSON.
+    Parsed once and re-parsed only when the file changes; supports ETag revalidation.
+    """
+    try:
+        return _cached_response(request, payloads.cost_analysis)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Cost estimation document not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to parse cost analysis: {str(e)}")
 
 
+# Event loop lag sampler (started on startup)
+_loop_monitor: Optional[asyncio.Task] = None
+
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup."""
     db.initialize()
-    print("✅ Database initialized")
-    
+    logger.info("✅ Database initialized")
+
+    jobs.start_workers()
+    logger.info("✅ Job workers started (%d workers, queue size %d)", jobs.MAX_WORKERS, jobs.MAX_QUEUE_SIZE)
+
+    global _loop_monitor
+    _loop_monitor = asyncio.create_task(metrics.monitor_event_loop())
+
+    scheduler.start(_run_saved_search)
+    if scheduler.SCHEDULER_ENABLED:
+        logger.info("✅ Scheduler started (window %s)", scheduler.SCHEDULER_WINDOW or "any time")
+
     # Check if frontend exists
     FRONTEND_DIST = Path(__file__).parent.parent / "frontend" / "dist"
     if FRONTEND_DIST.exists():
-        print(f"✅ Frontend dist found at {FRONTEND_DIST}")
-        print(f"   Files: {list(FRONTEND_DIST.glob('*'))}")
+        logger.info("✅ Frontend dist found at %s", FRONTEND_DIST)
+        logger.debug("   Files: %s", list(FRONTEND_DIST.glob('*')))
     else:
-        print(f"⚠️  Frontend dist NOT found at {FRONTEND_DIST}")
+        logger.warning("⚠️  Frontend dist NOT found at %s", FRONTEND_DIST)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background job workers and close pooled HTTP connections."""
+    if _loop_monitor is not None:
+        _loop_monitor.cancel()
+    await scheduler.stop()
+    await jobs.stop_workers()
+    await apify.close()
 
 
 # Mount static files (frontend) - must be last
 FRONTEND_DIST = Path(__file__).parent.parent / "frontend" / "dist"
 if FRONTEND_DIST.exists():
     app.mount("/", StaticFiles(directory=str(FRONTEND_DIST), html=True), name="static")
-    print(f"✅ Serving frontend from {FRONTEND_DIST}")
+    logger.info("✅ Serving frontend from %s", FRONTEND_DIST)
 else:
-    print(f"⚠️  Cannot serve frontend - directory not found: {FRONTEND_DIST}")
+    logger.warning("⚠️  Cannot serve frontend - directory not found: %s", FRONTEND_DIST)
 
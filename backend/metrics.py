@@ -0,0 +1,202 @@
+"""
+Prometheus-style metrics.
+A small in-process registry of labelled counters, gauges and histograms,
+rendered in the Prometheus text exposition format by GET /metrics. The
+instruments used by the hot paths are defined at the bottom of this module.
+"""
+import asyncio
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Seconds between event-loop lag samples
+LOOP_LAG_INTERVAL = 0.5
+
+_registry: List["_Metric"] = []
+_lock = threading.Lock()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        _registry.append(self)
+
+    def _key(self, labels: Dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{self._labels(key)} {value:g}"
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with _lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self) -> Iterator[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{self._labels(key)} {value:g}"
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with _lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time spent in the with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterator[str]:
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="%g"' % bound
+                yield f"{self.name}_bucket{self._labels(key, le)} {cumulative}"
+            inf = 'le="+Inf"'
+            yield f"{self.name}_bucket{self._labels(key, inf)} {count}"
+            yield f"{self.name}_sum{self._labels(key)} {total:g}"
+            yield f"{self.name}_count{self._labels(key)} {count}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render() -> str:
+    """Render every registered metric in the Prometheus text format."""
+    lines = []
+    with _lock:
+        for metric in _registry:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+async def monitor_event_loop(interval: float = LOOP_LAG_INTERVAL):
+    """Sample how late the event loop wakes a sleeping task (runs until cancelled)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - start - interval, 0.0)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        EVENT_LOOP_LAG_LAST.set(lag)
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware timing each HTTP request by route template and status."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status["code"],
+            )
+
+
+# Instruments
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency (including streamed bodies)",
+    ["method", "route", "status"])
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds", "Delay between a timer's due time and the loop running it",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5))
+EVENT_LOOP_LAG_LAST = Gauge("event_loop_lag_last_seconds", "Most recent event loop lag sample")
+JOB_QUEUE_WAIT_SECONDS = Histogram(
+    "job_queue_wait_seconds", "Time a job spends queued before a worker starts it")
+APIFY_REQUEST_SECONDS = Histogram(
+    "apify_request_duration_seconds", "Apify API request latency", ["method", "endpoint"])
+ACTOR_RUN_SECONDS = Histogram(
+    "apify_actor_run_seconds", "Actor run time from start until the scraper stops reading",
+    ["platform", "outcome"])
+APIFY_RETRIES = Counter(
+    "apify_request_retries_total", "Apify API requests retried, by status or error", ["endpoint", "reason"])
+APIFY_LIMIT_WAIT_SECONDS = Histogram(
+    "apify_limit_wait_seconds", "Time an actor run waited for its platform's rate limit", ["platform"])
+APIFY_RUNS_IN_FLIGHT = Gauge("apify_runs_in_flight", "Actor runs holding a concurrency slot")
+DATASET_ITEMS = Counter(
+    "apify_dataset_items_total", "Raw dataset items read from actor runs", ["platform"])
+LEAD_ITEMS = Counter(
+    "scraper_items_total", "Dataset items kept as leads or dropped, by reason",
+    ["platform", "outcome"])
+APIFY_COST_USD = Counter(
+    "apify_cost_usd_total", "Cost of actor runs recorded in the cost ledger", ["platform"])
+SCRAPES_COALESCED = Counter(
+    "scraper_coalesced_total", "Searches that joined an identical in-flight actor run", ["platform"])
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Query cache lookups", ["result"])
+STORAGE_WRITE_SECONDS = Histogram(
+    "storage_write_seconds", "SQLite write latency", ["op"])
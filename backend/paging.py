@@ -0,0 +1,163 @@
+"""
+Pagination, sorting and filtering helpers for result and lead listings.
+Cursors are opaque base64 tokens; in-memory result sets get a sort index
+(a permutation of row positions) computed once per result set and field,
+or, for a single sorted page, a heap selection of the first offset + limit
+rows without sorting the rest.
+"""
+import base64
+import heapq
+import json
+from typing import Dict, List, Optional, Tuple
+
+SORT_FIELDS = ("name", "platform", "role", "followers", "saved_at", "score")
+MAX_PAGE_SIZE = 500
+
+# Precomputed sort indexes for the current in-memory result set
+_sort_index_owner: Optional[List[Dict]] = None
+_sort_indexes: Dict[str, List[int]] = {}
+
+
+class PagingError(ValueError):
+    """Raised for invalid sort/cursor/limit parameters."""
+
+
+def encode_cursor(data: Dict) -> str:
+    """Encode cursor state as an opaque URL-safe token."""
+    return base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).decode()
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def decode_cursor(cursor: Optional[str], keys: Tuple[str, ...]) -> Dict:
+    """Decode a cursor token holding exactly `keys` (empty dict when no cursor given).
+
+    Raises PagingError for anything that isn't a token this module encoded.
+    """
+    if not cursor:
+        return {}
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise PagingError("Invalid cursor")
+    if not isinstance(data, dict) or set(data) != set(keys):
+        raise PagingError("Invalid cursor")
+    return data
+
+
+def decode_offset(cursor: Optional[str]) -> int:
+    """Row offset from an offset cursor ({"offset"}), 0 when no cursor given."""
+    offset = decode_cursor(cursor, ("offset",)).get("offset", 0)
+    if not _is_int(offset) or offset < 0:
+        raise PagingError("Invalid cursor")
+    return offset
+
+
+def decode_keyset(cursor: Optional[str]) -> Optional[Dict]:
+    """Keyset position ({"value", "seq"}) from a keyset cursor, None when no cursor given."""
+    after = decode_cursor(cursor, ("value", "seq"))
+    if not after:
+        return None
+    if not _is_int(after["seq"]) or not (after["value"] is None or isinstance(after["value"], (str, int, float))):
+        raise PagingError("Invalid cursor")
+    return after
+
+
+def validate(sort: Optional[str], order: str, limit: Optional[int]) -> Tuple[Optional[str], bool, Optional[int]]:
+    """Validate sort/order/limit and return (sort, descending, limit)."""
+    if sort is not None and sort not in SORT_FIELDS:
+        raise PagingError(f"sort must be one of: {', '.join(SORT_FIELDS)}")
+    if order not in ("asc", "desc"):
+        raise PagingError("order must be 'asc' or 'desc'")
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise PagingError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return sort, order == "desc", limit
+
+
+def _sort_key(field: str):
+    if field in ("followers", "score"):
+        return lambda lead: lead.get(field) or 0
+    return lambda lead: str(lead.get(field) or "").lower()
+
+
+def _sort_index(results: List[Dict], field: str) -> List[int]:
+    """Ascending permutation of results by field, cached per result set."""
+    global _sort_index_owner
+    if _sort_index_owner is not results:
+        _sort_index_owner = results
+        _sort_indexes.clear()
+    if field not in _sort_indexes:
+        key = _sort_key(field)
+        _sort_indexes[field] = sorted(range(len(results)), key=lambda i: key(results[i]))
+    return _sort_indexes[field]
+
+
+def _has_sort_index(results: List[Dict], field: str) -> bool:
+    return _sort_index_owner is results and field in _sort_indexes
+
+
+def _top_page(results: List[Dict], field: str, descending: bool, offset: int, limit: int) -> Dict:
+    """One page of sorted results via heap selection of the first offset + limit rows.
+
+    Ties come out in the same order as the full sort index would give them.
+    """
+    key = _sort_key(field)
+    total = len(results)
+    end = min(offset + limit, total)
+    if descending:
+        positions = heapq.nlargest(end, range(total - 1, -1, -1), key=lambda i: key(results[i]))
+    else:
+        positions = heapq.nsmallest(end, range(total), key=lambda i: key(results[i]))
+    items = [results[i] for i in positions[offset:end]]
+    next_cursor = encode_cursor({"offset": end}) if end < total else None
+    return {"total": total, "items": items, "next_cursor": next_cursor}
+
+
+def matches_filters(lead: Dict, platform: Optional[str] = None, region: Optional[str] = None,
+                    min_followers: Optional[int] = None) -> bool:
+    """Check a lead against the listing filters."""
+    if platform and (lead.get("platform") or "").lower() != platform.lower():
+        return False
+    if region and region.lower() not in (lead.get("region") or "").lower():
+        return False
+    if min_followers is not None and (lead.get("followers") or 0) < min_followers:
+        return False
+    return True
+
+
+def page_results(
+    results: List[Dict],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = "asc",
+    **filters
+) -> Dict:
+    """Sort, filter and slice an in-memory result set.
+
+    Returns {"total", "items", "next_cursor"}; total counts all filtered rows.
+    """
+    sort, descending, limit = validate(sort, order, limit)
+    offset = decode_offset(cursor)
+
+    active = any(v is not None and v != "" for v in filters.values())
+    if sort and limit is not None and not active and not _has_sort_index(results, sort):
+        return _top_page(results, sort, descending, offset, limit)
+
+    if sort:
+        positions = _sort_index(results, sort)
+        if descending:
+            positions = positions[::-1]
+    else:
+        positions = range(len(results))
+
+    if active:
+        positions = [i for i in positions if matches_filters(results[i], **filters)]
+
+    total = len(positions)
+    end = total if limit is None else min(offset + limit, total)
+    items = [results[i] for i in positions[offset:end]]
+    next_cursor = encode_cursor({"offset": end}) if end < total else None
+    return {"total": total, "items": items, "next_cursor": next_cursor}
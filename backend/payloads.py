@@ -0,0 +1,180 @@
+"""
+In-memory cache of JSON payloads parsed from files on disk.
+Each payload (the audience, pricing and scoring configs, the cost estimation
+document) is parsed once, pre-serialized to response bytes with an ETag, and
+rebuilt only when the source file's mtime/size changes, so editing the file
+takes effect on the next request without a restart and repeat requests skip
+parsing and encoding.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger("payloads")
+
+ROOT_DIR = Path(__file__).parent.parent
+AUDIENCE_PATH = ROOT_DIR / "config" / "audience.yaml"
+PRICING_PATH = ROOT_DIR / "config" / "pricing.yaml"
+SCORING_PATH = ROOT_DIR / "config" / "scoring.yaml"
+COST_DOC_PATH = ROOT_DIR / "docs" / "COST_ESTIMATION.md"
+
+# Cache-Control max-age for cached payloads; clients revalidate with If-None-Match after it
+PAYLOAD_MAX_AGE = int(os.getenv("PAYLOAD_MAX_AGE", "0"))
+
+
+class CachedPayload:
+    """A parsed file plus its serialized {"status": "success", "data": ...} body."""
+
+    def __init__(self, path: Path, parse: Callable[[str], Any]):
+        self.path = path
+        self.parse = parse
+        self.on_change: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._key: Optional[Tuple[int, int, int]] = None
+        self._data: Any = None
+        self._body = b""
+        self._etag = ""
+
+    def _refresh(self):
+        """Re-parse the file if it changed since the last build. Raises FileNotFoundError."""
+        stat = self.path.stat()
+        key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if key == self._key:
+            return
+        with self._lock:
+            if key == self._key:
+                return
+            data = self.parse(self.path.read_text(encoding="utf-8"))
+            body = json.dumps({"status": "success", "data": data}, ensure_ascii=False).encode("utf-8")
+            changed = self._key is not None
+            self._data, self._body, self._key = data, body, key
+            self._etag = '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest()
+        if changed:
+            logger.info("🔄 Reloaded %s", self.path.name)
+        for callback in self.on_change:
+            callback()
+
+    def data(self) -> Any:
+        """The parsed payload (shared; do not mutate)."""
+        self._refresh()
+        return self._data
+
+    def response(self) -> Tuple[bytes, str]:
+        """The serialized response body and its ETag."""
+        self._refresh()
+        return self._body, self._etag
+
+
+def parse_yaml(text: str) -> dict:
+    """Parse a YAML config file (config/audience.yaml, pricing.yaml, scoring.yaml)."""
+    return yaml.safe_load(text) or {}
+
+
+def parse_cost_markdown(content: str) -> dict:
+    """Parse the cost estimation markdown into renderable sections."""
+    sections = []
+    current_section = None
+    current_subsection = None
+    lines = content.split('\n')
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+
+        # H1 headers (# Title)
+        if line.startswith('# '):
+            current_section = {
+                'type': 'title',
+                'level': 1,
+                'content': line.replace('# ', '').strip(),
+                'subsections': []
+            }
+            sections.append(current_section)
+
+        # H2 headers (## Section)
+        elif line.startswith('## '):
+            current_subsection = {
+                'type': 'section',
+                'level': 2,
+                'title': line.replace('## ', '').strip(),
+                'content': []
+            }
+            if current_section:
+                current_section['subsections'].append(current_subsection)
+            else:
+                sections.append(current_subsection)
+
+        # H3 headers (### Subsection)
+        elif line.startswith('### '):
+            sub = {
+                'type': 'subsection',
+                'level': 3,
+                'title': line.replace('### ', '').strip(),
+                'content': []
+            }
+            if current_subsection:
+                current_subsection['content'].append(sub)
+            else:
+                sections.append(sub)
+
+        # Tables (starts with |)
+        elif stripped.startswith('|'):
+            table_lines = []
+            while i < len(lines) and lines[i].strip().startswith('|'):
+                table_lines.append(lines[i])
+                i += 1
+            i -= 1  # Back up one since we'll increment at loop end
+
+            if len(table_lines) >= 2:
+                # Header row, then skip the separator line (table_lines[1])
+                headers = [cell.strip() for cell in table_lines[0].split('|')[1:-1]]
+                rows = []
+                for row_line in table_lines[2:]:
+                    cells = [cell.strip() for cell in row_line.split('|')[1:-1]]
+                    if cells:
+                        rows.append(cells)
+
+                table = {'type': 'table', 'headers': headers, 'rows': rows}
+                if current_subsection:
+                    current_subsection['content'].append(table)
+                else:
+                    sections.append(table)
+
+        # Bullet points
+        elif stripped.startswith('- ') or stripped.startswith('* '):
+            bullet_items = []
+            while i < len(lines) and (lines[i].strip().startswith('- ') or lines[i].strip().startswith('* ')):
+                bullet_items.append(lines[i].strip()[2:])
+                i += 1
+            i -= 1
+
+            bullets = {'type': 'list', 'items': bullet_items}
+            if current_subsection:
+                current_subsection['content'].append(bullets)
+            else:
+                sections.append(bullets)
+
+        # Paragraphs (including **bold** lines)
+        elif '**' in line or (stripped and not line.startswith('#') and not line.startswith('---')):
+            if current_subsection:
+                current_subsection['content'].append({'type': 'paragraph', 'content': stripped})
+
+        i += 1
+
+    return {
+        "title": "Cost Estimation - Outreach Scraping Toolkit",
+        "sections": sections
+    }
+
+
+audience = CachedPayload(AUDIENCE_PATH, parse_yaml)
+pricing = CachedPayload(PRICING_PATH, parse_yaml)
+scoring = CachedPayload(SCORING_PATH, parse_yaml)
+cost_analysis = CachedPayload(COST_DOC_PATH, parse_cost_markdown)
@@ -0,0 +1,121 @@
+"""
+Compact in-memory lead records.
+Run results kept in memory (the runs LRU, finished jobs) are held as Lead
+records instead of dicts: one slot per schema field instead of a per-lead
+hash table, with low-cardinality strings (platform, region, notes, industry,
+company) interned so all leads share one copy. Fields outside the schema
+go to a small per-lead `extra` dict. A Lead reads like a read-only dict
+(get, [], in, keys, items, {**lead}) and dumps() encodes it straight to its
+API JSON object.
+"""
+import json
+import sys
+from collections.abc import Mapping
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List
+
+# Lead schema (see docs/ARCHITECTURE.md "Result Schema") plus the scraper's identity flags
+FIELDS = (
+    "id", "name", "role", "company", "platform", "contact_link",
+    "region", "notes", "followers", "verified", "industry",
+    "headline", "bio", "email", "website", "saved_at", "score",
+    "identity", "seen_before", "saved",
+)
+INTERNED = frozenset({"platform", "region", "notes", "industry", "company"})
+
+_FIELD_SET = frozenset(FIELDS)
+_MISSING = object()
+_get_all = attrgetter(*FIELDS)
+
+
+class Lead(Mapping):
+    """Slotted, read-only lead record."""
+
+    __slots__ = FIELDS + ("_extra",)
+
+    def __init__(self, data: Dict):
+        get = data.get
+        for key, set_slot in _slot_setters:
+            set_slot(self, get(key, _MISSING))
+        for key in INTERNED:
+            value = get(key)
+            if type(value) is str:
+                _slot_setters_by_key[key](self, sys.intern(value))
+        extra = None
+        if not data.keys() <= _FIELD_SET:
+            extra = {key: value for key, value in data.items() if key not in _FIELD_SET}
+        _set_extra(self, extra)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Lead records are read-only")
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __contains__(self, key) -> bool:
+        if key in _FIELD_SET:
+            return getattr(self, key) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for key, value in zip(FIELDS, _get_all(self)):
+            if value is not _MISSING:
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        present = sum(1 for value in _get_all(self) if value is not _MISSING)
+        return present + (len(self._extra) if self._extra is not None else 0)
+
+    def to_dict(self) -> Dict:
+        """The lead in API format, as a plain dict."""
+        data = {key: value for key, value in zip(FIELDS, _get_all(self)) if value is not _MISSING}
+        if self._extra is not None:
+            data.update(self._extra)
+        return data
+
+    def __repr__(self) -> str:
+        return f"Lead({self.to_dict()!r})"
+
+
+# Slot descriptors' setters (bypass the read-only __setattr__)
+_slot_setters = tuple((key, Lead.__dict__[key].__set__) for key in FIELDS)
+_slot_setters_by_key = dict(_slot_setters)
+_set_extra = Lead.__dict__["_extra"].__set__
+
+
+def pack(leads: Iterable[Dict]) -> List[Lead]:
+    """Convert lead dicts to Lead records."""
+    return [lead if isinstance(lead, Lead) else Lead(lead) for lead in leads]
+
+
+def from_json(text: str) -> Lead:
+    """Decode one stored lead (run_results.data) into a record."""
+    return Lead(json.loads(text))
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Lead):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode a response payload that may contain Lead records (same output as FastAPI's JSONResponse)."""
+    return json.dumps(payload, default=_default, ensure_ascii=False,
+                      allow_nan=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,254 @@
+"""
+Persisted search runs.
+Each scrape's result set is stored as a named run (keyed by run ID and an
+optional session ID) in the SQLite database. A bounded LRU keeps the most
+recently used runs in memory, as compact Lead records (records.py); older
+runs are read back from disk on demand.
+Run results are full-text indexed like saved leads; an index row's rowid is
+the run's seq (its explicit integer key) * 2^32 + the result position, so a
+run's rows form one range.
+"""
+import json
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import database as db
+import metrics
+import records
+
+# Limits (override via environment)
+RUN_CACHE_SIZE = int(os.getenv("RUN_CACHE_SIZE", "8"))
+MAX_STORED_RUNS = int(os.getenv("MAX_STORED_RUNS", "200"))
+
+RUNS_TABLE = """
+CREATE TABLE IF NOT EXISTS runs (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    session TEXT,
+    created_at TEXT NOT NULL,
+    params TEXT NOT NULL,
+    result_count INTEGER NOT NULL
+)"""
+
+SCHEMA = RUNS_TABLE + """;
+CREATE INDEX IF NOT EXISTS idx_runs_session ON runs(session, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs(created_at);
+
+CREATE TABLE IF NOT EXISTS run_results (
+    run_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (run_id, position)
+) WITHOUT ROWID;
+"""
+
+RUN_ROWID_SHIFT = 2 ** 32
+
+FTS_TRIGGERS = ("run_results_fts_insert", "runs_fts_delete")
+FTS_SCHEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS run_results_fts USING fts5({", ".join(db.FTS_COLUMNS)}, {db.FTS_OPTIONS});
+CREATE TRIGGER IF NOT EXISTS run_results_fts_insert AFTER INSERT ON run_results BEGIN
+    INSERT INTO run_results_fts (rowid, {", ".join(db.FTS_COLUMNS)}) VALUES (
+        (SELECT seq FROM runs WHERE id = NEW.run_id) * {RUN_ROWID_SHIFT} + NEW.position,
+        {db.fts_values("NEW.data")});
+END;
+CREATE TRIGGER IF NOT EXISTS runs_fts_delete AFTER DELETE ON runs BEGIN
+    DELETE FROM run_results_fts
+    WHERE rowid BETWEEN OLD.seq * {RUN_ROWID_SHIFT} AND OLD.seq * {RUN_ROWID_SHIFT} + {RUN_ROWID_SHIFT - 1};
+END;
+"""
+
+# LRU of run_id -> results for recently used runs
+_cache: "OrderedDict[str, List[records.Lead]]" = OrderedDict()
+_schema_ready = False
+
+
+def _connect():
+    """Get the shared connection, creating the runs tables on first use."""
+    global _schema_ready
+    conn = db.get_connection()
+    if not _schema_ready:
+        with db._lock:
+            conn.executescript(SCHEMA)
+            db.add_seq_key(conn, "runs", RUNS_TABLE, FTS_TRIGGERS)
+            conn.executescript(SCHEMA)  # indexes of a rebuilt runs table
+            db.create_fts_index(
+                conn, "run_results_fts", FTS_SCHEMA,
+                f"SELECT runs.seq * {RUN_ROWID_SHIFT} + position, {db.fts_values('run_results.data')} "
+                f"FROM run_results JOIN runs ON runs.id = run_results.run_id"
+            )
+        _schema_ready = True
+    return conn
+
+
+def _remember(run_id: str, results: List[records.Lead]):
+    """Put a run's results in the LRU, evicting the least recently used run."""
+    _cache[run_id] = results
+    _cache.move_to_end(run_id)
+    while len(_cache) > RUN_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def _row_to_run(row) -> Dict:
+    run_id, session, created_at, params, result_count = row
+    return {
+        "id": run_id,
+        "session": session,
+        "created_at": created_at,
+        "params": json.loads(params),
+        "result_count": result_count,
+    }
+
+
+def create_run(results: List[Dict], params: Dict, session: Optional[str] = None) -> Dict:
+    """Persist a result set as a new run and return its metadata."""
+    run = {
+        "id": f"run_{uuid.uuid4().hex[:12]}",
+        "session": session,
+        "created_at": datetime.now().isoformat(),
+        "params": params,
+        "result_count": len(results),
+    }
+    with db._lock, metrics.STORAGE_WRITE_SECONDS.time(op="create_run"):
+        conn = _connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO runs (id, session, created_at, params, result_count) VALUES (?, ?, ?, ?, ?)",
+                (run["id"], session, run["created_at"], json.dumps(params), len(results))
+            )
+            conn.executemany(
+                "INSERT INTO run_results (run_id, position, data) VALUES (?, ?, ?)",
+                ((run["id"], i, json.dumps(lead)) for i, lead in enumerate(results))
+            )
+            _prune(conn)
+        _remember(run["id"], records.pack(results))
+    return run
+
+
+def _prune(conn):
+    """Delete the oldest runs beyond MAX_STORED_RUNS."""
+    stale = [row[0] for row in conn.execute(
+        "SELECT id FROM runs ORDER BY created_at DESC LIMIT -1 OFFSET ?", (MAX_STORED_RUNS,)
+    )]
+    for run_id in stale:
+        conn.execute("DELETE FROM run_results WHERE run_id = ?", (run_id,))
+        conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+        _cache.pop(run_id, None)
+
+
+def get_run(run_id: str) -> Optional[Dict]:
+    """Get run metadata by ID."""
+    with db._lock:
+        row = _connect().execute(
+            "SELECT id, session, created_at, params, result_count FROM runs WHERE id = ?", (run_id,)
+        ).fetchone()
+    return _row_to_run(row) if row else None
+
+
+def list_runs(session: Optional[str] = None, limit: int = 50) -> List[Dict]:
+    """List run metadata, newest first, optionally for one session."""
+    sql = "SELECT id, session, created_at, params, result_count FROM runs"
+    params: list = []
+    if session:
+        sql += " WHERE session = ?"
+        params.append(session)
+    sql += " ORDER BY created_at DESC LIMIT ?"
+    params.append(limit)
+    with db._lock:
+        rows = _connect().execute(sql, params).fetchall()
+    return [_row_to_run(row) for row in rows]
+
+
+def latest_run_id(session: Optional[str] = None) -> Optional[str]:
+    """ID of the most recent run (for a session, if given)."""
+    runs = list_runs(session, limit=1)
+    return runs[0]["id"] if runs else None
+
+
+def get_run_results(run_id: str) -> Optional[List[records.Lead]]:
+    """Get a run's results (read-only Lead records), from the LRU or loaded from disk. None if unknown."""
+    with db._lock:
+        if run_id in _cache:
+            _cache.move_to_end(run_id)
+            return _cache[run_id]
+        conn = _connect()
+        if conn.execute("SELECT 1 FROM runs WHERE id = ?", (run_id,)).fetchone() is None:
+            return None
+        results = [records.from_json(data) for (data,) in conn.execute(
+            "SELECT data FROM run_results WHERE run_id = ? ORDER BY position", (run_id,)
+        )]
+        _remember(run_id, results)
+    return results
+
+
+def iter_run_results(run_id: str, batch_size: int = 500) -> Iterator[Dict]:
+    """Yield a run's results page by page without loading them into the LRU."""
+    with db._lock:
+        cached = _cache.get(run_id)
+    if cached is not None:
+        yield from cached
+        return
+
+    position = -1
+    while True:
+        with db._lock:
+            rows = _connect().execute(
+                "SELECT position, data FROM run_results WHERE run_id = ? AND position > ? "
+                "ORDER BY position LIMIT ?", (run_id, position, batch_size)
+            ).fetchall()
+        if not rows:
+            return
+        for position, data in rows:
+            yield json.loads(data)
+
+
+def search_results(query: str, run_id: Optional[str] = None, limit: int = 20, offset: int = 0) -> Dict:
+    """Ranked full-text search over stored run results (one run, or all of them).
+
+    Returns {"total", "items"}; each item is {"lead", "score", "snippet",
+    "run_id", "position"}, best match first.
+    """
+    match = db.fts_query(query)
+    if not match:
+        return {"total": 0, "items": []}
+    where, params = "run_results_fts MATCH ?", [match]
+    with db._lock:
+        conn = _connect()
+        if run_id:
+            row = conn.execute("SELECT seq FROM runs WHERE id = ?", (run_id,)).fetchone()
+            if row is None:
+                return {"total": 0, "items": []}
+            where += " AND run_results_fts.rowid BETWEEN ? AND ?"
+            params += [row[0] * RUN_ROWID_SHIFT, row[0] * RUN_ROWID_SHIFT + RUN_ROWID_SHIFT - 1]
+        total = conn.execute(f"SELECT COUNT(*) FROM run_results_fts WHERE {where}", params).fetchone()[0]
+        weights = ", ".join(str(w) for w in db.FTS_WEIGHTS)
+        rows = conn.execute(
+            f"SELECT runs.id, run_results.position, run_results.data, "
+            f"bm25(run_results_fts, {weights}) AS score, snippet(run_results_fts, -1, '[', ']', '…', 12) "
+            f"FROM run_results_fts "
+            f"JOIN runs ON runs.seq = run_results_fts.rowid / {RUN_ROWID_SHIFT} "
+            f"JOIN run_results ON run_results.run_id = runs.id "
+            f"AND run_results.position = run_results_fts.rowid % {RUN_ROWID_SHIFT} "
+            f"WHERE {where} ORDER BY score LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+    return {
+        "total": total,
+        "items": [{"lead": json.loads(data), "score": round(-score, 4), "snippet": snippet,
+                   "run_id": found_run, "position": position}
+                  for found_run, position, data, score, snippet in rows],
+    }
+
+
+def delete_run(run_id: str) -> bool:
+    """Delete a run and its results."""
+    with db._lock:
+        conn = _connect()
+        with conn:
+            conn.execute("DELETE FROM run_results WHERE run_id = ?", (run_id,))
+            cur = conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+        _cache.pop(run_id, None)
+    return cur.rowcount > 0
@@ -0,0 +1,434 @@
+"""
+Persistent cron-style scheduler for saved searches.
+Schedules (a saved search + a 5-field cron expression) live in the SQLite
+database together with their next run time, so they survive restarts; runs
+missed while the server was down are caught up once. A background task
+starts due runs through the job pool, only inside the off-peak window
+(SCHEDULER_WINDOW), at most SCHEDULER_MAX_CONCURRENT at a time and
+SCHEDULER_SPACING_SECONDS apart, so scheduled work never bursts against
+Apify concurrency limits; runs the daily budget can't cover wait until it
+can. Each run is stored as a search run, so the UI
+can read precomputed results instead of scraping live. A schedule is claimed
+in the database (running_since) before its job is submitted, so it is never
+submitted twice; claims left by a restart are cleared on startup.
+"""
+import asyncio
+import calendar
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import costs
+import database as db
+import jobs
+import searches
+from scraper import fetch_size, results_to_fetch
+
+logger = logging.getLogger("scheduler")
+
+# Scheduler settings (override via environment)
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "1") not in ("0", "false", "False")
+SCHEDULER_WINDOW = os.getenv("SCHEDULER_WINDOW", "")  # "HH:MM-HH:MM" local time, empty = any time
+SCHEDULER_MAX_CONCURRENT = int(os.getenv("SCHEDULER_MAX_CONCURRENT", "1"))
+SCHEDULER_SPACING_SECONDS = float(os.getenv("SCHEDULER_SPACING_SECONDS", "60"))
+SCHEDULER_TICK_SECONDS = float(os.getenv("SCHEDULER_TICK_SECONDS", "30"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    id TEXT PRIMARY KEY,
+    search_id TEXT NOT NULL,
+    cron TEXT NOT NULL,
+    enabled INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL,
+    next_run_at TEXT NOT NULL,
+    last_run_at TEXT,
+    last_status TEXT,
+    last_error TEXT,
+    last_run_id TEXT,
+    running_since TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_schedules_next_run ON schedules(enabled, next_run_at);
+"""
+
+COLUMNS = ("id, search_id, cron, enabled, created_at, next_run_at, last_run_at, last_status, last_error, "
+           "last_run_id, running_since")
+
+MACROS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+_schema_ready = False
+
+# Runner state: the saved-search runner and when the last run started
+Runner = Callable[..., Awaitable[Dict]]
+_runner: Optional[Runner] = None
+_task: Optional[asyncio.Task] = None
+_last_start = 0.0
+_stats = {"started": 0, "succeeded": 0, "failed": 0, "deferred": 0, "deferred_budget": 0}
+
+
+class CronSpec:
+    """A parsed 5-field cron expression (minute hour day-of-month month day-of-week)."""
+
+    RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+    def __init__(self, expr: str):
+        self.expr = expr.strip()
+        fields = MACROS.get(self.expr, self.expr).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+        # Day-of-week 7 is Sunday too
+        fields[4] = ",".join("0" if part == "7" else part for part in fields[4].split(","))
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_field(field, low, high) for field, (low, high) in zip(fields, self.RANGES)
+        )
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def _day_matches(self, dt: datetime) -> bool:
+        # Cron semantics: if both day fields are restricted, either may match
+        in_days = dt.day in self.days
+        in_weekdays = (dt.weekday() + 1) % 7 in self.weekdays
+        if self.any_day:
+            return in_weekdays
+        if self.any_weekday:
+            return in_days
+        return in_days or in_weekdays
+
+    def next_after(self, dt: datetime) -> datetime:
+        """First matching minute strictly after dt."""
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                days_left = calendar.monthrange(t.year, t.month)[1] - t.day + 1
+                t = (t + timedelta(days=days_left)).replace(hour=0, minute=0)
+            elif not self._day_matches(t):
+                t = (t + timedelta(days=1)).replace(hour=0, minute=0)
+            elif t.hour not in self.hours:
+                t = (t + timedelta(hours=1)).replace(minute=0)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"Cron expression never matches: {self.expr!r}")
+
+
+def _parse_field(field: str, low: int, high: int) -> Set[int]:
+    """Parse one cron field (*, n, a-b, */s, a-b/s, comma lists) into its values."""
+    values: Set[int] = set()
+    for part in field.split(","):
+        spec, _, step = part.partition("/")
+        try:
+            if spec == "*":
+                start, end = low, high
+            elif "-" in spec:
+                start, end = (int(v) for v in spec.split("-", 1))
+            else:
+                start = end = int(spec)
+                if step:
+                    end = high
+            stride = int(step) if step else 1
+        except ValueError:
+            raise ValueError(f"Invalid cron field {field!r}")
+        if not (low <= start <= end <= high) or stride < 1:
+            raise ValueError(f"Cron field {field!r} out of range {low}-{high}")
+        values.update(range(start, end + 1, stride))
+    return values
+
+
+def _parse_window(window: str) -> Optional[Tuple[int, int]]:
+    """'HH:MM-HH:MM' as (start, end) minutes after midnight; None for no window."""
+    if not window:
+        return None
+    bounds = []
+    for hhmm in window.split("-", 1):
+        hours, _, minutes = hhmm.strip().partition(":")
+        bounds.append(int(hours) * 60 + int(minutes or 0))
+    return bounds[0], bounds[1]
+
+
+def in_window(now: datetime, window: str = SCHEDULER_WINDOW) -> bool:
+    """Whether now falls in the off-peak window (which may wrap past midnight)."""
+    bounds = _parse_window(window)
+    if bounds is None:
+        return True
+    start, end = bounds
+    minute = now.hour * 60 + now.minute
+    if start <= end:
+        return start <= minute < end
+    return minute >= start or minute < end
+
+
+# Storage
+def _connect():
+    """Get the shared connection, creating the schedules table on first use."""
+    global _schema_ready
+    conn = db.get_connection()
+    if not _schema_ready:
+        with db._lock:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(schedules)")}
+            if "running_since" not in columns:
+                with conn:
+                    conn.execute("ALTER TABLE schedules ADD COLUMN running_since TEXT")
+        _schema_ready = True
+    return conn
+
+
+def _row_to_schedule(row) -> Dict:
+    schedule = dict(zip(COLUMNS.split(", "), row))
+    schedule["enabled"] = bool(schedule["enabled"])
+    schedule["running"] = schedule["running_since"] is not None
+    return schedule
+
+
+def create_schedule(search_id: str, cron: str, enabled: bool = True) -> Dict:
+    """Schedule a saved search. Raises ValueError for an invalid cron expression."""
+    now = datetime.now()
+    next_run = CronSpec(cron).next_after(now)
+    schedule_id = f"sched_{uuid.uuid4().hex[:12]}"
+    with db._lock:
+        conn = _connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO schedules (id, search_id, cron, enabled, created_at, next_run_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (schedule_id, search_id, cron, int(enabled), now.isoformat(), next_run.isoformat())
+            )
+    return get_schedule(schedule_id)
+
+
+def get_schedule(schedule_id: str) -> Optional[Dict]:
+    """Get a schedule by ID."""
+    with db._lock:
+        row = _connect().execute(f"SELECT {COLUMNS} FROM schedules WHERE id = ?", (schedule_id,)).fetchone()
+    return _row_to_schedule(row) if row else None
+
+
+def list_schedules() -> List[Dict]:
+    """List schedules, soonest next run first."""
+    with db._lock:
+        rows = _connect().execute(f"SELECT {COLUMNS} FROM schedules ORDER BY next_run_at").fetchall()
+    return [_row_to_schedule(row) for row in rows]
+
+
+def set_enabled(schedule_id: str, enabled: bool) -> bool:
+    """Pause or resume a schedule; resuming recomputes its next run from now."""
+    with db._lock:
+        conn = _connect()
+        row = conn.execute("SELECT cron FROM schedules WHERE id = ?", (schedule_id,)).fetchone()
+        if row is None:
+            return False
+        with conn:
+            conn.execute(
+                "UPDATE schedules SET enabled = ?, next_run_at = ? WHERE id = ?",
+                (int(enabled), CronSpec(row[0]).next_after(datetime.now()).isoformat(), schedule_id)
+            )
+    return True
+
+
+def delete_schedule(schedule_id: str) -> bool:
+    """Delete a schedule."""
+    with db._lock:
+        conn = _connect()
+        with conn:
+            cur = conn.execute("DELETE FROM schedules WHERE id = ?", (schedule_id,))
+    return cur.rowcount > 0
+
+
+def delete_schedules_for_search(search_id: str):
+    """Delete every schedule of a saved search."""
+    with db._lock:
+        conn = _connect()
+        with conn:
+            conn.execute("DELETE FROM schedules WHERE search_id = ?", (search_id,))
+
+
+def _due_schedules(now: datetime, limit: int) -> List[Tuple[str, str, str]]:
+    """(id, search_id, cron) of enabled, not running schedules due at `now`, oldest due first."""
+    with db._lock:
+        return _connect().execute(
+            "SELECT id, search_id, cron FROM schedules "
+            "WHERE enabled = 1 AND next_run_at <= ? AND running_since IS NULL "
+            "ORDER BY next_run_at LIMIT ?", (now.isoformat(), limit)
+        ).fetchall()
+
+
+def _count_running() -> int:
+    with db._lock:
+        return _connect().execute(
+            "SELECT COUNT(*) FROM schedules WHERE running_since IS NOT NULL"
+        ).fetchone()[0]
+
+
+def _claim(schedule_id: str, now: datetime) -> bool:
+    """Mark a schedule running unless it already is; False if another tick claimed it."""
+    with db._lock:
+        conn = _connect()
+        with conn:
+            cur = conn.execute(
+                "UPDATE schedules SET running_since = ? WHERE id = ? AND running_since IS NULL",
+                (now.isoformat(), schedule_id)
+            )
+    return cur.rowcount == 1
+
+
+def _release(schedule_id: str):
+    """Undo a claim whose job was never submitted (the schedule stays due)."""
+    with db._lock:
+        conn = _connect()
+        with conn:
+            conn.execute("UPDATE schedules SET running_since = NULL WHERE id = ?", (schedule_id,))
+
+
+def _mark_started(schedule_id: str, cron: str, now: datetime):
+    """Advance next_run_at past now (missed runs collapse into this one)."""
+    with db._lock:
+        conn = _connect()
+        with conn:
+            conn.execute(
+                "UPDATE schedules SET next_run_at = ?, last_run_at = ?, last_status = 'running' WHERE id = ?",
+                (CronSpec(cron).next_after(now).isoformat(), now.isoformat(), schedule_id)
+            )
+
+
+def _mark_finished(schedule_id: str, status: str, run_id: Optional[str] = None, error: Optional[str] = None):
+    with db._lock:
+        conn = _connect()
+        with conn:
+            conn.execute(
+                "UPDATE schedules SET last_status = ?, last_run_id = COALESCE(?, last_run_id), last_error = ?, "
+                "running_since = NULL WHERE id = ?", (status, run_id, error, schedule_id)
+            )
+
+
+def _clear_interrupted() -> int:
+    """Release runs left marked running by a previous process; their jobs died with it."""
+    with db._lock:
+        conn = _connect()
+        with conn:
+            cur = conn.execute(
+                "UPDATE schedules SET running_since = NULL, last_status = 'interrupted', "
+                "last_error = 'Server stopped during the run' WHERE running_since IS NOT NULL"
+            )
+    return cur.rowcount
+
+
+# Runner
+async def _execute(schedule_id: str, job_id: str):
+    """Wait for one scheduled run's job and record the outcome."""
+    try:
+        outcome = await jobs.wait_for_job(job_id)
+    except Exception as e:
+        _stats["failed"] += 1
+        _mark_finished(schedule_id, "failed", error=str(e))
+        logger.warning("⏰ Scheduled run %s failed: %s", schedule_id, e)
+    else:
+        _stats["succeeded"] += 1
+        _mark_finished(schedule_id, "succeeded", run_id=outcome["run_id"])
+        logger.info("⏰ Scheduled run %s stored %d new leads as %s",
+                    schedule_id, len(outcome["results"]), outcome["run_id"])
+
+
+def _affordable(search_id: str) -> bool:
+    """Whether a saved search's estimated actor cost fits today's remaining budget.
+
+    Sized like the delta run itself: over-fetched past the watermark, then
+    scaled by the platform's raw-items-per-lead ratio.
+    """
+    search = searches.get_search(search_id)
+    if search is None:
+        return True
+    params = search["params"]
+    platform = "x" if params.get("platform") == "twitter" else params.get("platform", "linkedin")
+    max_results = results_to_fetch(params.get("max_results", 20), params.get("skip_seen", False),
+                                   searches.get_watermark(search_id))
+    return costs.can_afford(platform, fetch_size(platform, max_results))
+
+
+def tick(now: Optional[datetime] = None) -> int:
+    """Start due runs that fit the window, concurrency and spacing limits. Returns runs started."""
+    global _last_start
+    now = now or datetime.now()
+    if _runner is None or not in_window(now):
+        return 0
+    capacity = SCHEDULER_MAX_CONCURRENT - _count_running()
+    if capacity <= 0:
+        return 0
+
+    started = 0
+    for schedule_id, search_id, cron in _due_schedules(now, capacity + 1):
+        if started >= capacity or time.monotonic() - _last_start < SCHEDULER_SPACING_SECONDS:
+            _stats["deferred"] += 1
+            break
+        if not _affordable(search_id):
+            # Left due (next_run_at unchanged) so it runs once the budget allows
+            _stats["deferred_budget"] += 1
+            continue
+        if not _claim(schedule_id, now):
+            continue
+        try:
+            # Delta runs always fetch live (the query cache is skipped for saved searches)
+            job_id = jobs.submit_job({"search_id": search_id}, _runner)
+        except jobs.QueueFullError:
+            # Left due so the next tick retries it
+            _release(schedule_id)
+            _stats["deferred"] += 1
+            break
+        _mark_started(schedule_id, cron, now)
+        _last_start = time.monotonic()
+        _stats["started"] += 1
+        started += 1
+        asyncio.create_task(_execute(schedule_id, job_id))
+    return started
+
+
+async def _loop():
+    while True:
+        try:
+            tick()
+        except Exception as e:
+            logger.error("⏰ Scheduler tick failed: %s", e)
+        await asyncio.sleep(SCHEDULER_TICK_SECONDS)
+
+
+def start(runner: Runner):
+    """Start the scheduler loop; runner(search_id=...) runs one saved search."""
+    global _runner, _task, _last_start
+    _runner = runner
+    interrupted = _clear_interrupted()
+    if interrupted:
+        logger.warning("⏰ %d scheduled runs were interrupted by a restart", interrupted)
+    # The first run after startup waits one spacing interval too
+    _last_start = time.monotonic()
+    if SCHEDULER_ENABLED and _task is None:
+        _task = asyncio.create_task(_loop())
+
+
+async def stop():
+    """Stop the scheduler loop (in-flight runs finish in the job pool)."""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        _task = None
+
+
+def get_stats() -> Dict:
+    """Scheduler settings and counters."""
+    return {
+        "enabled": SCHEDULER_ENABLED,
+        "active": _task is not None,
+        "window": SCHEDULER_WINDOW or None,
+        "max_concurrent": SCHEDULER_MAX_CONCURRENT,
+        "spacing_seconds": SCHEDULER_SPACING_SECONDS,
+        "running": _count_running(),
+        **_stats,
+    }
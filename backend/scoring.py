@@ -0,0 +1,161 @@
+"""
+Lead scoring against the target audience.
+config/audience.yaml (roles, industries, regions) and config/scoring.yaml
+(weights, aliases) are compiled once into a Scorer: one alternation regex
+for roles, one for industry keywords, and the set of audience regions. A
+result set is scored column by column: each signal is computed once per
+distinct value of the fields it reads (many leads share a region or
+headline) and the weighted sum is a 0-100 `score` on every lead.
+"""
+import math
+import re
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import extract
+import payloads
+
+DEFAULT_WEIGHTS = {"role": 35, "region": 25, "industry": 20, "followers": 10, "verified": 10}
+
+_lock = threading.Lock()
+_scorer: Optional["Scorer"] = None
+
+
+def _singular(word: str) -> str:
+    """'Founders' -> 'Founder', 'CEOs' -> 'CEO' (leaves 'boss', 'analysis' alone)."""
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "is", "us")):
+        return word[:-1]
+    return word
+
+
+def _phrase_pattern(phrase: str) -> str:
+    """Regex for a phrase: optional plural on each word, any spacing or hyphen between words."""
+    words = re.split(r"[\s-]+", phrase.strip())
+    return r"[\s-]*".join(re.escape(_singular(w)) + "s?" for w in words if w)
+
+
+def _alternation(phrases: Iterable[str]) -> Optional[re.Pattern]:
+    """Case-insensitive whole-word regex matching any of the phrases (None if there are none)."""
+    parts = sorted({_phrase_pattern(p) for p in phrases if p and p.strip()}, key=len, reverse=True)
+    if not parts:
+        return None
+    return re.compile(rf"(?<!\w)(?:{'|'.join(parts)})(?!\w)", re.IGNORECASE)
+
+
+def _followers(value) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class Scorer:
+    """Compiled audience matchers and weights."""
+
+    def __init__(self, audience: Dict, config: Dict):
+        role_aliases = config.get("role_aliases") or {}
+        industry_aliases = config.get("industry_aliases") or {}
+        roles = audience.get("roles") or []
+        industries = audience.get("industries") or []
+        self.role_pattern = _alternation(
+            [*roles, *(a for r in roles for a in role_aliases.get(r) or [])]
+        )
+        self.industry_pattern = _alternation(
+            [*industries, *(a for i in industries for a in industry_aliases.get(i) or [])]
+        )
+        self.regions = {r.lower() for r in audience.get("regions") or []}
+
+        weights = {**DEFAULT_WEIGHTS, **(config.get("weights") or {})}
+        total = sum(weights.values()) or 1
+        # Normalised so a lead matching every signal scores 100
+        self.weights = {k: 100.0 * v / total for k, v in weights.items()}
+        self.followers_full = max(int(config.get("followers_full") or 10000), 2)
+
+    def _text_signal(self, pattern: Optional[re.Pattern], strong: List[str], bios: List[str]) -> List[float]:
+        """1 for a match in the strong text, 0.5 for a match in the bio only, else 0."""
+        if pattern is None:
+            return [0.0] * len(strong)
+        search = pattern.search
+        strong_hits = {t: bool(search(t)) for t in set(strong)}
+        bio_hits: Dict[str, bool] = {}
+        column = []
+        for text, bio in zip(strong, bios):
+            if strong_hits[text]:
+                column.append(1.0)
+                continue
+            if bio not in bio_hits:
+                bio_hits[bio] = bool(search(bio))
+            column.append(0.5 if bio_hits[bio] else 0.0)
+        return column
+
+    def _region_signal(self, regions: List[str]) -> List[float]:
+        """1 if the lead's region falls in an audience region (via the gazetteer)."""
+        extractor = extract.get_extractor()
+        hits = {}
+        for region in set(regions):
+            audience_region = extractor.extract(region).audience_region if region else ""
+            hits[region] = 1.0 if audience_region.lower() in self.regions else 0.0
+        return [hits[r] for r in regions]
+
+    def _followers_signal(self, followers: List[int]) -> List[float]:
+        """log10(followers) / log10(followers_full), capped at 1."""
+        scale = math.log10(self.followers_full)
+        return [min(math.log10(f) / scale, 1.0) if f > 1 else 0.0 for f in followers]
+
+    def score_batch(self, leads: List[Dict]) -> List[float]:
+        """Fit scores (0-100, 1 decimal) for a batch of leads, in input order."""
+        if not leads:
+            return []
+        bios = [lead.get("bio") or "" for lead in leads]
+        columns = {
+            "role": self._text_signal(
+                self.role_pattern,
+                [f"{lead.get('role') or ''}\n{lead.get('headline') or ''}" for lead in leads], bios
+            ),
+            "region": self._region_signal([lead.get("region") or "" for lead in leads]),
+            "industry": self._text_signal(
+                self.industry_pattern,
+                [f"{lead.get('industry') or ''}\n{lead.get('headline') or ''}\n{lead.get('company') or ''}"
+                 for lead in leads], bios
+            ),
+            "followers": self._followers_signal([_followers(lead.get("followers")) for lead in leads]),
+            "verified": [1.0 if lead.get("verified") else 0.0 for lead in leads],
+        }
+        totals = [0.0] * len(leads)
+        for name, column in columns.items():
+            weight = self.weights.get(name, 0.0)
+            if weight:
+                totals = [t + weight * v for t, v in zip(totals, column)]
+        return [round(t, 1) for t in totals]
+
+
+def get_scorer() -> Scorer:
+    """Get the compiled scorer (built on first use and after a config change)."""
+    global _scorer
+    # Read configs outside the lock: a changed file calls reload() from data()
+    audience, config = payloads.audience.data(), payloads.scoring.data()
+    with _lock:
+        if _scorer is None:
+            _scorer = Scorer(audience, config)
+        return _scorer
+
+
+def reload():
+    """Drop the compiled scorer so config files are re-read."""
+    global _scorer
+    with _lock:
+        _scorer = None
+
+
+def score_leads(leads: List[Dict]) -> List[Dict]:
+    """Set `score` on each lead (in place) and return the leads."""
+    for lead, score in zip(leads, get_scorer().score_batch(leads)):
+        lead["score"] = score
+    return leads
+
+
+def rank(leads: List[Dict]) -> List[Dict]:
+    """Score leads and sort them in place, best first (stable for equal scores)."""
+    score_leads(leads)
+    leads.sort(key=lambda lead: -lead["score"])
+    return leads
@@ -2,11 +2,35 @@
 Apify integration module for multi-platform lead scraping.
 Supports: LinkedIn (via Exa.ai), X (Twitter)
 Requires APIFY_API_TOKEN and EXA_API_KEY to be set.
+
+The pipeline is natively async: actor calls and dataset reads go through the
+pooled client in apify.py, and the iter_* functions are async generators.
+Dataset pages are consumed while the actor is still running; once enough
+leads are collected the stream is closed, which aborts the remote run.
+Dataset reads are projected to the fields the parsers use, and how many items
+each actor is asked for adapts to the observed raw-items-per-lead ratio.
 """
+import asyncio
+import logging
+import math
 import os
+import time
 import uuid
-from typing import List, Dict
-from apify_client import ApifyClient
+from contextlib import aclosing
+from typing import AsyncIterator, List, Dict, Optional, Set
+
+import apify
+import cache
+import costs
+import database as db
+import extract
+import filters
+import limiter
+import metrics
+import singleflight
+from identity import lead_identity
+
+logger = logging.getLogger(__name__)
 
 
 # Platform-specific Apify Actor IDs
@@ -16,66 +40,106 @@ ACTORS = {
     "twitter": "kaitoeasyapi/twitter-x-data-tweet-scraper-pay-per-result-cheapest",
 }
 
+# Dataset items classified together by the filter stage
+FILTER_PAGE_SIZE = 100
 
-def get_client() -> ApifyClient:
-    """Get Apify client with token validation."""
-    apify_token = os.getenv("APIFY_API_TOKEN")
-    if not apify_token:
-        raise ValueError("APIFY_API_TOKEN environment variable is required")
-    return ApifyClient(apify_token)
+# Dataset fields each parser reads (everything else is projected away)
+DATASET_FIELDS = {
+    "linkedin": "author,name,title,text,url",
+    "x": "author",
+}
 
+# Raw dataset items needed per kept lead, tracked as an EWMA per platform and
+# used to size actor requests. Starting values match the old fixed factors.
+FETCH_RATIO_DEFAULTS = {"linkedin": 1.0, "x": 3.0}
+FETCH_RATIO_ALPHA = 0.3
+MAX_FETCH_RATIO = 10.0
+MIN_FETCH_ITEMS = {"linkedin": 1, "x": 20}
+# Cap on over-fetching: an actor is asked for at most max_results plus this many
+# items, or twice max_results for large requests
+MAX_EXTRA_FETCH_ITEMS = {"linkedin": 50, "x": 200}
 
-def is_organization(name: str, bio: str, headline: str) -> bool:
-    """Check if a result looks like an organization/company rather than a person."""
-    name_lower = name.lower()
+_fetch_ratio: Dict[str, float] = dict(FETCH_RATIO_DEFAULTS)
 
-    # Only check name for clear organization indicators
-    # These are words that are very unlikely to appear in a person's actual name
-    org_name_indicators = [
-        " inc", " ltd", " llc", " corp", " gmbh", " ag",
-        "company", "group", "agency", "network", "foundation",
-        "institute", "association", "university", "college"
-    ]
+# Over-fetch factor (and cap) used when skip_seen filters out known leads
+SKIP_SEEN_OVERFETCH = 3
+MAX_SKIP_SEEN_RESULTS = 100
 
-    # Check if name contains organization indicators
-    for indicator in org_name_indicators:
-        if indicator in name_lower:
-            return True
 
-    # Check if name has no space (single word - likely a brand)
-    words = name.split()
-    if len(words) == 1 and len(name) > 3:
-        # Single word names that look like brands (CamelCase)
-        if any(c.isupper() for c in name[1:]):
-            return True
+def fetch_size(platform: str, max_results: int) -> int:
+    """How many raw items to request from the actor to end up with max_results leads."""
+    ratio = _fetch_ratio.get(platform, 1.0)
+    size = max(math.ceil(max_results * ratio), max_results, MIN_FETCH_ITEMS.get(platform, 1))
+    return min(size, max_results + max(MAX_EXTRA_FETCH_ITEMS.get(platform, size), max_results))
 
-    return False
 
+def results_to_fetch(max_results: int, skip_seen: bool = False, exclude: Optional[Set[str]] = None) -> int:
+    """Leads to ask for so max_results remain after skip_seen/exclude drop known ones."""
+    if skip_seen or exclude:
+        # Actors can't exclude known profiles, so over-fetch to leave room for new ones
+        return max(max_results, min(max_results * SKIP_SEEN_OVERFETCH, MAX_SKIP_SEEN_RESULTS))
+    return max_results
 
-def scrape_linkedin(keyword: str, location: str, max_results: int, position: str = "", company: str = "") -> List[Dict]:
-    """Scrape LinkedIn PEOPLE profiles using Apify + Exa.ai.
 
-    Args:
-        keyword: Main search term (e.g., "AI", "startup")
-        location: Location filter (e.g., "Berlin", "Germany")
-        max_results: Maximum number of results
-        position: Job title filter (e.g., "CEO", "Founder")
-        company: Company name filter
+def observe_fetch(platform: str, items_read: int, leads_kept: int):
+    """Fold one run's raw-items-per-lead ratio into the platform's EWMA."""
+    if items_read <= 0:
+        return
+    ratio = min(items_read / max(leads_kept, 1), MAX_FETCH_RATIO)
+    previous = _fetch_ratio.get(platform, 1.0)
+    _fetch_ratio[platform] = max(1.0, (1 - FETCH_RATIO_ALPHA) * previous + FETCH_RATIO_ALPHA * ratio)
+
+
+def get_fetch_stats() -> Dict:
+    """Current raw-items-per-lead estimates used to size actor requests."""
+    return {platform: round(ratio, 3) for platform, ratio in _fetch_ratio.items()}
+
+
+async def _read_pages(platform: str, actor_id: str, run_input: Dict, items: int,
+                      page_size: int = FILTER_PAGE_SIZE, **params) -> AsyncIterator[List[Dict]]:
+    """Run an actor and yield its dataset pages.
+
+    The run's estimated cost (for `items` results) is admitted against the
+    daily budget first (raises costs.BudgetExceededError), then the run waits
+    for a slot from the shared limiter (raises limiter.RateLimitedError or
+    limiter.CircuitOpenError); the finished run is recorded in the cost
+    ledger, along with run time and read throughput.
     """
-    print(f"🔗 Starting LinkedIn people search:")
-    print(f"   Keyword: {keyword}")
-    print(f"   Location: {location}")
-    print(f"   Position: {position}")
-    print(f"   Company: {company}")
+    reservation = costs.admit(platform, items)
 
-    client = get_client()
+    def finished(run: Dict, items_read: int):
+        try:
+            costs.record_run(platform, actor_id, run, items_read, reservation)
+        except Exception as e:
+            logger.error("❌ Failed to record cost of actor run %s: %s", run.get("id"), e)
 
-    # Get EXA API key for the actor
-    exa_api_key = os.getenv("EXA_API_KEY")
-    if not exa_api_key:
-        raise ValueError("EXA_API_KEY environment variable is required for LinkedIn search")
+    start = time.perf_counter()
+    outcome = "failed"
+    try:
+        async with limiter.actor_slot(platform):
+            start = time.perf_counter()
+            pages = apify.stream_run_items(actor_id, run_input, page_size=page_size, on_finish=finished, **params)
+            async with aclosing(pages):
+                async for page in pages:
+                    metrics.DATASET_ITEMS.inc(len(page), platform=platform)
+                    yield page
+        outcome = "completed"
+    except (limiter.RateLimitedError, limiter.CircuitOpenError):
+        outcome = "rejected"
+        raise
+    except GeneratorExit:
+        outcome = "stopped"
+        raise
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        costs.release(reservation)
+        metrics.ACTOR_RUN_SECONDS.observe(time.perf_counter() - start, platform=platform, outcome=outcome)
 
-    # Build search query with all filters
+
+def build_linkedin_query(keyword: str, location: str, position: str = "", company: str = "") -> str:
+    """Build the Exa search query with all filters."""
     # IMPORTANT: Add site:linkedin.com/in/ to ensure ONLY LinkedIn profile results
     query_parts = ["site:linkedin.com/in/"]
 
@@ -88,150 +152,232 @@ def scrape_linkedin(keyword: str, location: str, max_results: int, position: str
     if location:
         query_parts.append(location)
 
-    query = " ".join(query_parts)
-    print(f"   Final query: {query}")
+    return " ".join(query_parts)
 
-    # Build input for the Exa-powered people search actor
-    run_input = {
-        "query": query,
-        "exaApiKey": exa_api_key,
-        "maxResults": max_results,
-    }
 
-    try:
-        print(f"   Calling Apify actor: {ACTORS['linkedin']}")
-        run = client.actor(ACTORS["linkedin"]).call(run_input=run_input)
-        print(f"   Actor run completed: {run.get('id', 'unknown')}")
-    except Exception as e:
-        print(f"   ❌ Apify actor call failed: {type(e).__name__}: {e}")
-        raise
+def build_twitter_query(keyword: str, location: str, since: str = "") -> str:
+    """Build the twitterContent search string (since: YYYY-MM-DD lower bound on tweet date)."""
+    query = f"{keyword} {location}".strip() if location else keyword
+    return f"{query} since:{since}" if since else query
 
-    results = []
-    count = 0
-    raw_count = 0
-    for item in client.dataset(run["defaultDatasetId"]).iterate_items():
-        raw_count += 1
-        # Debug: print first 3 raw items to see the structure
-        if raw_count <= 3:
-            print(f"   DEBUG raw item {raw_count}: {list(item.keys())}")
-            print(f"   DEBUG sample values: {dict(list(item.items())[:5])}")
-
-        if count >= max_results:
-            break
 
-        # Extract person's name from 'author' field (Exa format)
-        full_name = item.get("author", item.get("name", "")).strip()
+def build_cache_key(keyword: str, location: str, platform: str, position: str = "", company: str = "",
+                    since: str = "") -> str:
+    """Cache key for a search: platform + the query string sent to the actor."""
+    platform = platform.lower()
+    if platform == "linkedin":
+        query = build_linkedin_query(keyword, location, position, company)
+    else:
+        query = build_twitter_query(keyword, location, since)
+    return cache.make_key(platform, query)
 
-        # Skip if no name
-        if not full_name or full_name == "Unknown":
-            print(f"   Skipping: No name found")
-            continue
 
-        # Extract headline from title (format: "Name | Headline")
-        title = item.get("title", "")
-        headline = ""
-        if "|" in title:
-            headline = title.split("|", 1)[1].strip()
+async def iter_linkedin(keyword: str, location: str, max_results: int, position: str = "", company: str = "") -> AsyncIterator[Dict]:
+    """Scrape LinkedIn PEOPLE profiles using Apify + Exa.ai, yielding each lead as it is parsed.
 
-        # Get bio from text field
-        bio = item.get("text", "")
+    Args:
+        keyword: Main search term (e.g., "AI", "startup")
+        location: Location filter (e.g., "Berlin", "Germany")
+        max_results: Maximum number of results
+        position: Job title filter (e.g., "CEO", "Founder")
+        company: Company name filter
+    """
+    logger.info("🔗 Starting LinkedIn people search: keyword=%r location=%r position=%r company=%r",
+                keyword, location, position, company)
 
-        # Skip if this looks like an organization
-        if is_organization(full_name, bio, headline):
-            print(f"   Skipping organization: {full_name}")
-            continue
+    # Get EXA API key for the actor
+    exa_api_key = os.getenv("EXA_API_KEY")
+    if not exa_api_key:
+        raise ValueError("EXA_API_KEY environment variable is required for LinkedIn search")
+
+    # Build search query with all filters
+    query = build_linkedin_query(keyword, location, position, company)
+    logger.debug("Final query: %s", query)
+
+    # Build input for the Exa-powered people search actor
+    run_input = {
+        "query": query,
+        "exaApiKey": exa_api_key,
+        "maxResults": fetch_size("linkedin", max_results),
+    }
 
-        # Extract company from bio text (look for "at [Company]" pattern)
-        current_company = ""
-        current_title = headline
+    logger.debug("Calling Apify actor: %s", ACTORS["linkedin"])
+    pages = _read_pages(
+        "linkedin", ACTORS["linkedin"], run_input, run_input["maxResults"],
+        page_size=min(FILTER_PAGE_SIZE, run_input["maxResults"]),
+        fields=DATASET_FIELDS["linkedin"],
+    )
 
-        # Try to extract location from text
-        region = location
-        if "Germany" in bio:
-            region = "Germany"
-        if "Berlin" in bio:
-            region = "Berlin, Germany"
+    count = 0
+    items_read = consumed = 0
+    seen_urls = set()
+    extractor = extract.get_extractor()
+    try:
+        async with aclosing(pages):
+            async for page in pages:
+                parsed = []
+                for item_no, item in enumerate(page, items_read + 1):
+                    # Extract person's name from 'author' field (Exa format)
+                    full_name = (item.get("author") or item.get("name") or "").strip()
+
+                    # Skip if no name
+                    if not full_name or full_name == "Unknown":
+                        filters.record_drop("no_name", platform="linkedin")
+                        continue
+
+                    # Skip the same profile returned twice
+                    url = item.get("url") or ""
+                    if url and url in seen_urls:
+                        filters.record_drop("duplicate", platform="linkedin")
+                        continue
+                    seen_urls.add(url)
+
+                    # Extract headline from title (format: "Name | Headline")
+                    headline = extract.split_headline(item.get("title") or "", full_name)
+
+                    # Get bio from text field
+                    bio = item.get("text") or ""
+                    parsed.append((item_no, item, full_name, headline, bio))
+                items_read += len(page)
+
+                # Skip anything that looks like an organization (one filter pass per page)
+                reasons = filters.classify_batch("linkedin", ((n, h, b) for _, _, n, h, b in parsed))
+
+                for (item_no, item, full_name, headline, bio), reason in zip(parsed, reasons):
+                    if reason:
+                        logger.debug("Skipping (%s): %s", reason, full_name)
+                        continue
+                    if count >= max_results:
+                        break
+
+                    # Role, company and region from "Title at Company" and the place gazetteer
+                    current_title, current_company, region, _ = extractor.extract(headline, bio, location)
+
+                    # Get profile URL
+                    profile_url = item.get("url", "")
+
+                    count += 1
+                    consumed = item_no
+                    metrics.LEAD_ITEMS.inc(platform="linkedin", outcome="kept")
+                    logger.debug("✓ Added person: %s", full_name)
+                    yield {
+                        "id": f"li_{uuid.uuid4().hex[:8]}",
+                        "name": full_name,
+                        "role": current_title or "",
+                        "company": current_company or "",
+                        "platform": "LinkedIn",
+                        "contact_link": profile_url or "",
+                        "region": region or "",
+                        "notes": keyword or "",
+                        "followers": 0,
+                        "industry": "",
+                        "headline": headline or "",
+                        "bio": (bio[:500] if bio else ""),
+                    }
+                if count >= max_results:
+                    break
+    except apify.ApifyError as e:
+        logger.error("❌ Apify actor run failed: %s", e)
+        raise
 
-        # Get profile URL
-        profile_url = item.get("url", "")
+    # When stopping early, only the items up to the last kept lead were needed
+    observe_fetch("linkedin", consumed if count >= max_results else items_read, count)
+    logger.info("✅ LinkedIn people search completed: %d results (filtered from %d raw items)",
+                count, items_read, extra={"platform": "linkedin", "results": count, "items_read": items_read})
 
-        try:
-            results.append({
-                "id": f"li_{uuid.uuid4().hex[:8]}",
-                "name": full_name,
-                "role": current_title or "",
-                "company": current_company or "",
-                "platform": "LinkedIn",
-                "contact_link": profile_url or "",
-                "region": region or "",
-                "notes": keyword or "",
-                "followers": 0,
-                "industry": "",
-                "headline": headline or "",
-                "bio": (bio[:500] if bio else ""),
-            })
-            count += 1
-            print(f"   ✓ Added person: {full_name}")
-        except Exception as e:
-            print(f"   ❌ Error adding {full_name}: {e}")
 
-    print(f"✅ LinkedIn people search completed: {len(results)} results (filtered from raw data)")
-    return results
+async def scrape_linkedin(keyword: str, location: str, max_results: int, position: str = "", company: str = "") -> List[Dict]:
+    """Scrape LinkedIn PEOPLE profiles using Apify + Exa.ai."""
+    return [lead async for lead in iter_linkedin(keyword, location, max_results, position, company)]
 
 
-def scrape_twitter(keyword: str, location: str, max_results: int) -> List[Dict]:
-    """Scrape X/Twitter profiles using Apify."""
-    print(f"🐦 Starting X/Twitter scrape: {keyword} in {location}")
-    client = get_client()
+async def iter_twitter(keyword: str, location: str, max_results: int, since: str = "") -> AsyncIterator[Dict]:
+    """Scrape X/Twitter profiles using Apify, yielding each lead as it is parsed.
+
+    since (YYYY-MM-DD) restricts the search to tweets from that day on.
+    """
+    logger.info("🐦 Starting X/Twitter scrape: %s in %s", keyword, location)
 
     # Build search query
-    search_query = f"{keyword} {location}".strip() if location else keyword
+    search_query = build_twitter_query(keyword, location, since)
 
     run_input = {
         "twitterContent": search_query,
-        "maxItems": max(max_results * 3, 20),  # Get more tweets to find unique users
+        "maxItems": fetch_size("x", max_results),  # Several tweets per unique user
         "queryType": "Top",
     }
 
-    run = client.actor(ACTORS["x"]).call(run_input=run_input)
-
-    results = []
+    count = 0
+    items_read = consumed = 0
     seen_users = set()
 
-    for item in client.dataset(run["defaultDatasetId"]).iterate_items():
-        # Get author info from tweet
-        author = item.get("author", {})
-        user_name = author.get("userName", "")
-
-        if not user_name or user_name in seen_users:
-            continue
-        seen_users.add(user_name)
-
-        results.append({
-            "id": f"x_{uuid.uuid4().hex[:8]}",
-            "name": author.get("name", "Unknown"),
-            "role": f"@{user_name}",
-            "company": "",
-            "platform": "X",
-            "contact_link": f"https://x.com/{user_name}",
-            "region": author.get("location", location),
-            "notes": keyword,
-            "followers": author.get("followers", 0),
-            "verified": author.get("isBlueVerified", author.get("isVerified", False)),
-            "bio": author.get("description", ""),
-        })
-
-        if len(results) >= max_results:
-            break
-
-    print(f"✅ X/Twitter scrape completed: {len(results)} results")
-    return results
+    pages = _read_pages(
+        "x", ACTORS["x"], run_input, run_input["maxItems"],
+        page_size=min(FILTER_PAGE_SIZE, run_input["maxItems"]),
+        fields=DATASET_FIELDS["x"],
+    )
+    async with aclosing(pages):
+        async for page in pages:
+            # Get author info from each tweet, keeping the first tweet per user
+            authors = []
+            for item_no, item in enumerate(page, items_read + 1):
+                author = item.get("author") or {}
+                user_name = author.get("userName", "")
+
+                if not user_name:
+                    filters.record_drop("no_name", platform="x")
+                    continue
+                if user_name in seen_users:
+                    filters.record_drop("duplicate", platform="x")
+                    continue
+                seen_users.add(user_name)
+                authors.append((item_no, author))
+            items_read += len(page)
+
+            reasons = filters.classify_batch(
+                "x", ((a.get("name", ""), "", a.get("description", "")) for _, a in authors)
+            )
+
+            for (item_no, author), reason in zip(authors, reasons):
+                if reason:
+                    continue
+                user_name = author["userName"]
+
+                count += 1
+                consumed = item_no
+                metrics.LEAD_ITEMS.inc(platform="x", outcome="kept")
+                yield {
+                    "id": f"x_{uuid.uuid4().hex[:8]}",
+                    "name": author.get("name", "Unknown"),
+                    "role": f"@{user_name}",
+                    "company": "",
+                    "platform": "X",
+                    "contact_link": f"https://x.com/{user_name}",
+                    "region": author.get("location", location),
+                    "notes": keyword,
+                    "followers": author.get("followers", 0),
+                    "verified": author.get("isBlueVerified", author.get("isVerified", False)),
+                    "bio": author.get("description", ""),
+                }
+
+                if count >= max_results:
+                    break
+            if count >= max_results:
+                break
+
+    observe_fetch("x", consumed if count >= max_results else items_read, count)
+    logger.info("✅ X/Twitter scrape completed: %d results (from %d raw items)", count, items_read,
+                extra={"platform": "x", "results": count, "items_read": items_read})
+
+
+async def scrape_twitter(keyword: str, location: str, max_results: int, since: str = "") -> List[Dict]:
+    """Scrape X/Twitter profiles using Apify."""
+    return [lead async for lead in iter_twitter(keyword, location, max_results, since)]
 
 
-def scrape_tiktok(keyword: str, location: str, max_results: int) -> List[Dict]:
+async def scrape_tiktok(keyword: str, location: str, max_results: int) -> List[Dict]:
     """Scrape TikTok profiles using Apify."""
-    print(f"🎵 Starting TikTok scrape: {keyword}")
-    client = get_client()
+    logger.info("🎵 Starting TikTok scrape: %s", keyword)
 
     # Build search query
     search_query = f"{keyword} {location}".strip() if location else keyword
@@ -243,55 +389,183 @@ def scrape_tiktok(keyword: str, location: str, max_results: int) -> List[Dict]:
         "maxProfilesPerQuery": max_results,
     }
 
-    run = client.actor(ACTORS["tiktok"]).call(run_input=run_input)
-
     results = []
     seen_users = set()
 
-    for item in client.dataset(run["defaultDatasetId"]).iterate_items():
-        # Handle both video results and user results
-        if "authorMeta" in item:
-            author = item.get("authorMeta", {})
-        elif "author" in item:
-            author = item.get("author", {})
-        else:
-            author = item  # Item might be a user directly
+    pages = _read_pages("tiktok", ACTORS["tiktok"], run_input, run_input["resultsPerPage"])
+    async with aclosing(pages):
+        async for page in pages:
+            for item in page:
+                # Handle both video results and user results
+                if "authorMeta" in item:
+                    author = item.get("authorMeta", {})
+                elif "author" in item:
+                    author = item.get("author", {})
+                else:
+                    author = item  # Item might be a user directly
+
+                unique_id = author.get("uniqueId", author.get("id", ""))
+
+                if not unique_id or unique_id in seen_users:
+                    continue
+                seen_users.add(unique_id)
+
+                results.append({
+                    "id": f"tt_{uuid.uuid4().hex[:8]}",
+                    "name": author.get("nickname", author.get("name", "Unknown")),
+                    "role": f"@{unique_id}",
+                    "company": "",
+                    "platform": "TikTok",
+                    "contact_link": f"https://tiktok.com/@{unique_id}",
+                    "region": location,
+                    "notes": keyword,
+                    "followers": author.get("fans", author.get("followerCount", 0)),
+                    "likes": author.get("heart", author.get("heartCount", 0)),
+                    "verified": author.get("verified", False),
+                    "bio": author.get("signature", author.get("bio", "")),
+                })
+
+                if len(results) >= max_results:
+                    break
+            if len(results) >= max_results:
+                break
+
+    logger.info("✅ TikTok scrape completed: %d results", len(results))
+    return results
 
-        unique_id = author.get("uniqueId", author.get("id", ""))
 
-        if not unique_id or unique_id in seen_users:
-            continue
-        seen_users.add(unique_id)
-
-        results.append({
-            "id": f"tt_{uuid.uuid4().hex[:8]}",
-            "name": author.get("nickname", author.get("name", "Unknown")),
-            "role": f"@{unique_id}",
-            "company": "",
-            "platform": "TikTok",
-            "contact_link": f"https://tiktok.com/@{unique_id}",
-            "region": location,
-            "notes": keyword,
-            "followers": author.get("fans", author.get("followerCount", 0)),
-            "likes": author.get("heart", author.get("heartCount", 0)),
-            "verified": author.get("verified", False),
-            "bio": author.get("signature", author.get("bio", "")),
-        })
-
-        if len(results) >= max_results:
+def iter_leads(
+    keyword: str,
+    location: str,
+    platform: str = "linkedin",
+    max_results: int = 20,
+    position: str = "",
+    company: str = "",
+    force_refresh: bool = False,
+    skip_seen: bool = False,
+    exclude: Optional[Set[str]] = None,
+    since: str = ""
+) -> AsyncIterator[Dict]:
+    """
+    Streaming variant of scrape_leads - returns an async iterator yielding lead
+    records as soon as each dataset item has been normalized.
+
+    Results are served from the query cache when available; a completed live
+    run is written back to the cache. force_refresh skips the lookup, and so
+    does exclude: a delta run needs a live result, since a cached page would
+    only repeat leads the watermark already holds. A search identical to one whose actor run is in flight reads that run's
+    leads instead of starting another (see singleflight.py).
+    Every lead is tagged with its identity and seen_before/saved flags;
+    skip_seen drops leads already seen in an earlier run, and exclude drops
+    leads whose identity is in the given set (a saved search's watermark).
+    since (YYYY-MM-DD) limits X searches to newer tweets.
+    """
+    platform = platform.lower()
+    requested = max_results
+    max_results = results_to_fetch(max_results, skip_seen, exclude)
+
+    if platform == "tiktok":
+        return _aiter_list(scrape_tiktok(keyword, location, max_results))
+    elif platform == "telegram":
+        raise ValueError("Telegram scraping requires specific channel names. Use LinkedIn, X, or TikTok for keyword-based search.")
+    elif platform not in ["linkedin", "x", "twitter"]:
+        raise ValueError(f"Unknown platform: {platform}. Use: linkedin, x, tiktok")
+
+    key = build_cache_key(keyword, location, platform, position, company, since)
+    if not force_refresh and exclude is None:
+        cached = cache.get(key, max_results)
+        if cached is not None:
+            logger.info("⚡ Cache hit for %s (%d results)", key, len(cached))
+            return _mark_identities(_aiter_list([cached]), platform, requested, skip_seen, exclude)
+
+    def start() -> AsyncIterator[Dict]:
+        if platform == "linkedin":
+            source = iter_linkedin(keyword, location, max_results, position, company)
+        else:
+            source = iter_twitter(keyword, location, max_results, since)
+        return _cache_through(source, key, max_results)
+
+    # Identical searches already running share that run instead of starting another
+    shared = singleflight.subscribe(key, max_results, start, platform=platform)
+    return _mark_identities(shared, platform, requested, skip_seen, exclude)
+
+
+async def _aiter_list(results) -> AsyncIterator[Dict]:
+    """Async iterator over a list (or an awaitable producing one)."""
+    if not isinstance(results, list):
+        results = await results
+    for lead in results:
+        yield lead
+
+
+def _tag_batch(leads: List[Dict], platform: str, limit: Optional[int], skip_seen: bool,
+               exclude: Optional[Set[str]], marked: Set[str]) -> List[Dict]:
+    """Tag one batch of leads and record the kept ones as seen: one lookup and one write."""
+    identities = [lead_identity(lead) for lead in leads]
+    status = db.get_identity_status(i for i in identities if not (exclude and i in exclude))
+    tagged = []
+    for lead, identity in zip(leads, identities):
+        if limit is not None and len(tagged) >= limit:
             break
+        if exclude and identity in exclude:
+            continue
+        flags = dict(status.get(identity, {"seen_before": False, "saved": False}))
+        # Repeats within this run count as seen, like earlier runs
+        flags["seen_before"] = flags["seen_before"] or identity in marked
+        if skip_seen and flags["seen_before"]:
+            continue
+        if identity:
+            marked.add(identity)
+        tagged.append({**lead, "identity": identity or "", **flags})
+    db.record_seen((lead["identity"] for lead in tagged), platform)
+    return tagged
 
-    print(f"✅ TikTok scrape completed: {len(results)} results")
-    return results
 
+async def _mark_identities(source: AsyncIterator[List[Dict]], platform: str, max_results: int,
+                           skip_seen: bool, exclude: Optional[Set[str]] = None) -> AsyncIterator[Dict]:
+    """Tag batches of leads with identity/seen_before/saved flags and record them as seen.
 
-def scrape_leads(
+    The lookups and writes for each batch run in a worker thread, off the event loop.
+    """
+    limited = bool(skip_seen or exclude)
+    count = 0
+    marked: Set[str] = set()
+    try:
+        async for batch in source:
+            limit = max_results - count if limited else None
+            tagged = await asyncio.to_thread(_tag_batch, batch, platform, limit, skip_seen, exclude, marked)
+            for lead in tagged:
+                count += 1
+                yield lead
+            if limited and count >= max_results:
+                break
+    finally:
+        await source.aclose()
+
+
+async def _cache_through(source: AsyncIterator[Dict], key: str, max_results: int) -> AsyncIterator[Dict]:
+    """Yield from source and store the full result list once it is exhausted."""
+    results = []
+    try:
+        async for lead in source:
+            results.append(lead)
+            yield lead
+    finally:
+        await source.aclose()
+    cache.put(key, max_results, results)
+
+
+async def scrape_leads(
     keyword: str,
     location: str,
     platform: str = "linkedin",
     max_results: int = 20,
     position: str = "",
-    company: str = ""
+    company: str = "",
+    force_refresh: bool = False,
+    skip_seen: bool = False,
+    exclude: Optional[Set[str]] = None,
+    since: str = ""
 ) -> List[Dict]:
     """
     Main scraping function - dispatches to platform-specific scrapers.
@@ -303,19 +577,14 @@ def scrape_leads(
         max_results: Maximum number of results
         position: Job title filter (LinkedIn only)
         company: Company name filter (LinkedIn only)
+        force_refresh: Bypass the query cache and run the actor
+        skip_seen: Only return leads not seen in earlier runs
+        exclude: Identities to leave out (e.g. already returned by a saved search)
+        since: YYYY-MM-DD lower bound on tweet date (X only)
 
     Returns:
         List of lead records
     """
-    platform = platform.lower()
-
-    if platform == "linkedin":
-        return scrape_linkedin(keyword, location, max_results, position, company)
-    elif platform in ["x", "twitter"]:
-        return scrape_twitter(keyword, location, max_results)
-    elif platform == "tiktok":
-        return scrape_tiktok(keyword, location, max_results)
-    elif platform == "telegram":
-        raise ValueError("Telegram scraping requires specific channel names. Use LinkedIn, X, or TikTok for keyword-based search.")
-    else:
-        raise ValueError(f"Unknown platform: {platform}. Use: linkedin, x, tiktok")
+    source = iter_leads(keyword, location, platform, max_results, position, company,
+                        force_refresh, skip_seen, exclude, since)
+    return [lead async for lead in source]
@@ -0,0 +1,161 @@
+"""
+Saved searches with a delta watermark.
+A saved search is a named scrape definition. Each re-run returns only leads
+that earlier runs of the same search have not returned: the identities it
+has returned are its watermark, and the time of its last run bounds the
+tweet date on X so the actor isn't asked for already-scanned tweets.
+"""
+import json
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+import database as db
+import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS saved_searches (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    session TEXT,
+    created_at TEXT NOT NULL,
+    params TEXT NOT NULL,
+    last_run_at TEXT,
+    last_run_id TEXT,
+    run_count INTEGER NOT NULL DEFAULT 0,
+    total_new INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_saved_searches_session ON saved_searches(session, created_at);
+
+CREATE TABLE IF NOT EXISTS saved_search_seen (
+    search_id TEXT NOT NULL,
+    identity TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    PRIMARY KEY (search_id, identity)
+) WITHOUT ROWID;
+"""
+
+COLUMNS = "id, name, session, created_at, params, last_run_at, last_run_id, run_count, total_new"
+
+_schema_ready = False
+
+
+def _connect():
+    """Get the shared connection, creating the saved search tables on first use."""
+    global _schema_ready
+    conn = db.get_connection()
+    if not _schema_ready:
+        with db._lock:
+            conn.executescript(SCHEMA)
+        _schema_ready = True
+    return conn
+
+
+def _row_to_search(row) -> Dict:
+    search_id, name, session, created_at, params, last_run_at, last_run_id, run_count, total_new = row
+    return {
+        "id": search_id,
+        "name": name,
+        "session": session,
+        "created_at": created_at,
+        "params": json.loads(params),
+        "last_run_at": last_run_at,
+        "last_run_id": last_run_id,
+        "run_count": run_count,
+        "total_new": total_new,
+    }
+
+
+def create_search(name: str, params: Dict, session: Optional[str] = None) -> Dict:
+    """Save a search definition and return it."""
+    search = {
+        "id": f"search_{uuid.uuid4().hex[:12]}",
+        "name": name,
+        "session": session,
+        "created_at": datetime.now().isoformat(),
+        "params": params,
+        "last_run_at": None,
+        "last_run_id": None,
+        "run_count": 0,
+        "total_new": 0,
+    }
+    with db._lock:
+        conn = _connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO saved_searches (id, name, session, created_at, params) VALUES (?, ?, ?, ?, ?)",
+                (search["id"], name, session, search["created_at"], json.dumps(params))
+            )
+    return search
+
+
+def get_search(search_id: str) -> Optional[Dict]:
+    """Get a saved search by ID."""
+    with db._lock:
+        row = _connect().execute(
+            f"SELECT {COLUMNS} FROM saved_searches WHERE id = ?", (search_id,)
+        ).fetchone()
+    return _row_to_search(row) if row else None
+
+
+def list_searches(session: Optional[str] = None) -> List[Dict]:
+    """List saved searches, newest first, optionally for one session."""
+    sql = f"SELECT {COLUMNS} FROM saved_searches"
+    params: list = []
+    if session:
+        sql += " WHERE session = ?"
+        params.append(session)
+    sql += " ORDER BY created_at DESC"
+    with db._lock:
+        rows = _connect().execute(sql, params).fetchall()
+    return [_row_to_search(row) for row in rows]
+
+
+def delete_search(search_id: str) -> bool:
+    """Delete a saved search and its watermark."""
+    with db._lock:
+        conn = _connect()
+        with conn:
+            conn.execute("DELETE FROM saved_search_seen WHERE search_id = ?", (search_id,))
+            cur = conn.execute("DELETE FROM saved_searches WHERE id = ?", (search_id,))
+    return cur.rowcount > 0
+
+
+def reset_watermark(search_id: str):
+    """Forget what a saved search has returned, so its next run is a full one."""
+    with db._lock:
+        conn = _connect()
+        with conn:
+            conn.execute("DELETE FROM saved_search_seen WHERE search_id = ?", (search_id,))
+            conn.execute("UPDATE saved_searches SET last_run_at = NULL WHERE id = ?", (search_id,))
+
+
+def get_watermark(search_id: str) -> Set[str]:
+    """Identities returned by earlier runs of a saved search."""
+    with db._lock:
+        return {identity for (identity,) in _connect().execute(
+            "SELECT identity FROM saved_search_seen WHERE search_id = ?", (search_id,)
+        )}
+
+
+def since_date(search: Dict) -> str:
+    """Date (YYYY-MM-DD) of the search's last run, or "" before its first run."""
+    return (search.get("last_run_at") or "")[:10]
+
+
+def record_run(search_id: str, run_id: str, started_at: str, identities: Iterable[str]):
+    """Advance the watermark after a run that started at `started_at` returned `identities`."""
+    now = datetime.now().isoformat()
+    rows = [(search_id, identity, now) for identity in dict.fromkeys(identities) if identity]
+    with db._lock, metrics.STORAGE_WRITE_SECONDS.time(op="saved_search_run"):
+        conn = _connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO saved_search_seen (search_id, identity, first_seen) VALUES (?, ?, ?)",
+                rows
+            )
+            conn.execute(
+                "UPDATE saved_searches SET last_run_at = ?, last_run_id = ?, run_count = run_count + 1, "
+                "total_new = total_new + ? WHERE id = ?",
+                (started_at, run_id, len(rows), search_id)
+            )
@@ -0,0 +1,110 @@
+"""
+Single-flight coalescing of identical live scrapes.
+While an actor run for a query (its cache key) is in flight, identical
+searches attach to it instead of starting their own run: every subscriber
+reads the same growing list of leads as they are parsed (in batches of the
+leads available so far, typically a dataset page), so the actor runs and is
+billed once. A search asking for more results than the in-flight run
+will return starts its own run. The run is cancelled (and the remote actor
+run aborted) once every subscriber has stopped reading before it finished.
+"""
+import asyncio
+import logging
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+_flights: Dict[str, "Flight"] = {}
+
+
+class Flight:
+    """One live run shared by all of its subscribers."""
+
+    def __init__(self, key: str, max_results: int, source: AsyncIterator[Dict]):
+        self.key = key
+        self.max_results = max_results
+        self.leads: List[Dict] = []
+        self.done = False
+        self.abandoned = False
+        self.error: Optional[Exception] = None
+        self.subscribers = 0
+        self.loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        self.task = asyncio.create_task(self._run(source))
+
+    def joinable(self, max_results: int) -> bool:
+        return (not self.done and not self.abandoned and self.max_results >= max_results
+                and self.loop is asyncio.get_running_loop())
+
+    def _wake(self):
+        event, self._changed = self._changed, asyncio.Event()
+        event.set()
+
+    async def _run(self, source: AsyncIterator[Dict]):
+        try:
+            async with aclosing(source):
+                async for lead in source:
+                    self.leads.append(lead)
+                    self._wake()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            if _flights.get(self.key) is self:
+                del _flights[self.key]
+            self._wake()
+
+    async def read(self, limit: int) -> AsyncIterator[List[Dict]]:
+        """Yield the run's leads from the start, up to `limit`, in batches as they arrive.
+
+        Reading all of them (limit == max_results) waits for the run to finish
+        and raises its error, like iterating the run directly would.
+        """
+        self.subscribers += 1
+        position = 0
+        try:
+            while True:
+                if position < len(self.leads) and position < limit:
+                    end = min(len(self.leads), limit)
+                    batch = self.leads[position:end]
+                    position = end
+                    yield batch
+                    continue
+                if self.done:
+                    if self.error is not None and position < limit:
+                        raise self.error
+                    return
+                if position >= limit and limit < self.max_results:
+                    return
+                await self._changed.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                # Nobody is reading any more: stop the run (aborts the actor run)
+                self.abandoned = True
+                self.task.cancel()
+
+
+async def subscribe(key: str, max_results: int, start: Callable[[], AsyncIterator[Dict]],
+                    platform: str = "") -> AsyncIterator[List[Dict]]:
+    """Yield up to max_results leads, in batches, from the in-flight run for `key`, starting one with start() if needed."""
+    flight = _flights.get(key)
+    if flight is not None and flight.joinable(max_results):
+        metrics.SCRAPES_COALESCED.inc(platform=platform)
+        logger.info("🔗 Joined in-flight run for %s (%d subscribers)", key, flight.subscribers + 1)
+    else:
+        flight = _flights[key] = Flight(key, max_results, start())
+    async with aclosing(flight.read(max_results)) as batches:
+        async for batch in batches:
+            yield batch
+
+
+def get_stats() -> Dict:
+    """Runs in flight and their subscriber counts."""
+    return {
+        "in_flight": len(_flights),
+        "subscribers": sum(f.subscribers for f in _flights.values()),
+    }
@@ -0,0 +1,10 @@
+"""Test setup: backend modules import each other by bare name, and importing
+database creates its SQLite file, so point DATA_DIR at a scratch directory."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="outreach-tests-"))
+os.environ.setdefault("APIFY_API_TOKEN", "test-token")
@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+import pytest
+
+import apify
+
+
+def _status_error(status_code, retry_after=None):
+    return apify.ApifyError("failed", status_code=status_code, retry_after=retry_after)
+
+
+@pytest.mark.parametrize("status_code", sorted(apify.RETRY_STATUSES))
+def test_get_retries_every_retry_status(status_code):
+    assert apify._retry_delay("GET", _status_error(status_code), 0) is not None
+
+
+@pytest.mark.parametrize("status_code", [429, 503])
+def test_post_retries_rejections(status_code):
+    assert apify._retry_delay("POST", _status_error(status_code), 0) is not None
+
+
+@pytest.mark.parametrize("status_code", [500, 502, 504])
+def test_post_not_resent_after_server_error(status_code):
+    # The run may have started before the server failed
+    assert apify._retry_delay("POST", _status_error(status_code), 0) is None
+
+
+@pytest.mark.parametrize("method", ["GET", "POST"])
+@pytest.mark.parametrize("status_code", [400, 401, 404])
+def test_client_errors_not_retried(method, status_code):
+    assert apify._retry_delay(method, _status_error(status_code), 0) is None
+
+
+def test_post_retries_only_connect_errors():
+    request = httpx.Request("POST", "https://api.apify.com/v2/acts")
+    assert apify._retry_delay("POST", httpx.ConnectError("refused", request=request), 0) is not None
+    assert apify._retry_delay("POST", httpx.ReadTimeout("slow", request=request), 0) is None
+    assert apify._retry_delay("GET", httpx.ReadTimeout("slow", request=request), 0) is not None
+
+
+def test_attempts_exhausted():
+    assert apify._retry_delay("GET", _status_error(503), apify.RETRY_ATTEMPTS) is None
+
+
+def test_retry_after_honoured_and_capped():
+    assert apify._retry_delay("GET", _status_error(429, retry_after=5.0), 0) >= 5.0
+    assert apify._retry_delay("GET", _status_error(429, retry_after=apify.RETRY_MAX_DELAY + 1), 0) is None
+
+
+def _send_counting(method, status_code, monkeypatch):
+    """Send one request to a mock upstream that always answers status_code; returns the calls made."""
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(status_code, json={})
+
+    monkeypatch.setattr(apify, "RETRY_BASE_DELAY", 0.0)
+
+    async def run():
+        apify._client = httpx.AsyncClient(base_url="https://api.apify.test", transport=httpx.MockTransport(handler))
+        apify._client_loop = asyncio.get_running_loop()
+        try:
+            with pytest.raises(apify.ApifyError):
+                await apify.request(method, "/v2/acts/x/runs")
+        finally:
+            await apify.close()
+
+    asyncio.run(run())
+    return calls
+
+
+def test_request_sends_post_once_after_502(monkeypatch):
+    assert _send_counting("POST", 502, monkeypatch) == ["POST"]
+
+
+def test_request_resends_get_after_502(monkeypatch):
+    assert len(_send_counting("GET", 502, monkeypatch)) == apify.RETRY_ATTEMPTS + 1
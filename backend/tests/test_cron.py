@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import pytest
+
+from scheduler import CronSpec
+
+
+def test_macros_and_fields():
+    daily = CronSpec("@daily")
+    assert daily.minutes == {0} and daily.hours == {0}
+    spec = CronSpec("*/15 9-17/4 1,15 * 1-5")
+    assert spec.minutes == {0, 15, 30, 45}
+    assert spec.hours == {9, 13, 17}
+    assert spec.days == {1, 15}
+    assert spec.weekdays == {1, 2, 3, 4, 5}
+
+
+def test_weekday_seven_is_sunday():
+    assert CronSpec("0 0 * * 7").weekdays == {0}
+
+
+@pytest.mark.parametrize("expr", ["* * * *", "60 * * * *", "* 24 * * *", "*/0 * * * *", "a * * * *", "5-1 * * * *"])
+def test_invalid_expressions(expr):
+    with pytest.raises(ValueError):
+        CronSpec(expr)
+
+
+def test_next_after_is_strictly_later():
+    spec = CronSpec("30 * * * *")
+    assert spec.next_after(datetime(2026, 3, 1, 10, 30, 15)) == datetime(2026, 3, 1, 11, 30)
+    assert spec.next_after(datetime(2026, 3, 1, 10, 29)) == datetime(2026, 3, 1, 10, 30)
+
+
+def test_next_after_rolls_over_month_and_year():
+    spec = CronSpec("0 6 1 * *")
+    assert spec.next_after(datetime(2026, 12, 15, 8, 0)) == datetime(2027, 1, 1, 6, 0)
+
+
+def test_next_after_weekday():
+    # 2026-10-17 is a Saturday; "Mondays 09:00"
+    assert CronSpec("0 9 * * 1").next_after(datetime(2026, 10, 17, 12, 0)) == datetime(2026, 10, 19, 9, 0)
+
+
+def test_restricted_day_fields_match_either():
+    # The 20th or any Monday, whichever comes first
+    spec = CronSpec("0 0 20 * 1")
+    assert spec.next_after(datetime(2026, 10, 17)) == datetime(2026, 10, 19)
+    assert spec.next_after(datetime(2026, 10, 19)) == datetime(2026, 10, 20)
+
+
+def test_leap_day():
+    assert CronSpec("0 0 29 2 *").next_after(datetime(2026, 3, 1)) == datetime(2028, 2, 29)
+
+
+def test_never_matching_expression():
+    with pytest.raises(ValueError):
+        CronSpec("0 0 31 2 *").next_after(datetime(2026, 1, 1))
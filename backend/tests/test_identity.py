@@ -0,0 +1,30 @@
+import pytest
+
+from identity import lead_identity, normalize_url
+
+
+@pytest.mark.parametrize("lead, expected", [
+    ({"contact_link": "https://www.linkedin.com/in/Jane-Doe/"}, "linkedin:jane-doe"),
+    ({"contact_link": "https://de.linkedin.com/in/j%C3%BCrgen-m?trk=x"}, "linkedin:jürgen-m"),
+    ({"contact_link": "https://x.com/SomeUser/status/1"}, "x:someuser"),
+    ({"contact_link": "https://twitter.com/@SomeUser"}, "x:someuser"),
+    ({"platform": "twitter", "role": "@SomeUser"}, "x:someuser"),
+    ({"contact_link": "HTTPS://www.Example.com/Team/Jane/?utm=1#bio"}, "url:example.com/team/jane"),
+    ({"contact_link": "example.com/jane"}, "url:example.com/jane"),
+])
+def test_lead_identity(lead, expected):
+    assert lead_identity(lead) == expected
+
+
+def test_same_person_across_link_variants():
+    assert lead_identity({"contact_link": "linkedin.com/in/jane-doe"}) == \
+        lead_identity({"contact_link": "https://www.linkedin.com/in/JANE-DOE/?originalSubdomain=uk"})
+
+
+def test_no_identity():
+    assert lead_identity({}) is None
+    assert lead_identity({"platform": "linkedin", "role": "@founder", "contact_link": "  "}) is None
+
+
+def test_normalize_url_empty():
+    assert normalize_url("") == ""
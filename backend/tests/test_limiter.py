@@ -0,0 +1,109 @@
+import pytest
+
+import limiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(limiter.time, "monotonic", clock)
+    return clock
+
+
+def test_bucket_burst_then_wait(clock):
+    bucket = limiter.TokenBucket(per_minute=60, burst=2)
+    assert bucket.reserve(max_wait=10) == 0
+    assert bucket.reserve(max_wait=10) == 0
+    # Empty: the next token arrives in one second, the one after in two
+    assert bucket.reserve(max_wait=10) == pytest.approx(1.0)
+    assert bucket.reserve(max_wait=10) == pytest.approx(2.0)
+
+
+def test_bucket_rejects_beyond_max_wait_without_taking(clock):
+    bucket = limiter.TokenBucket(per_minute=60, burst=1)
+    bucket.reserve(max_wait=0)
+    with pytest.raises(limiter.RateLimitedError) as info:
+        bucket.reserve(max_wait=0.5)
+    assert info.value.status_code == 429
+    assert info.value.retry_after == pytest.approx(1.0)
+    assert bucket.tokens == pytest.approx(0.0)
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    bucket = limiter.TokenBucket(per_minute=60, burst=3)
+    for _ in range(3):
+        bucket.reserve(max_wait=0)
+    clock.now += 60
+    assert bucket.reserve(max_wait=0) == 0
+    assert bucket.tokens == pytest.approx(2.0)
+
+
+def test_bucket_refund(clock):
+    bucket = limiter.TokenBucket(per_minute=60, burst=1)
+    bucket.reserve(max_wait=0)
+    bucket.refund()
+    assert bucket.reserve(max_wait=0) == 0
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = limiter.CircuitBreaker("linkedin", threshold=2, reset_seconds=30)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(limiter.CircuitOpenError) as info:
+        breaker.before_call()
+    assert info.value.status_code == 503
+    assert info.value.retry_after == pytest.approx(30.0)
+
+
+def test_breaker_success_resets_failures(clock):
+    breaker = limiter.CircuitBreaker("linkedin", threshold=2, reset_seconds=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_breaker_half_open_trial(clock):
+    breaker = limiter.CircuitBreaker("linkedin", threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock.now += 30
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    # Only the trial call is admitted
+    with pytest.raises(limiter.CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_breaker_failed_trial_reopens(clock):
+    breaker = limiter.CircuitBreaker("linkedin", threshold=3, reset_seconds=30)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(limiter.CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_release_hands_trial_to_next_call(clock):
+    breaker = limiter.CircuitBreaker("linkedin", threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock.now += 30
+    breaker.before_call()
+    breaker.release()
+    assert breaker.state == "open"
+    breaker.before_call()
+    assert breaker.state == "half_open"
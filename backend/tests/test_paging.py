@@ -0,0 +1,68 @@
+import base64
+
+import pytest
+
+import paging
+
+
+def _raw(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode()
+
+
+def test_offset_cursor_round_trip():
+    assert paging.decode_offset(None) == 0
+    assert paging.decode_offset(paging.encode_cursor({"offset": 40})) == 40
+
+
+def test_keyset_cursor_round_trip():
+    assert paging.decode_keyset(None) is None
+    key = {"value": "Jane", "seq": 12}
+    assert paging.decode_keyset(paging.encode_cursor(key)) == key
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    _raw("not json"),
+    _raw("[1, 2]"),
+    paging.encode_cursor({"offset": -1}),
+    paging.encode_cursor({"offset": "5"}),
+    paging.encode_cursor({"offset": True}),
+    paging.encode_cursor({"offset": 5, "extra": 1}),
+    paging.encode_cursor({"value": "x", "seq": 1}),
+])
+def test_invalid_offset_cursors(cursor):
+    with pytest.raises(paging.PagingError):
+        paging.decode_offset(cursor)
+
+
+@pytest.mark.parametrize("data", [
+    {"offset": 5},
+    {"value": "x", "rowid": 1},
+    {"value": "x", "seq": "1"},
+    {"value": "x", "seq": 1.5},
+    {"value": ["x"], "seq": 1},
+    {"value": {"a": 1}, "seq": 1},
+])
+def test_invalid_keyset_cursors(data):
+    with pytest.raises(paging.PagingError):
+        paging.decode_keyset(paging.encode_cursor(data))
+
+
+def test_validate():
+    assert paging.validate("name", "desc", 10) == ("name", True, 10)
+    for args in (("nope", "asc", 10), ("name", "up", 10), ("name", "asc", 0),
+                 ("name", "asc", paging.MAX_PAGE_SIZE + 1)):
+        with pytest.raises(paging.PagingError):
+            paging.validate(*args)
+
+
+def test_page_results_walks_all_pages():
+    results = [{"name": f"n{i:02d}", "followers": i % 3} for i in range(7)]
+    seen, cursor = [], None
+    while True:
+        page = paging.page_results(results, limit=3, cursor=cursor, sort="name", order="desc")
+        seen += [lead["name"] for lead in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == sorted((r["name"] for r in results), reverse=True)
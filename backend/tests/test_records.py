@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+import records
+
+LEAD = {
+    "id": "l1", "name": "Jane Doe", "role": "CTO", "company": "Acme",
+    "platform": "linkedin", "followers": 120, "verified": False,
+    "region": "Berlin", "custom": {"a": 1},
+}
+
+
+def test_lead_reads_like_a_dict():
+    lead = records.Lead(LEAD)
+    assert dict(lead) == LEAD
+    assert {**lead} == LEAD
+    assert lead["name"] == "Jane Doe" and lead["custom"] == {"a": 1}
+    assert len(lead) == len(LEAD)
+    assert "email" not in lead and "custom" in lead
+    assert lead.get("email") is None and lead.get("email", "") == ""
+    with pytest.raises(KeyError):
+        lead["email"]
+
+
+def test_explicit_none_is_kept():
+    lead = records.Lead({"id": "l1", "email": None})
+    assert "email" in lead and lead["email"] is None
+    assert lead.to_dict() == {"id": "l1", "email": None}
+
+
+def test_lead_is_read_only():
+    lead = records.Lead(LEAD)
+    with pytest.raises(AttributeError):
+        lead.name = "Other"
+
+
+def test_low_cardinality_strings_are_interned():
+    a = records.Lead({"region": "".join(["Ber", "lin"])})
+    b = records.Lead({"region": "".join(["Berl", "in"])})
+    assert a["region"] is b["region"]
+
+
+def test_pack_and_from_json():
+    lead = records.Lead(LEAD)
+    packed = records.pack([lead, LEAD])
+    assert packed[0] is lead and isinstance(packed[1], records.Lead)
+    assert records.from_json(json.dumps(LEAD)) == lead
+
+
+def test_dumps_matches_json_encoding():
+    lead = records.Lead(LEAD)
+    payload = {"status": "success", "results": [lead, {"name": "Zoë"}]}
+    expected = json.dumps({"status": "success", "results": [lead.to_dict(), {"name": "Zoë"}]},
+                          ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    assert records.dumps(payload) == expected
+    assert json.loads(expected)["results"][0] == LEAD
+
+
+def test_dumps_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        records.dumps({"when": object()})
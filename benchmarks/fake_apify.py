@@ -0,0 +1,184 @@
+"""
+Local stand-in for the Apify API, for benchmarks and offline development.
+
+Implements the endpoints backend/apify.py uses (start actor run, run status,
+abort, dataset items with offset/limit/fields) and serves synthetic
+LinkedIn (Exa people search) and X (tweet scraper) items, or recorded items
+loaded from a fixtures directory (linkedin.json / x.json, each a JSON list).
+
+Usage:
+    python benchmarks/fake_apify.py --port 8765 --latency-ms 20 --items-per-second 500
+    APIFY_API_BASE_URL=http://127.0.0.1:8765 uvicorn main:app
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+
+TERMINAL_STATUSES = {"SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"}
+
+ORG_NAMES = ["Acme GmbH", "Berlin Startup Hub", "DataCorp", "TechVentures Inc"]
+ROLES = ["Founder", "CEO", "CTO", "Head of Growth", "Product Manager", "Engineer"]
+COMPANIES = ["Nordlicht AI", "Spree Robotics", "Kiez Labs", "Havel Health", "Tempelhof Data"]
+CITIES = ["Berlin, Germany", "Munich, Germany", "Hamburg, Germany", "Remote"]
+
+
+def synthetic_linkedin(i: int) -> Dict:
+    """Exa people-search item; every 10th is an organization page."""
+    if i % 10 == 9:
+        name = ORG_NAMES[i % len(ORG_NAMES)]
+        return {"author": name, "title": f"{name} | Company page", "text": "We are hiring.",
+                "url": f"https://www.linkedin.com/company/org-{i}", "publishedDate": None}
+    name = f"Person {i}"
+    role, company, city = ROLES[i % len(ROLES)], COMPANIES[i % len(COMPANIES)], CITIES[i % len(CITIES)]
+    return {
+        "author": name,
+        "title": f"{name} | {role} at {company}",
+        "text": f"{role} at {company}. Based in {city}. " + "Building things. " * 10,
+        "url": f"https://www.linkedin.com/in/person-{i}",
+        "publishedDate": "2024-01-01T00:00:00.000Z",
+        "image": f"https://example.com/img/{i}.png",
+    }
+
+
+def synthetic_tweet(i: int) -> Dict:
+    """Tweet item; on average two tweets per author."""
+    user = i // 2
+    return {
+        "id": str(10_000_000 + i),
+        "text": f"Tweet {i} about AI and startups " + "#ai " * 5,
+        "createdAt": "Mon Jan 01 00:00:00 +0000 2024",
+        "likeCount": i % 50,
+        "author": {
+            "userName": f"user{user}",
+            "name": f"User {user}",
+            "description": f"{ROLES[user % len(ROLES)]} at {COMPANIES[user % len(COMPANIES)]}",
+            "location": CITIES[user % len(CITIES)],
+            "followers": (user * 37) % 50_000,
+            "isBlueVerified": user % 7 == 0,
+        },
+    }
+
+
+def _project(item: Dict, fields: Optional[str]) -> Dict:
+    if not fields:
+        return item
+    return {f: item[f] for f in fields.split(",") if f in item}
+
+
+def create_app(latency: float = 0.0, items_per_second: float = 0.0,
+               fixtures: Optional[Path] = None) -> FastAPI:
+    """
+    Build the fake API.
+
+    latency: seconds added to every request.
+    items_per_second: dataset growth rate while a run is RUNNING (0 = all items at once).
+    fixtures: directory with recorded linkedin.json / x.json item lists.
+    """
+    app = FastAPI(title="Fake Apify")
+    runs: Dict[str, Dict] = {}
+    recorded: Dict[str, List[Dict]] = {}
+    if fixtures:
+        for platform in ("linkedin", "x"):
+            path = Path(fixtures) / f"{platform}.json"
+            if path.exists():
+                recorded[platform] = json.loads(path.read_text())
+    app.state.runs = runs
+
+    def platform_of(actor: str) -> str:
+        return "x" if "twitter" in actor else "linkedin"
+
+    def item(run: Dict, i: int) -> Dict:
+        items = recorded.get(run["platform"])
+        if items:
+            return items[i % len(items)]
+        return synthetic_tweet(i) if run["platform"] == "x" else synthetic_linkedin(i)
+
+    def available(run: Dict) -> int:
+        """Items in the dataset now; finishes the run when all are produced."""
+        if run["status"] in TERMINAL_STATUSES:
+            return run["produced"]
+        produced = run["total"] if not items_per_second else min(
+            run["total"], int((time.monotonic() - run["started"]) * items_per_second))
+        run["produced"] = produced
+        if produced >= run["total"]:
+            run["status"] = "SUCCEEDED"
+        return produced
+
+    def run_data(run: Dict) -> Dict:
+        # Usage grows with run time, roughly like a small actor on 1 GB of memory
+        compute_units = round((time.monotonic() - run["started"]) / 3600, 6)
+        return {"data": {"id": run["id"], "status": run["status"], "defaultDatasetId": run["id"],
+                         "stats": {"computeUnits": compute_units}, "usageTotalUsd": round(compute_units * 0.4, 6)}}
+
+    @app.middleware("http")
+    async def add_latency(request: Request, call_next):
+        if latency:
+            await asyncio.sleep(latency)
+        return await call_next(request)
+
+    @app.post("/v2/acts/{actor}/runs")
+    async def start_run(actor: str, request: Request):
+        body = await request.json()
+        run = {
+            "id": uuid.uuid4().hex[:12],
+            "actor": actor,
+            "platform": platform_of(actor),
+            "total": int(body.get("maxResults") or body.get("maxItems") or 10),
+            "produced": 0,
+            "started": time.monotonic(),
+            "status": "RUNNING",
+        }
+        runs[run["id"]] = run
+        available(run)
+        return run_data(run)
+
+    @app.get("/v2/actor-runs/{run_id}")
+    async def get_run(run_id: str):
+        run = runs.get(run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail="Run not found")
+        available(run)
+        return run_data(run)
+
+    @app.post("/v2/actor-runs/{run_id}/abort")
+    async def abort_run(run_id: str):
+        run = runs.get(run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail="Run not found")
+        if run["status"] not in TERMINAL_STATUSES:
+            available(run)
+            run["status"] = "ABORTED"
+        return run_data(run)
+
+    @app.get("/v2/datasets/{dataset_id}/items")
+    async def dataset_items(dataset_id: str, offset: int = 0, limit: int = 1000,
+                            fields: Optional[str] = None):
+        run = runs.get(dataset_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail="Dataset not found")
+        end = min(offset + limit, available(run))
+        return [_project(item(run, i), fields) for i in range(offset, end)]
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a local fake Apify API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--items-per-second", type=float, default=0.0)
+    parser.add_argument("--fixtures", type=Path, default=None)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.latency_ms / 1000, args.items_per_second, args.fixtures),
+        host=args.host, port=args.port, log_level="warning",
+    )
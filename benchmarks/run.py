@@ -0,0 +1,373 @@
+"""
+Offline benchmark harness.
+
+Runs every benchmark against the local fake Apify server (fake_apify.py),
+with a throwaway data directory, and writes the results as JSON:
+
+  - scrape_endpoint: end-to-end POST /scrape latency per platform
+  - normalization:   dataset items/s through scrape_linkedin / scrape_twitter
+  - database:        lead, seen-identity and run write rates
+  - export:          rows/s and MB/s per export format and row count
+  - records:         memory and JSON encoding speed of in-memory run results
+
+Usage:
+    python benchmarks/run.py                        # full run (1k/100k/1M export)
+    python benchmarks/run.py --quick                # small sizes, for a smoke check
+    python benchmarks/run.py --compare benchmarks/results/baseline.json
+
+With --compare, metrics that got worse by more than --threshold percent are
+listed, and the exit status is 1 if any regressed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+sys.path.insert(0, str(ROOT / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+EXPORT_FORMATS = ["csv", "ndjson", "parquet", "arrow"]
+
+
+# Setup
+def start_fake_apify(latency: float, items_per_second: float, fixtures=None) -> str:
+    """Serve the fake Apify API on a free local port in a daemon thread; returns its base URL."""
+    import socket
+    import uvicorn
+    from fake_apify import create_app
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    config = uvicorn.Config(create_app(latency, items_per_second, fixtures),
+                            host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def configure_environment(base_url: str, data_dir: str):
+    """Point the backend at the fake API and a temporary data directory.
+
+    Must run before any backend module is imported (they read env at import).
+    """
+    os.environ.update({
+        "APIFY_API_BASE_URL": base_url,
+        "APIFY_API_TOKEN": "benchmark",
+        "EXA_API_KEY": "benchmark",
+        "DATA_DIR": data_dir,
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+    })
+
+
+def _latency_stats(samples: List[float]) -> Dict:
+    ordered = sorted(samples)
+    return {
+        "requests": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def synthetic_leads(count: int) -> Iterator[Dict]:
+    """Lead records shaped like scraper output."""
+    for i in range(count):
+        yield {
+            "id": f"li_{i:08x}",
+            "name": f"Person {i}",
+            "role": "Founder",
+            "company": "Spree Robotics",
+            "platform": "LinkedIn" if i % 2 else "X",
+            "contact_link": f"https://www.linkedin.com/in/person-{i}",
+            "region": "Berlin, Germany",
+            "notes": "ai founders",
+            "followers": i % 50_000,
+            "verified": i % 7 == 0,
+            "industry": "",
+            "headline": "Founder at Spree Robotics",
+            "bio": "Building things. " * 8,
+            "saved_at": "2024-01-01T00:00:00",
+        }
+
+
+# Benchmarks
+def bench_scrape_endpoint(requests: int, max_results: int) -> Dict:
+    """End-to-end POST /scrape (job queue, actor run, parsing, storage)."""
+    from fastapi.testclient import TestClient
+    import main
+
+    results = {}
+    with TestClient(main.app) as client:
+        for platform_name in ("linkedin", "x"):
+            samples = []
+            for i in range(requests):
+                start = time.perf_counter()
+                response = client.post("/scrape", json={
+                    "keyword": f"benchmark {i}", "location": "Berlin",
+                    "platform": platform_name, "max_results": max_results,
+                    "force_refresh": True,
+                })
+                samples.append(time.perf_counter() - start)
+                response.raise_for_status()
+            results[platform_name] = {"max_results": max_results, **_latency_stats(samples)}
+    return results
+
+
+def bench_normalization(items: int) -> Dict:
+    """Dataset items per second through the platform parsers and filter stage."""
+    import metrics
+    import scraper
+
+    def items_read(platform_name: str) -> float:
+        return metrics.DATASET_ITEMS._values.get((platform_name,), 0.0)
+
+    async def run(platform_name: str, fn) -> Dict:
+        before = items_read(platform_name)
+        start = time.perf_counter()
+        leads = await fn("benchmark", "Berlin", items)
+        elapsed = time.perf_counter() - start
+        raw = items_read(platform_name) - before
+        return {
+            "leads": len(leads),
+            "items_read": int(raw),
+            "seconds": round(elapsed, 4),
+            "items_per_s": round(raw / elapsed, 1),
+            "leads_per_s": round(len(leads) / elapsed, 1),
+        }
+
+    async def run_all() -> Dict:
+        import apify
+        try:
+            return {
+                "linkedin": await run("linkedin", scraper.scrape_linkedin),
+                "x": await run("x", scraper.scrape_twitter),
+            }
+        finally:
+            await apify.close()
+
+    return asyncio.run(run_all())
+
+
+def bench_database(rows: int) -> Dict:
+    """SQLite write rates: single-lead inserts, batched seen-identity upserts, run storage."""
+    import database as db
+    import runs
+    from identity import lead_identity
+
+    db.initialize()
+    leads = list(synthetic_leads(rows))
+    results = {}
+
+    start = time.perf_counter()
+    for lead in leads:
+        db.add_lead(dict(lead, id=f"bench_{lead['id']}"))
+    elapsed = time.perf_counter() - start
+    results["add_lead"] = {"rows": rows, "seconds": round(elapsed, 4), "rows_per_s": round(rows / elapsed, 1)}
+
+    identities = [lead_identity(lead) for lead in leads]
+    start = time.perf_counter()
+    for i in range(0, rows, 100):
+        db.record_seen(identities[i:i + 100], "linkedin")
+    elapsed = time.perf_counter() - start
+    results["record_seen"] = {"rows": rows, "batch": 100, "seconds": round(elapsed, 4),
+                              "rows_per_s": round(rows / elapsed, 1)}
+
+    start = time.perf_counter()
+    runs.create_run(leads, {"keyword": "benchmark"})
+    elapsed = time.perf_counter() - start
+    results["create_run"] = {"rows": rows, "seconds": round(elapsed, 4), "rows_per_s": round(rows / elapsed, 1)}
+    return results
+
+
+def bench_export(sizes: List[int]) -> Dict:
+    """Export encoding speed per format and row count."""
+    import export
+
+    results = {}
+    for fmt in EXPORT_FORMATS:
+        results[fmt] = {}
+        for size in sizes:
+            try:
+                stream = export.stream_export(synthetic_leads(size), fmt)
+            except export.ExportError as e:
+                results[fmt][str(size)] = {"skipped": str(e)}
+                continue
+            start = time.perf_counter()
+            total_bytes = sum(len(chunk) for chunk in stream)
+            elapsed = time.perf_counter() - start
+            results[fmt][str(size)] = {
+                "rows": size,
+                "bytes": total_bytes,
+                "seconds": round(elapsed, 4),
+                "rows_per_s": round(size / elapsed, 1),
+                "mb_per_s": round(total_bytes / elapsed / 1e6, 2),
+            }
+    return results
+
+
+def bench_records(rows: int) -> Dict:
+    """Memory held by a run's results as dicts vs Lead records, and response encoding speed."""
+    import tracemalloc
+    import records
+
+    stored = [json.dumps(lead) for lead in synthetic_leads(rows)]
+    results = {}
+    for name, load in (("dicts", json.loads), ("records", records.from_json)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        leads = [load(text) for text in stored]
+        load_elapsed = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        start = time.perf_counter()
+        body = records.dumps({"status": "success", "results": leads})
+        encode_elapsed = time.perf_counter() - start
+        results[name] = {
+            "rows": rows,
+            "mb": round(memory / 1e6, 2),
+            "bytes_per_lead": round(memory / rows),
+            "load_rows_per_s": round(rows / load_elapsed, 1),
+            "encode_rows_per_s": round(rows / encode_elapsed, 1),
+            "response_bytes": len(body),
+        }
+        del leads
+    results["memory_ratio"] = round(results["records"]["mb"] / results["dicts"]["mb"], 3)
+    return results
+
+
+# Reporting
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    """Flatten nested results into {"a.b.metric": value} for comparison."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """List metrics that regressed by more than threshold percent.
+
+    Throughput metrics (*_per_s) should not drop; latency metrics (*_ms)
+    should not rise. Other values (sizes, counts, durations) are ignored.
+    """
+    regressions = []
+    base = flatten(baseline["results"])
+    for name, value in flatten(current["results"]).items():
+        old = base.get(name)
+        if not old:
+            continue
+        metric = name.rsplit(".", 1)[-1]
+        if metric.endswith("_per_s"):
+            change = (old - value) / old * 100
+        elif metric.endswith("_ms"):
+            change = (value - old) / old * 100
+        else:
+            continue
+        if change > threshold:
+            regressions.append(f"{name}: {old} -> {value} ({change:+.1f}% worse)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="small sizes for a fast smoke run")
+    parser.add_argument("--export-sizes", default="1000,100000,1000000",
+                        help="comma-separated export row counts")
+    parser.add_argument("--normalize-items", type=int, default=20000)
+    parser.add_argument("--db-rows", type=int, default=10000)
+    parser.add_argument("--record-rows", type=int, default=100000)
+    parser.add_argument("--scrape-requests", type=int, default=20)
+    parser.add_argument("--scrape-max-results", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="latency added to every fake Apify request")
+    parser.add_argument("--items-per-second", type=float, default=0.0,
+                        help="fake actor output rate (0 = dataset complete at start)")
+    parser.add_argument("--fixtures", type=Path, default=None,
+                        help="directory with recorded linkedin.json / x.json items")
+    parser.add_argument("--only", default="", help="comma-separated subset of benchmarks to run")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="baseline results file")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.export_sizes = "1000,10000"
+        args.normalize_items = 2000
+        args.db_rows = 1000
+        args.record_rows = 10000
+        args.scrape_requests = 5
+
+    base_url = start_fake_apify(args.latency_ms / 1000, args.items_per_second, args.fixtures)
+    data_dir = tempfile.mkdtemp(prefix="outreach-bench-")
+    configure_environment(base_url, data_dir)
+
+    benchmarks = {
+        "scrape_endpoint": lambda: bench_scrape_endpoint(args.scrape_requests, args.scrape_max_results),
+        "normalization": lambda: bench_normalization(args.normalize_items),
+        "database": lambda: bench_database(args.db_rows),
+        "export": lambda: bench_export([int(s) for s in args.export_sizes.split(",") if s]),
+        "records": lambda: bench_records(args.record_rows),
+    }
+    selected = [name for name in args.only.split(",") if name] or list(benchmarks)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        },
+        "results": {},
+    }
+    for name in selected:
+        print(f"⏱️  {name} ...", flush=True)
+        start = time.perf_counter()
+        report["results"][name] = benchmarks[name]()
+        print(f"   done in {time.perf_counter() - start:.1f}s", flush=True)
+
+    output = args.output or RESULTS_DIR / f"bench-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"📄 Results written to {output}")
+
+    if args.compare:
+        regressions = compare(report, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) over {args.threshold}%:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"✅ No regressions over {args.threshold}% against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
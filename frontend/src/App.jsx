@@ -51,26 +51,52 @@ function App() {
     }
   }
 
-  const handleSearch = async (searchParams) => {
-    setLoading(true)
-    try {
-      const response = await fetch('/scrape', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(searchParams),
-      })
+  // Stream leads from /scrape/stream (NDJSON) and render rows as they arrive
+  const streamSearch = async (searchParams) => {
+    const response = await fetch('/scrape/stream', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify(searchParams),
+    })
 
+    if (!response.ok) {
       const data = await response.json()
+      throw new Error(data.detail || 'Unknown error')
+    }
 
-      if (data.status === 'success') {
-        setResults(data.results || [])
-        setView('search')
-        await loadHistory()
-      } else {
-        alert('Search failed: ' + (data.detail || 'Unknown error'))
+    setResults([])
+    setView('search')
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+
+    while (true) {
+      const { done, value } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+
+      const lines = buffer.split('\n')
+      buffer = lines.pop()
+      for (const line of lines) {
+        if (!line.trim()) continue
+        const event = JSON.parse(line)
+        if (event.type === 'lead') {
+          setResults(prev => [...prev, event.lead])
+        } else if (event.type === 'error') {
+          throw new Error(event.detail)
+        }
       }
+    }
+  }
+
+  const handleSearch = async (searchParams) => {
+    setLoading(true)
+    try {
+      await streamSearch(searchParams)
+      await loadHistory()
     } catch (error) {
       console.error('Search failed:', error)
       alert('Search failed: ' + error.message)